@@ -43,6 +43,9 @@ class Config:
     DEFAULT_TEST_SIZE: float = 0.2
     DEFAULT_CV_FOLDS: int = 5
 
+    # Tool caches
+    PROFILE_CACHE_MAX_MB: float = float(os.getenv("PROFILE_CACHE_MAX_MB", "256"))
+
     @classmethod
     def validate_api_keys(cls) -> Dict[str, bool]:
         """Validate that required API keys are present."""
@@ -9,10 +9,33 @@ from .ml_tools import (
     FeatureImportanceTool,
     HyperparameterOptimizerTool,
 )
+from .capacity import FitCostModel
+from .columnar import ColumnarDataset, ColumnStack, ingest_dataset, load_array
+from .compiled import CompiledForest, compile_forest
+from .forest_format import load_forest, save_forest
+from .hist_forest import FeatureBinner, HistRandomForestClassifier, HistRandomForestRegressor
+from .out_of_core import RowSource, fit_out_of_core
+from .shared_training import SharedForestTrainer, benchmark_parallel
 
 __all__ = [
     "DatasetAnalyzerTool",
     "ModelEvaluatorTool",
     "FeatureImportanceTool",
     "HyperparameterOptimizerTool",
+    "FitCostModel",
+    "ColumnarDataset",
+    "ColumnStack",
+    "ingest_dataset",
+    "load_array",
+    "CompiledForest",
+    "compile_forest",
+    "load_forest",
+    "save_forest",
+    "FeatureBinner",
+    "HistRandomForestClassifier",
+    "HistRandomForestRegressor",
+    "RowSource",
+    "fit_out_of_core",
+    "SharedForestTrainer",
+    "benchmark_parallel",
 ]
@@ -0,0 +1,156 @@
+"""
+Tree-structured Parzen estimator for CrewAI ML tools.
+A mixed integer/float/categorical surrogate that proposes batches of configurations.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+Observation = Tuple[Dict[str, Any], float]
+
+
+def _is_range(domain: Any) -> bool:
+    return isinstance(domain, tuple)
+
+
+def _is_int_range(domain: Any) -> bool:
+    return _is_range(domain) and isinstance(domain[0], int) and isinstance(domain[1], int)
+
+
+class _Numeric:
+    """Parzen density over one range, kept on the unit interval.
+
+    Each observation is a Gaussian with a shared Scott's-rule bandwidth, mixed
+    with a uniform prior so that unexplored regions keep some mass.
+    """
+
+    def __init__(self, values: np.ndarray, prior_weight: float, min_bandwidth: float):
+        self.centers = values
+        self.prior_weight = prior_weight
+        n = len(values)
+        spread = float(np.std(np.append(values, 0.5))) if n else 0.5
+        self.bandwidth = float(np.clip(1.06 * spread * (n + 1) ** -0.2, min_bandwidth, 1.0))
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        total = len(self.centers) + self.prior_weight
+        from_prior = rng.random(n) < self.prior_weight / total
+        picks = self.centers[rng.integers(len(self.centers), size=n)] if len(self.centers) else np.zeros(n)
+        jitter = picks + self.bandwidth * rng.standard_normal(n)
+        return np.clip(np.where(from_prior, rng.random(n), jitter), 0.0, 1.0)
+
+    def log_pdf(self, u: np.ndarray) -> np.ndarray:
+        z = (u[:, None] - self.centers[None, :]) / self.bandwidth
+        kernels = np.exp(-0.5 * z ** 2).sum(axis=1) / (self.bandwidth * np.sqrt(2 * np.pi))
+        return np.log((kernels + self.prior_weight) / (len(self.centers) + self.prior_weight))
+
+
+class _Categorical:
+    """Smoothed frequencies of one categorical choice."""
+
+    def __init__(self, indices: np.ndarray, n_choices: int, prior_weight: float):
+        counts = np.bincount(indices, minlength=n_choices).astype(np.float64)
+        self.probs = (counts + prior_weight / n_choices) / (len(indices) + prior_weight)
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.choice(len(self.probs), size=n, p=self.probs)
+
+    def log_pdf(self, indices: np.ndarray) -> np.ndarray:
+        return np.log(self.probs[indices])
+
+
+class TPESampler:
+    """Tree-structured Parzen estimator over a tuning search space.
+
+    Observations are split into the best ``gamma`` fraction and the rest,
+    each dimension gets one density per split (Gaussian Parzen windows for
+    ranges, smoothed frequencies for choices), and proposals maximise the
+    ratio ``l(x) / g(x)`` among configurations drawn from ``l``. A batch of
+    ``q`` proposals is built with the constant liar: every proposal is added
+    as a pending observation with the worst score seen so far, which pushes
+    the next proposal away from it.
+
+    Args:
+        space: Search space (lists are choices, ``(low, high)`` tuples are ranges)
+        gamma: Fraction of observations treated as good
+        n_samples: Configurations drawn from ``l`` per proposal
+        prior_weight: Weight of the uniform prior in every density
+        random_state: Seed for sampling
+    """
+
+    def __init__(
+        self,
+        space: Dict[str, Any],
+        gamma: float = 0.25,
+        n_samples: int = 64,
+        prior_weight: float = 1.0,
+        random_state: Optional[int] = None,
+    ):
+        self.space = space
+        self.gamma = gamma
+        self.n_samples = n_samples
+        self.prior_weight = prior_weight
+        self.rng = np.random.default_rng(random_state)
+
+    def _encode(self, name: str, values: List[Any]) -> np.ndarray:
+        domain = self.space[name]
+        if _is_range(domain):
+            low, high = domain
+            return (np.asarray(values, dtype=np.float64) - low) / max(high - low, 1e-12)
+        return np.asarray([domain.index(v) for v in values], dtype=np.intp)
+
+    def _decode(self, name: str, codes: np.ndarray) -> List[Any]:
+        domain = self.space[name]
+        if _is_range(domain):
+            low, high = domain
+            values = low + codes * (high - low)
+            if _is_int_range(domain):
+                return [int(v) for v in np.rint(values)]
+            return [float(v) for v in values]
+        return [domain[int(i)] for i in codes]
+
+    def _density(self, name: str, codes: np.ndarray) -> Any:
+        domain = self.space[name]
+        if _is_range(domain):
+            # Integer ranges never need to resolve finer than one step
+            step = 1.0 / max(domain[1] - domain[0], 1) if _is_int_range(domain) else 0.0
+            return _Numeric(codes, self.prior_weight, max(step, 0.02))
+        return _Categorical(codes, len(domain), self.prior_weight)
+
+    def _propose_one(self, observations: List[Observation], seen: set) -> Dict[str, Any]:
+        ranked = sorted(observations, key=lambda o: o[1], reverse=True)
+        n_good = max(1, int(np.ceil(self.gamma * len(ranked))))
+        good, bad = ranked[:n_good], ranked[n_good:]
+
+        draws: Dict[str, List[Any]] = {}
+        ratio = np.zeros(self.n_samples)
+        for name in self.space:
+            l = self._density(name, self._encode(name, [p[name] for p, _ in good]))
+            g = self._density(name, self._encode(name, [p[name] for p, _ in bad]))
+            values = self._decode(name, l.sample(self.n_samples, self.rng))
+            # Score the decoded (rounded) values so integer draws are compared where they land
+            codes = self._encode(name, values)
+            ratio += l.log_pdf(codes) - g.log_pdf(codes)
+            draws[name] = values
+
+        for i in np.argsort(-ratio):
+            params = {name: draws[name][i] for name in self.space}
+            if _key(params) not in seen:
+                return params
+        return {name: draws[name][int(np.argmax(ratio))] for name in self.space}
+
+    def propose(self, observations: List[Observation], q: int = 1) -> List[Dict[str, Any]]:
+        """``q`` new configurations given ``(params, score)`` observations (higher is better)."""
+        seen = {_key(params) for params, _ in observations}
+        lie = min((score for _, score in observations), default=0.0)
+        pending = list(observations)
+        batch = []
+        for _ in range(q):
+            params = self._propose_one(pending, seen)
+            batch.append(params)
+            seen.add(_key(params))
+            pending.append((params, lie))
+        return batch
+
+
+def _key(params: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, repr(value)) for name, value in params.items()))
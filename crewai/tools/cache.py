@@ -0,0 +1,112 @@
+"""
+Content-addressed on-disk cache for dataset profiles.
+Entries are keyed by a fast file fingerprint and evicted least-recently-used under a size cap.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..config import config
+
+PathLike = Union[str, Path]
+
+
+def fingerprint(path: PathLike, n_blocks: int = 8, block_size: int = 64 * 1024) -> str:
+    """Fast content fingerprint of a file.
+
+    Hashes the size, the modification time and ``n_blocks`` evenly spaced
+    blocks (always including the first and last), so even very large files
+    are fingerprinted with a handful of reads. A columnar directory is
+    fingerprinted through its schema file, which records its source.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, "schema.json")
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    last = max(stat.st_size - block_size, 0)
+    offsets = sorted({last * i // max(n_blocks - 1, 1) for i in range(n_blocks)})
+    with open(path, "rb") as handle:
+        for offset in offsets:
+            handle.seek(offset)
+            digest.update(handle.read(block_size))
+    return digest.hexdigest()
+
+
+class ProfileCache:
+    """JSON result cache with least-recently-used eviction.
+
+    Each entry is one file; a hit refreshes the file's mtime, which is the
+    recency used for eviction once the directory grows past ``max_mb``.
+
+    Args:
+        root: Cache directory (defaults to ``config.OUTPUTS_DIR / "profile_cache"``)
+        max_mb: Size cap of the cache directory in megabytes
+    """
+
+    def __init__(self, root: Optional[PathLike] = None, max_mb: Optional[float] = None):
+        self.root = Path(root) if root else config.OUTPUTS_DIR / "profile_cache"
+        self.max_bytes = int((config.PROFILE_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024)
+
+    def key(self, path: PathLike, **options: Any) -> str:
+        """Cache key for a dataset file and the options that shape its analysis."""
+        payload = json.dumps(options, sort_keys=True, default=str)
+        digest = hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+        return f"{fingerprint(path)}-{digest}"
+
+    def _entry(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key``, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            with open(entry, "r", encoding="utf-8") as handle:
+                value = json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(entry)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` and evict old entries if over the cap."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as tmp:
+                json.dump(value, tmp)
+            os.replace(tmp_path, self._entry(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least-recently-used entries until the cache fits its cap."""
+        entries = []
+        for entry in self.root.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for entry in self.root.glob("*.json"):
+            entry.unlink(missing_ok=True)
@@ -0,0 +1,301 @@
+"""
+Pre-fit capacity planning for CrewAI ML tools.
+Predicts peak memory, model size and fit time of a Random Forest before fitting it, and picks
+max_samples / max_depth / n_jobs that fit a memory and time budget.
+"""
+
+import os
+import pickle
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from ..config import config
+
+_MB = 1024.0 * 1024.0
+# Forest parameters set by the estimator or the auto mode rather than calibrated
+_PLANNED_PARAMS = ("n_estimators", "max_samples", "max_depth", "n_jobs", "warm_start", "oob_score")
+
+MAX_SAMPLES_CHOICES = (None, 0.8, 0.6, 0.4, 0.3, 0.2, 0.1, 0.05, 0.02, 0.01)
+MAX_DEPTH_CHOICES = (None, 40, 30, 24, 20, 16, 12, 10, 8, 6)
+
+
+def _n_bootstrap(n_rows: int, max_samples: Any) -> int:
+    if max_samples is None:
+        return n_rows
+    if isinstance(max_samples, float):
+        return max(1, int(round(max_samples * n_rows)))
+    return min(int(max_samples), n_rows)
+
+
+def _level_profile(forest: Any) -> Dict[str, np.ndarray]:
+    """Mean node count and mean fraction of the root's rows at every depth of a forest's trees."""
+    nodes, rows = [], []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        depth = np.zeros(tree.node_count, dtype=np.intp)
+        frontier = np.array([0])
+        while frontier.size:
+            children = np.concatenate([tree.children_left[frontier], tree.children_right[frontier]])
+            children = children[children >= 0]
+            depth[children] = depth[frontier[0]] + 1
+            frontier = children
+        nodes.append(np.bincount(depth).astype(np.float64))
+        rows.append(np.bincount(depth, weights=tree.weighted_n_node_samples) / tree.weighted_n_node_samples[0])
+    levels = max(len(n) for n in nodes)
+    return {
+        "nodes": np.mean([np.pad(n, (0, levels - n.size)) for n in nodes], axis=0),
+        "rows": np.mean([np.pad(r, (0, levels - r.size)) for r in rows], axis=0),
+    }
+
+
+def _depth_fractions(profile: Dict[str, Any], scale: float, max_depth: int):
+    """Fractions of a full tree's nodes and split work within ``max_depth``, at ``scale`` x the calibration rows.
+
+    A tree on ``2^k`` times the rows is modelled as ``k`` levels that halve
+    every node before it reaches the calibration tree's shape.
+    """
+    k = int(round(max(np.log2(scale), 0.0)))
+    nodes = np.concatenate([2.0 ** np.arange(k), 2.0 ** k * np.asarray(profile["nodes"])])
+    rows = np.concatenate([np.ones(k), np.asarray(profile["rows"])])
+    # Nodes at depth max_depth become leaves without evaluating splits
+    return nodes[:max_depth + 1].sum() / nodes.sum(), rows[:max_depth].sum() / rows.sum()
+
+
+class FitCostModel:
+    """Calibrated model of a RandomForest fit's peak memory, model size and duration.
+
+    ``calibrate`` fits a few trees with the given parameters on two
+    sample sizes, preferably rows of the real data, and records per tree
+    the fit time, node count, depth and pickled bytes per node. Time and
+    node count are extrapolated as power laws of the bootstrap size, and
+    depth as linear in its logarithm. A ``max_depth`` keeps the share of
+    nodes and of split work (rows reaching each level) that the
+    calibration trees have above that depth, see _depth_fractions().
+
+    Memory is not measured (allocations of sklearn's tree builder are
+    invisible to Python) but follows its buffers: the float32 copy of
+    ``X`` unless it already is float32, and per tree under construction
+    the bootstrap indices (8 bytes per draw), the per-row count and weight
+    arrays and the builder's sample and feature-value arrays (28 bytes per
+    training row, whatever ``max_samples`` is) and up to twice its final
+    node array. Finished trees add the model size.
+
+    Args:
+        task: "classification" or "regression"
+        params: RandomForest parameters held fixed (e.g. ``max_features``, ``min_samples_leaf``)
+        random_state: Seed for calibration samples and forests
+    """
+
+    def __init__(
+        self,
+        task: str = "classification",
+        params: Optional[Dict[str, Any]] = None,
+        random_state: Optional[int] = config.DEFAULT_RANDOM_STATE,
+    ):
+        self.task = task
+        self.params = {k: v for k, v in (params or {}).items() if k not in _PLANNED_PARAMS}
+        self.random_state = random_state
+        self.calibration_: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.task == "classification"
+
+    def _forest(self, **params: Any) -> Any:
+        cls = RandomForestClassifier if self.is_classifier else RandomForestRegressor
+        return cls(**{**self.params, "random_state": self.random_state, **params})
+
+    def calibrate(
+        self,
+        X: Optional[np.ndarray] = None,
+        y: Optional[np.ndarray] = None,
+        n_features: Optional[int] = None,
+        sample_sizes: tuple = (5000, 20000),
+        n_trees: int = 4,
+    ) -> "FitCostModel":
+        """Time small forests on two sample sizes of ``X`` (or of synthetic data).
+
+        Node counts depend on how separable the data is, so calibrating on a
+        row sample of the real training set gives far better estimates than
+        the synthetic fallback (``make_classification``/``make_regression``
+        with ``n_features`` columns).
+
+        Args:
+            X: Training features (rows are sampled; may be a memory map)
+            y: Training targets
+            n_features: Columns of the synthetic data when ``X`` is omitted
+            sample_sizes: Two calibration sample sizes
+            n_trees: Trees per calibration fit
+
+        Returns:
+            self
+        """
+        rng = np.random.default_rng(self.random_state)
+        small, large = sorted(sample_sizes)
+        if X is None:
+            from sklearn.datasets import make_classification, make_regression
+
+            n_features = n_features or 20
+            make = make_classification if self.is_classifier else make_regression
+            X, y = make(large, n_features, n_informative=min(n_features, 10), random_state=self.random_state)
+        elif y is None:
+            raise ValueError("Calibrating on X requires its targets y")
+        large = min(large, X.shape[0])
+        small = min(small, max(large // 4, 2))
+        rows = np.sort(rng.choice(X.shape[0], size=large, replace=False))
+        X_sample = np.asarray(X[rows], dtype=np.float32)
+        y_sample = np.asarray(y)[rows].ravel()
+
+        points = []
+        profile: Dict[str, np.ndarray] = {}
+        for size in (small, large):
+            forest = self._forest(n_estimators=n_trees, n_jobs=1)
+            start = time.perf_counter()
+            forest.fit(X_sample[:size], y_sample[:size])
+            seconds = time.perf_counter() - start
+            nodes = sum(tree.tree_.node_count for tree in forest.estimators_)
+            profile = _level_profile(forest)
+            points.append({
+                "rows": size,
+                "seconds_per_tree": seconds / n_trees,
+                "nodes_per_tree": nodes / n_trees,
+                "depth": float(np.mean([tree.tree_.max_depth for tree in forest.estimators_])),
+                "bytes_per_node": len(pickle.dumps(forest, protocol=pickle.HIGHEST_PROTOCOL)) / nodes,
+            })
+
+        low, high = points
+        log_ratio = np.log(high["rows"] / low["rows"])
+        self.calibration_ = {
+            "points": points,
+            "time_exponent": float(np.log(high["seconds_per_tree"] / low["seconds_per_tree"]) / log_ratio),
+            "node_exponent": float(np.log(high["nodes_per_tree"] / low["nodes_per_tree"]) / log_ratio),
+            "depth_per_doubling": float((high["depth"] - low["depth"]) / np.log2(high["rows"] / low["rows"])),
+            "bytes_per_node": high["bytes_per_node"],
+            "level_nodes": profile["nodes"].tolist(),
+            "level_rows": profile["rows"].tolist(),
+        }
+        return self
+
+    def estimate(
+        self,
+        n_rows: int,
+        n_features: int,
+        n_estimators: int = 100,
+        max_samples: Any = None,
+        max_depth: Optional[int] = None,
+        n_jobs: int = 1,
+        dtype: Any = np.float64,
+    ) -> Dict[str, float]:
+        """Predicted costs of fitting the calibrated forest on ``n_rows`` x ``n_features``.
+
+        Args:
+            n_rows: Training rows
+            n_features: Training columns
+            n_estimators: Number of trees
+            max_samples: Bootstrap size (None, fraction or count)
+            max_depth: Depth limit
+            n_jobs: Worker threads (-1 for all cores)
+            dtype: dtype of the training matrix as passed to fit
+
+        Returns:
+            Dict with ``peak_memory_mb`` (added by the fit, excluding ``X`` itself),
+            ``model_mb``, ``fit_seconds``, ``nodes_per_tree`` and ``depth``
+        """
+        if self.calibration_ is None:
+            self.calibrate(n_features=n_features)
+        cal = self.calibration_
+        ref = cal["points"][-1]
+        n_boot = _n_bootstrap(n_rows, max_samples)
+        scale = n_boot / ref["rows"]
+
+        depth = max(ref["depth"] + cal["depth_per_doubling"] * np.log2(scale), 1.0)
+        nodes = ref["nodes_per_tree"] * scale ** cal["node_exponent"]
+        seconds = ref["seconds_per_tree"] * scale ** cal["time_exponent"]
+        if max_depth is not None and max_depth < depth:
+            profile = {"nodes": cal["level_nodes"], "rows": cal["level_rows"]}
+            node_fraction, work_fraction = _depth_fractions(profile, scale, max_depth)
+            nodes = min(nodes * node_fraction, 2.0 ** (max_depth + 1) - 1)
+            seconds *= work_fraction
+            depth = float(max_depth)
+        nodes = max(nodes, 1.0)
+
+        cores = os.cpu_count() or 1
+        workers = min(cores if n_jobs in (None, -1) else max(n_jobs, 1), n_estimators)
+        tree_bytes = nodes * cal["bytes_per_node"]
+        building = 8.0 * n_boot + 28.0 * n_rows + 2.0 * tree_bytes
+        # Input validation builds a one-byte finiteness mask per cell
+        x_copy = (0.0 if np.dtype(dtype) == np.float32 else 4.0 * n_rows * n_features) + n_rows * n_features
+        targets = 16.0 * n_rows
+        model = n_estimators * tree_bytes
+        return {
+            "peak_memory_mb": float(x_copy + targets + workers * building + model) / _MB,
+            "model_mb": float(model) / _MB,
+            # Threads in the same process overlap well, but not beyond the core count
+            "fit_seconds": float(seconds) * n_estimators / min(workers, cores),
+            "nodes_per_tree": float(nodes),
+            "depth": float(depth),
+        }
+
+    def auto_configure(
+        self,
+        n_rows: int,
+        n_features: int,
+        n_estimators: int = 100,
+        memory_budget_mb: Optional[float] = None,
+        time_budget_seconds: Optional[float] = None,
+        dtype: Any = np.float64,
+        max_samples_choices: tuple = MAX_SAMPLES_CHOICES,
+        max_depth_choices: tuple = MAX_DEPTH_CHOICES,
+    ) -> Dict[str, Any]:
+        """Largest ``max_samples``, then deepest ``max_depth``, then most ``n_jobs`` that fit the budgets.
+
+        Every combination of the choices and of 1..cores workers is
+        estimated. Among those within both budgets, more data per tree is
+        preferred over depth (depth limits cost less accuracy), and more
+        workers only shorten the fit. When nothing fits, the combination
+        with the smallest relative budget overrun is returned with
+        ``feasible`` set to False. No setting goes below the buffers sklearn
+        sizes to the whole training set (its float32 copy of ``X`` and 28
+        bytes per row per worker); past that, pass float32 data or train
+        with fit_out_of_core().
+
+        Args:
+            n_rows: Training rows
+            n_features: Training columns
+            n_estimators: Number of trees
+            memory_budget_mb: Upper bound on the fit's peak memory
+            time_budget_seconds: Upper bound on the fit time
+            dtype: dtype of the training matrix as passed to fit
+            max_samples_choices: Bootstrap sizes considered
+            max_depth_choices: Depth limits considered
+
+        Returns:
+            Dict with the chosen ``params``, their ``estimate`` and ``feasible``
+        """
+        cores = os.cpu_count() or 1
+        candidates: List[Dict[str, Any]] = []
+        for max_samples in max_samples_choices:
+            for max_depth in max_depth_choices:
+                for n_jobs in range(1, cores + 1):
+                    params = {"n_estimators": n_estimators, "max_samples": max_samples,
+                              "max_depth": max_depth, "n_jobs": n_jobs}
+                    estimate = self.estimate(n_rows, n_features, dtype=dtype, **params)
+                    overrun = sum(
+                        max(estimate[key] / bound - 1.0, 0.0)
+                        for key, bound in (("peak_memory_mb", memory_budget_mb), ("fit_seconds", time_budget_seconds))
+                        if bound is not None
+                    )
+                    candidates.append({"params": params, "estimate": estimate, "overrun": overrun})
+
+        feasible = [c for c in candidates if c["overrun"] == 0.0]
+        if feasible:
+            best = max(feasible, key=lambda c: (
+                _n_bootstrap(n_rows, c["params"]["max_samples"]),
+                c["params"]["max_depth"] or np.inf,
+                c["params"]["n_jobs"],
+            ))
+        else:
+            best = min(candidates, key=lambda c: c["overrun"])
+        return {"params": {**self.params, **best["params"]}, "estimate": best["estimate"], "feasible": bool(feasible)}
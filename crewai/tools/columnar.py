@@ -0,0 +1,313 @@
+"""
+Columnar memory-mapped dataset format for CrewAI ML tools.
+Converts a CSV/Parquet file once into per-column ``.npy`` files that every tool opens zero-copy.
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from .cache import fingerprint
+from .profiling import DEFAULT_CHUNKSIZE, iter_chunks
+
+SCHEMA_FILE = "schema.json"
+FORMAT_VERSION = 2
+# Versions ColumnarDataset can read (version 1 stored bools as np.bool_, missing as False)
+_READABLE_VERSIONS = (1, 2)
+
+# Fixed-size .npy header so the row count can be patched in after streaming
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_HEADER_BYTES = 128
+
+PathLike = Union[str, Path]
+
+
+def is_columnar(path: PathLike) -> bool:
+    """Return True when ``path`` is a directory written by ingest_dataset()."""
+    return (Path(path) / SCHEMA_FILE).is_file()
+
+
+def _npy_header(dtype: np.dtype, n_rows: int) -> bytes:
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": (n_rows,),
+    }).encode("latin1")
+    padding = _NPY_HEADER_BYTES - len(_NPY_MAGIC) - 2 - len(header) - 1
+    return _NPY_MAGIC + struct.pack("<H", len(header) + padding + 1) + header + b" " * padding + b"\n"
+
+
+class _ColumnWriter:
+    """Append-only writer for one column, fixing its encoding on the first chunk."""
+
+    def __init__(self, root: Path, index: int, name: str, first: pd.Series, float_dtype: np.dtype):
+        self.name = name
+        self.file = f"col_{index:05d}.npy"
+        self.categories: Optional[Dict[str, int]] = None
+        self.coerced = 0
+
+        if pd.api.types.is_bool_dtype(first):
+            self.kind, self.dtype = "bool", np.dtype(np.int8)
+        elif pd.api.types.is_datetime64_any_dtype(first):
+            self.kind, self.dtype = "datetime", np.dtype("datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(first):
+            self.kind, self.dtype = "numeric", np.dtype(float_dtype)
+        else:
+            self.kind, self.dtype = "categorical", np.dtype(np.int32)
+            self.categories = {}
+
+        self.n_rows = 0
+        self._handle = open(root / self.file, "wb")
+        self._handle.write(_npy_header(self.dtype, 0))
+
+    def _encode(self, series: pd.Series) -> np.ndarray:
+        if self.kind == "numeric":
+            if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                before = series.notna()
+                series = pd.to_numeric(series, errors="coerce")
+                self.coerced += int((before & series.isna()).sum())
+            return series.to_numpy(dtype=self.dtype, na_value=np.nan)
+        if self.kind == "bool":
+            codes = np.full(len(series), -1, dtype=np.int8)
+            present = series.notna().to_numpy()
+            codes[present] = series[present].astype(bool).to_numpy()
+            return codes
+        if self.kind == "datetime":
+            values = pd.to_datetime(series, errors="coerce", utc=True).dt.tz_convert(None)
+            return values.to_numpy(dtype="datetime64[ns]")
+
+        codes = np.full(len(series), -1, dtype=np.int32)
+        present = series.notna().to_numpy()
+        labels, uniques = pd.factorize(series[present].astype(str))
+        mapping = np.array([
+            self.categories.setdefault(label, len(self.categories)) for label in uniques
+        ], dtype=np.int32)
+        if labels.size:
+            codes[present] = mapping[labels]
+        return codes
+
+    def write(self, series: pd.Series) -> None:
+        values = np.ascontiguousarray(self._encode(series))
+        self._handle.write(values.tobytes())
+        self.n_rows += values.size
+
+    def close(self) -> Dict[str, Any]:
+        self._handle.seek(0)
+        self._handle.write(_npy_header(self.dtype, self.n_rows))
+        self._handle.close()
+        spec: Dict[str, Any] = {
+            "name": self.name, "file": self.file, "kind": self.kind, "dtype": self.dtype.str,
+        }
+        if self.categories is not None:
+            spec["categories"] = list(self.categories)
+        if self.coerced:
+            spec["coerced_to_nan"] = self.coerced
+        return spec
+
+
+def ingest_dataset(
+    path: PathLike,
+    out_dir: Optional[PathLike] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    float_dtype: str = "float64",
+    overwrite: bool = False,
+) -> Path:
+    """Convert a CSV/Parquet file into a memory-mappable columnar directory.
+
+    The file is streamed once; each column is appended to its own ``.npy``
+    file and a ``schema.json`` records names, encodings and the source
+    fingerprint. Text columns become int32 codes (-1 for missing) with the
+    category labels stored in the schema, and boolean columns int8 codes
+    (0/1, -1 for missing). Re-ingesting an unchanged file is a no-op.
+
+    Args:
+        path: Source CSV/TSV or Parquet file
+        out_dir: Target directory (defaults to ``config.OUTPUTS_DIR / "columnar" / <name>``)
+        chunksize: Number of rows read per chunk
+        float_dtype: Storage dtype for numeric columns
+        overwrite: Rebuild even when an up-to-date conversion exists
+
+    Returns:
+        The directory holding the columnar dataset
+    """
+    source_fingerprint = fingerprint(path)
+    if out_dir is None:
+        out_dir = config.OUTPUTS_DIR / "columnar" / f"{Path(path).stem}-{source_fingerprint[:12]}"
+    out_dir = Path(out_dir)
+
+    if not overwrite and is_columnar(out_dir):
+        schema = json.loads((out_dir / SCHEMA_FILE).read_text())
+        if schema.get("version") == FORMAT_VERSION and schema.get("source_fingerprint") == source_fingerprint:
+            return out_dir
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / SCHEMA_FILE).unlink(missing_ok=True)
+
+    writers: List[_ColumnWriter] = []
+    try:
+        for chunk in iter_chunks(path, chunksize=chunksize):
+            if not writers:
+                writers = [
+                    _ColumnWriter(out_dir, i, str(name), chunk[name], np.dtype(float_dtype))
+                    for i, name in enumerate(chunk.columns)
+                ]
+            for writer, name in zip(writers, chunk.columns):
+                writer.write(chunk[name])
+    finally:
+        specs = [writer.close() for writer in writers]
+
+    schema = {
+        "version": FORMAT_VERSION,
+        "source": str(path),
+        "source_fingerprint": source_fingerprint,
+        "n_rows": writers[0].n_rows if writers else 0,
+        "columns": specs,
+    }
+    # The schema is written last so a partial conversion is never picked up
+    (out_dir / SCHEMA_FILE).write_text(json.dumps(schema, indent=2))
+    return out_dir
+
+
+class ColumnarDataset:
+    """Read-only view of a columnar directory; columns are opened with ``np.load(mmap_mode="r")``.
+
+    Args:
+        root: Directory written by ingest_dataset()
+    """
+
+    def __init__(self, root: PathLike):
+        self.root = Path(root)
+        self.schema = json.loads((self.root / SCHEMA_FILE).read_text())
+        if self.schema.get("version") not in _READABLE_VERSIONS:
+            raise ValueError(f"Unsupported columnar format version: {self.schema.get('version')}")
+        self._specs = {spec["name"]: spec for spec in self.schema["columns"]}
+        self._open: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._specs)
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.schema["n_rows"])
+
+    @property
+    def shape(self):
+        return (self.n_rows, len(self._specs))
+
+    def spec(self, name: str) -> Dict[str, Any]:
+        """Schema entry of a column."""
+        return self._specs[name]
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped raw values of a column (codes for categorical and boolean columns)."""
+        if name not in self._open:
+            self._open[name] = np.load(self.root / self._specs[name]["file"], mmap_mode="r")
+        return self._open[name]
+
+    def series(self, name: str, start: int = 0, stop: Optional[int] = None) -> pd.Series:
+        """Decoded rows ``[start, stop)`` of a column as a pandas Series."""
+        values = self.column(name)[start:stop]
+        spec = self._specs[name]
+        if spec["kind"] == "categorical":
+            values = pd.Categorical.from_codes(values, categories=spec["categories"])
+        elif spec["kind"] == "bool" and values.dtype != np.bool_:
+            values = pd.arrays.BooleanArray(values == 1, values < 0)
+        return pd.Series(values, name=name, copy=False)
+
+    def matrix(
+        self,
+        columns: Optional[List[str]] = None,
+        rows: Optional[np.ndarray] = None,
+        dtype: Any = np.float32,
+    ) -> np.ndarray:
+        """Gather columns (and optionally a sorted row subset) into a 2D array."""
+        columns = self.columns if columns is None else columns
+        n = self.n_rows if rows is None else len(rows)
+        out = np.empty((n, len(columns)), dtype=dtype)
+        for j, name in enumerate(columns):
+            values = self.column(name)
+            out[:, j] = values if rows is None else values[rows]
+        return out
+
+    def stacked(self, columns: Optional[List[str]] = None, dtype: Any = np.float32) -> "ColumnStack":
+        """Lazily stacked 2D view of columns; rows are only read when indexed."""
+        columns = self.columns if columns is None else columns
+        return ColumnStack([self.column(name) for name in columns], dtype=dtype)
+
+    def iter_chunks(
+        self, chunksize: int = DEFAULT_CHUNKSIZE, columns: Optional[List[str]] = None,
+        start: int = 0, stop: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield rows ``[start, stop)`` as DataFrames of at most ``chunksize`` rows."""
+        columns = self.columns if columns is None else columns
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        for begin in range(start, stop, chunksize):
+            end = min(begin + chunksize, stop)
+            yield pd.DataFrame({name: self.series(name, begin, end) for name in columns}, copy=False)
+
+
+class ColumnStack:
+    """2D array-like over equal-length (memory-mapped) columns, stacked only on access.
+
+    ``view[rows]`` and ``view[rows, cols]`` gather just the requested rows of
+    each column into a new ``dtype`` array (rows may be an int, a slice or an
+    index/boolean array); ``np.asarray(view)`` stacks everything. Until then
+    the columns stay on disk, so opening a wide dataset costs nothing.
+
+    Args:
+        columns: 1D arrays of equal length, one per column
+        dtype: dtype of gathered rows
+    """
+
+    ndim = 2
+
+    def __init__(self, columns: List[np.ndarray], dtype: Any = np.float32):
+        self._columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.shape = (len(self._columns[0]) if self._columns else 0, len(self._columns))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(cols, (int, np.integer)):
+            return np.asarray(self._columns[cols][rows], dtype=self.dtype)
+        picked = self._columns[cols] if isinstance(cols, slice) else [self._columns[j] for j in cols]
+        out = np.empty((0, 0), dtype=self.dtype)
+        for j, column in enumerate(picked):
+            values = column[rows]
+            if j == 0:
+                out = np.empty(np.shape(values) + (len(picked),), dtype=self.dtype)
+            out[..., j] = values
+        return out
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        out = self[:]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+def load_array(path: PathLike, columns: Optional[List[str]] = None) -> Union[np.ndarray, ColumnStack]:
+    """Load a 1D/2D array from ``.npy`` (memory-mapped), a columnar directory or a CSV/Parquet file.
+
+    A columnar directory is never copied: one column is returned as its
+    memory map and several as a ColumnStack over the per-column maps.
+    Single-column inputs are returned 1D.
+    """
+    path = Path(path)
+    if is_columnar(path):
+        dataset = ColumnarDataset(path)
+        columns = dataset.columns if columns is None else columns
+        if len(columns) == 1:
+            return dataset.column(columns[0])
+        return dataset.stacked(columns)
+    if path.suffix == ".npy":
+        return np.load(path, mmap_mode="r")
+    frame = pd.concat(iter_chunks(path, columns=columns), ignore_index=True)
+    values = frame.to_numpy()
+    return values[:, 0] if values.shape[1] == 1 else values
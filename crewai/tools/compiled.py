@@ -0,0 +1,334 @@
+"""
+Flat array-backed forests for low-latency inference.
+Packs every tree of a fitted scikit-learn forest into contiguous node arrays and evaluates
+all trees level-synchronously with NumPy, without per-tree Python objects or joblib.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from .treeshap import tree_arrays
+
+# Rows evaluated per block; bounds the (rows, trees) working arrays for large batches
+DEFAULT_BLOCK_ROWS = 4096
+# Levels between checks for finished (row, tree) pairs
+_COMPACT_EVERY = 4
+
+
+def round_down(threshold: np.ndarray, dtype: Any = np.float32) -> np.ndarray:
+    """Largest ``dtype`` value not above each float64 threshold.
+
+    sklearn compares float32 inputs against float64 thresholds; rounding
+    the thresholds down to float32 keeps ``x <= t`` exact for every float32
+    ``x``. Narrower dtypes only misroute inputs between the rounded and the
+    original threshold.
+    """
+    dtype = np.dtype(dtype)
+    rounded = threshold.astype(dtype)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], dtype.type(-np.inf))
+    return rounded
+
+
+def goes_right(
+    x: np.ndarray, node: np.ndarray, threshold: np.ndarray, missing_left: Optional[np.ndarray]
+) -> np.ndarray:
+    """Branch taken at ``node`` by split values ``x``: True for the right child.
+
+    NaN values follow the node's boolean ``missing_left``; pass None when
+    ``x`` is known to hold no NaN.
+    """
+    go_right = x > np.take(threshold, node)
+    if missing_left is not None:
+        missing = np.isnan(x)
+        go_right[missing] = ~np.take(missing_left, node[missing])
+    return go_right
+
+
+class CompiledForest:
+    """A fitted forest as one set of packed node arrays.
+
+    Node ``i`` of tree ``t`` lives at ``roots[t] + i``. A traversal step is
+    one gather-compare-gather for every active (row, tree) pair: the pair's
+    split feature is read from the flattened rows, compared with the
+    threshold, and the result (0 = left, 1 = right) indexes the interleaved
+    child array. Each step advances all pairs of a block by one level;
+    leaves point to themselves, and pairs that reached one are dropped from
+    the active set once they are at least half of it. A NaN feature
+    value takes the node's missing-value branch, as in sklearn >= 1.3.
+
+    The win is per-call overhead, so it is largest for single rows (about
+    30x sklearn's predict) and shrinks with the batch (3-5x at 64 rows);
+    from about a thousand rows sklearn's Cython traversal is faster.
+
+    Args:
+        feature: Split feature per node (int16 when the features fit, else int32)
+        threshold: Split threshold per node (float32, rounded down)
+        children: Global ``(left, right)`` child indices per node, ``(n_nodes, 2)`` int32;
+            leaves point to themselves
+        value: Per-node output, ``(n_nodes, n_outputs)``; class fractions for classifiers
+        roots: Global index of every tree's root (int32)
+        classes: Class labels for classifiers, None for regressors
+        n_features: Number of input features
+        max_depth: Depth of the deepest tree
+        is_leaf: Leaf mask per node (derived from ``children`` when omitted)
+        missing_left: Per node, whether NaN goes left (all right when omitted)
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        classes: Optional[np.ndarray],
+        n_features: int,
+        max_depth: int,
+        is_leaf: Optional[np.ndarray] = None,
+        missing_left: Optional[np.ndarray] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        if is_leaf is None:
+            is_leaf = children[:, 0] == np.arange(children.shape[0], dtype=children.dtype)
+        self.is_leaf = is_leaf
+        if missing_left is None:
+            missing_left = np.zeros(children.shape[0], dtype=bool)
+        self.missing_left = missing_left
+        self._flat_children = children.reshape(-1)
+        self._index_cache: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def n_trees(self) -> int:
+        return self.roots.size
+
+    @property
+    def n_nodes(self) -> int:
+        return self.children.shape[0]
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The packed arrays by name, as accepted by the constructor."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+            "missing_left": self.missing_left,
+        }
+
+    def _index_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """intp copies of the feature and flat child arrays, built on first use.
+
+        Gathers with intp indices skip a cast per step (about 1.4x faster at
+        batch 64), at 24 bytes per node of private memory on top of the
+        (possibly shared, memory-mapped) packed arrays.
+        """
+        if self._index_cache is None:
+            self._index_cache = (self.feature.astype(np.intp), self._flat_children.astype(np.intp))
+        return self._index_cache
+
+    def _walk(self, X: np.ndarray, roots: np.ndarray) -> np.ndarray:
+        """Leaf reached by every row of a float32 matrix in every tree of ``roots``."""
+        n_rows, n_trees = X.shape[0], roots.size
+        flat_X = X.reshape(-1)
+        feature, children = self._index_arrays()
+        take = np.take
+        leaves = np.tile(roots.astype(np.intp), n_rows)
+        # Active (row, tree) pairs: their slot in ``leaves``, current node and row offset in flat_X
+        slot = np.arange(leaves.size)
+        node = leaves.copy()
+        row_start = np.repeat(np.arange(n_rows, dtype=np.intp) * X.shape[1], n_trees)
+        has_missing = bool(np.isnan(flat_X).any())
+        for depth in range(self.max_depth):
+            x = take(flat_X, row_start + take(feature, node))
+            go_right = goes_right(x, node, self.threshold, self.missing_left if has_missing else None)
+            node = take(children, 2 * node + go_right)
+            # Leaves point to themselves, so finished pairs may keep stepping; compacting
+            # pays for itself only once at least half of the active pairs are done
+            if depth % _COMPACT_EVERY == _COMPACT_EVERY - 1:
+                done = take(self.is_leaf, node)
+                if 2 * np.count_nonzero(done) >= node.size:
+                    leaves[slot[done]] = node[done]
+                    active = ~done
+                    slot, node, row_start = slot[active], node[active], row_start[active]
+                    if not node.size:
+                        break
+        leaves[slot] = node
+        return leaves.reshape(n_rows, n_trees)
+
+    def _check_input(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, the forest expects {self.n_features_in_}")
+        return X
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf index reached by every row in every tree, shape ``(n_rows, n_trees)``."""
+        return self._walk(self._check_input(X), self.roots)
+
+    def _mean_value(self, X: np.ndarray, block_rows: int) -> np.ndarray:
+        X = self._check_input(X)
+        out = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], block_rows):
+            leaves = self._walk(X[start:start + block_rows], self.roots)
+            out[start:start + block_rows] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return out
+
+    def predict_proba(self, X: np.ndarray, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+        """Class probabilities averaged over trees, as ``RandomForestClassifier.predict_proba``."""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classification forests")
+        return self._mean_value(X, block_rows)
+
+    def predict(self, X: np.ndarray, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+        """Class labels or regression targets, as the source forest's ``predict``."""
+        mean = self._mean_value(X, block_rows)
+        if self.is_classifier:
+            return self.classes_[mean.argmax(axis=1)]
+        return mean[:, 0] if mean.shape[1] == 1 else mean
+
+    def _early_exit_block(
+        self, X: np.ndarray, chunk_trees: int, confidence: Optional[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_trees = self.n_trees
+        sums = np.zeros((X.shape[0], self.value.shape[1]))
+        evaluated = np.zeros(X.shape[0], dtype=np.int64)
+        active = np.arange(X.shape[0])
+        for start in range(0, n_trees, chunk_trees):
+            stop = min(start + chunk_trees, n_trees)
+            leaves = self._walk(X[active], self.roots[start:stop])
+            sums[active] += self.value[leaves].sum(axis=1, dtype=np.float64)
+            evaluated[active] = stop
+            remaining = n_trees - stop
+            if not remaining or sums.shape[1] < 2:
+                break
+            top_two = np.partition(sums[active], -2, axis=1)[:, -2:]
+            margin = top_two[:, 1] - top_two[:, 0]
+            # Each remaining tree moves the top-two gap by at most 1
+            done = margin > remaining + 1e-9
+            if confidence is not None:
+                # Hoeffding bound on the mean per-tree gap, which lies in [-1, 1]
+                done |= margin / stop > np.sqrt(2.0 * np.log(1.0 / (1.0 - confidence)) / stop)
+            active = active[~done]
+            if not active.size:
+                break
+        return sums.argmax(axis=1), evaluated
+
+    def predict_early_exit(
+        self,
+        X: np.ndarray,
+        chunk_trees: int = 8,
+        confidence: Optional[float] = None,
+        block_rows: int = DEFAULT_BLOCK_ROWS,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Class labels, evaluating trees in chunks and stopping per row once the vote is decided.
+
+        After each chunk of ``chunk_trees`` trees, a row stops when its
+        leading class is ahead of the runner-up by more than the number of
+        trees left: no remaining tree can then change the argmax, so the
+        labels equal predict(). With ``confidence`` (e.g. 0.99) a row also
+        stops when a Hoeffding bound says the mean per-tree margin is
+        positive at that level. Trees are i.i.d. draws, so this matches the
+        full forest with roughly that probability and stops much earlier on
+        rows that are not close calls.
+
+        Args:
+            X: Rows to predict
+            chunk_trees: Trees evaluated between stopping checks
+            confidence: Optional confidence level for the probabilistic stop
+            block_rows: Rows evaluated per block
+
+        Returns:
+            Tuple of the labels and the number of trees evaluated per row;
+            its mean is the average work per prediction
+        """
+        if not self.is_classifier:
+            raise AttributeError("Early-exit voting is only available for classification forests")
+        if confidence is not None and not 0.0 < confidence < 1.0:
+            raise ValueError(f"confidence must be in (0, 1), got {confidence}")
+        X = self._check_input(X)
+        labels = np.empty(X.shape[0], dtype=np.intp)
+        evaluated = np.empty(X.shape[0], dtype=np.int64)
+        for start in range(0, X.shape[0], block_rows):
+            block = slice(start, start + block_rows)
+            labels[block], evaluated[block] = self._early_exit_block(X[block], max(chunk_trees, 1), confidence)
+        return self.classes_[labels], evaluated
+
+
+def pack_trees(
+    trees: List[Dict[str, np.ndarray]], classes: Optional[np.ndarray], n_features: int
+) -> CompiledForest:
+    """Pack per-tree node arrays into one CompiledForest.
+
+    Each tree is a dict in the layout of tree_arrays() (``left``/``right``
+    are -1 at leaves) plus its ``max_depth`` and optionally ``missing_left``.
+    """
+    features, thresholds, children, values, roots, missing = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for a in trees:
+        n = a["left"].size
+        index = np.arange(offset, offset + n)
+        leaf = a["left"] < 0
+        features.append(np.where(leaf, 0, a["feature"]))
+        thresholds.append(np.where(leaf, 0.0, a["threshold"]))
+        children.append(np.column_stack([
+            np.where(leaf, index, a["left"] + offset),
+            np.where(leaf, index, a["right"] + offset),
+        ]))
+        values.append(a["value"])
+        missing.append(np.asarray(a.get("missing_left", np.zeros(n)), dtype=bool) & ~leaf)
+        roots.append(offset)
+        max_depth = max(max_depth, int(a["max_depth"]))
+        offset += n
+
+    feature_dtype = np.int16 if n_features <= np.iinfo(np.int16).max else np.int32
+    if offset > np.iinfo(np.int32).max:
+        raise ValueError(f"Forest has {offset} nodes, more than int32 child offsets can address")
+    return CompiledForest(
+        feature=np.ascontiguousarray(np.concatenate(features), dtype=feature_dtype),
+        threshold=round_down(np.concatenate(thresholds)),
+        children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+        value=np.ascontiguousarray(np.concatenate(values)),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=classes,
+        n_features=n_features,
+        max_depth=max_depth,
+        missing_left=np.concatenate(missing),
+    )
+
+
+def compile_forest(forest: Any) -> CompiledForest:
+    """Pack a fitted ``RandomForestClassifier``/``RandomForestRegressor`` into a CompiledForest.
+
+    Works for any fitted forest whose ``estimators_`` are sklearn decision
+    trees. Multi-output classifiers are not supported. NaN routing is taken
+    from ``missing_go_to_left`` (sklearn >= 1.3).
+    """
+    is_classifier = hasattr(forest, "classes_")
+    if is_classifier and isinstance(forest.classes_, list):
+        raise ValueError("Multi-output classification forests cannot be compiled")
+    trees = [
+        {
+            **tree_arrays(tree, is_classifier),
+            "max_depth": tree.tree_.max_depth,
+            "missing_left": getattr(tree.tree_, "missing_go_to_left", np.zeros(tree.tree_.node_count)),
+        }
+        for tree in forest.estimators_
+    ]
+    classes = np.asarray(forest.classes_) if is_classifier else None
+    return pack_trees(trees, classes, forest.n_features_in_)
@@ -0,0 +1,217 @@
+"""
+Blocked streaming correlation engine for CrewAI ML tools.
+Accumulates covariance blocks over row chunks in float32 under a fixed memory budget.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from .profiling import DEFAULT_CHUNKSIZE, iter_chunks
+
+Source = Union[str, Path, np.ndarray, pd.DataFrame]
+
+# Bytes per strip cell: float64 cross products, a float32 product, a float64 work array and masks
+_STRIP_CELL_BYTES = 22
+# Pairwise-complete strips also hold float64 counts, sums and sums of squares of both columns
+_PAIRWISE_CELL_BYTES = 54
+# Bytes per chunk cell: the chunk, its centred copy, the presence mask and the squares
+_CHUNK_CELL_BYTES = 16
+
+
+def _numeric_columns(frame: pd.DataFrame) -> List[str]:
+    return [
+        name for name in frame.columns
+        if pd.api.types.is_numeric_dtype(frame[name]) and not pd.api.types.is_bool_dtype(frame[name])
+    ]
+
+
+def _chunk_factory(
+    source: Source, columns: Optional[List[str]], chunksize: int
+) -> Callable[[], Iterator[np.ndarray]]:
+    """Return a callable that restarts a float32 chunk iterator over ``source``."""
+    if isinstance(source, (np.ndarray, pd.DataFrame)):
+        values = source[columns].to_numpy() if isinstance(source, pd.DataFrame) else source
+
+        def in_memory() -> Iterator[np.ndarray]:
+            for start in range(0, values.shape[0], chunksize):
+                yield np.asarray(values[start:start + chunksize], dtype=np.float32)
+        return in_memory
+
+    def from_file() -> Iterator[np.ndarray]:
+        for chunk in iter_chunks(source, chunksize=chunksize, columns=columns):
+            yield chunk[columns].to_numpy(dtype=np.float32, na_value=np.nan)
+    return from_file
+
+
+def _finalize_strip(
+    cross: np.ndarray, mean: np.ndarray, var: np.ndarray, n_rows: int, start: int, stop: int
+) -> np.ndarray:
+    """Correlations of a strip from complete-row cross products, computed in place in ``cross``."""
+    work = np.multiply.outer(mean[start:stop], mean[start:])
+    cross /= n_rows
+    cross -= work
+    np.multiply.outer(var[start:stop], var[start:], out=work)
+    np.sqrt(work, out=work)
+    np.divide(cross, work, out=cross, where=work > 0)
+    cross[work <= 0] = 0.0
+    return cross
+
+
+def _finalize_pairwise_strip(cross: np.ndarray, moments: List[np.ndarray]) -> np.ndarray:
+    """Correlations of a strip from pairwise-complete counts and moments, computed in place."""
+    count, sum_a, sum_b, sumsq_a, sumsq_b = moments
+    valid = count >= 2
+    for total in (cross, sum_a, sum_b, sumsq_a, sumsq_b):
+        np.divide(total, count, out=total, where=valid)
+    cov = cross
+    cov -= np.multiply(sum_a, sum_b, out=count)
+    sumsq_a -= np.multiply(sum_a, sum_a, out=sum_a)
+    sumsq_b -= np.multiply(sum_b, sum_b, out=sum_b)
+    denom = np.multiply(sumsq_a, sumsq_b, out=count)
+    np.sqrt(np.maximum(denom, 0.0, out=denom), out=denom)
+    valid &= denom > 0
+    np.divide(cov, denom, out=cov, where=valid)
+    cov[~valid] = 0.0
+    return cov
+
+
+def correlation_pairs(
+    source: Source,
+    threshold: float = 0.8,
+    top_k: int = 100,
+    memory_budget_mb: float = 512.0,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Find the most strongly correlated feature pairs without a dense matrix.
+
+    Columns are centred on the means of the first chunk and cross products are
+    computed in float32 one row chunk at a time. When the full ``p x p``
+    accumulator does not fit in ``memory_budget_mb`` the upper triangle is
+    processed in strips of rows, one pass over the data per strip; the
+    budget covers the chunk, the accumulators and the arrays that turn a
+    strip into correlations.
+
+    Missing values are handled pairwise, as in ``DataFrame.corr()``: each
+    pair uses the rows where both columns are present. Until a chunk with a
+    missing value arrives only cross products are accumulated; from then
+    on per-pair counts, sums and sums of squares are accumulated too (the
+    rows before are complete, so their share comes from the column sums)
+    and strips shrink to fit the extra accumulators.
+
+    Args:
+        source: Dataset file, 2D array or DataFrame
+        threshold: Minimum absolute Pearson correlation to report
+        top_k: Maximum number of pairs returned, strongest first
+        memory_budget_mb: Budget for the accumulators and one chunk of rows
+        chunksize: Upper bound on the rows materialised per chunk
+        columns: Columns to correlate (numeric columns by default)
+
+    Returns:
+        Dict with the column names, sparse ``pairs`` list and pass statistics
+    """
+    if columns is None:
+        if isinstance(source, np.ndarray):
+            columns = [f"feature_{i}" for i in range(source.shape[1])]
+        elif isinstance(source, pd.DataFrame):
+            columns = _numeric_columns(source)
+        else:
+            columns = _numeric_columns(next(iter_chunks(source, chunksize=1_000)))
+    n_features = len(columns)
+    if n_features < 2:
+        return {"columns": columns, "n_rows": 0, "n_passes": 0, "pairs": []}
+
+    budget = int(memory_budget_mb * 1024 * 1024)
+    # A quarter of the budget goes to the chunk being multiplied, the rest to the strip
+    chunk_rows = int(max(1, min(chunksize, budget // 4 // (_CHUNK_CELL_BYTES * n_features))))
+    strip_budget = budget - chunk_rows * _CHUNK_CELL_BYTES * n_features
+    strip_rows = int(max(1, min(n_features, strip_budget // (_STRIP_CELL_BYTES * n_features))))
+    pairwise_rows = int(max(1, min(n_features, strip_budget // (_PAIRWISE_CELL_BYTES * n_features))))
+    chunks = _chunk_factory(source, columns if not isinstance(source, np.ndarray) else None, chunk_rows)
+
+    shift = None
+    n_rows = 0
+    col_sum = np.zeros(n_features)
+    col_sumsq = np.zeros(n_features)
+    has_missing = False
+    best_r = np.empty(0)
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    n_passes = 0
+
+    start = 0
+    while start < n_features:
+        stop = min(start + (pairwise_rows if has_missing else strip_rows), n_features)
+        cross = np.zeros((stop - start, n_features - start))
+        moments = [np.zeros_like(cross) for _ in range(5)] if has_missing else None
+        first_pass = n_passes == 0
+        for block in chunks():
+            if shift is None:
+                shift = np.nan_to_num(np.nanmean(block, axis=0)).astype(np.float32)
+            block = block - shift
+            present = ~np.isnan(block)
+            if moments is None and not present[:, start:].all():
+                # Only the first pass can meet a first missing value; all earlier rows are complete
+                has_missing = True
+                stop = min(stop, start + pairwise_rows)
+                cross = cross[:stop - start].copy()
+                shape = cross.shape
+                moments = [
+                    np.full(shape, float(n_rows)),
+                    np.broadcast_to(col_sum[start:stop, None], shape).copy(),
+                    np.broadcast_to(col_sum[None, start:], shape).copy(),
+                    np.broadcast_to(col_sumsq[start:stop, None], shape).copy(),
+                    np.broadcast_to(col_sumsq[None, start:], shape).copy(),
+                ]
+            np.nan_to_num(block, copy=False)
+            if first_pass:
+                n_rows += block.shape[0]
+                col_sum += block.sum(axis=0, dtype=np.float64)
+                col_sumsq += np.einsum("ij,ij->j", block, block, dtype=np.float64)
+            cross += block[:, start:stop].T @ block[:, start:]
+            if moments is not None:
+                mask = present[:, start:].astype(np.float32)
+                squares = np.square(block[:, start:])
+                width = stop - start
+                moments[0] += mask[:, :width].T @ mask
+                moments[1] += block[:, start:stop].T @ mask
+                moments[2] += mask[:, :width].T @ block[:, start:]
+                moments[3] += squares[:, :width].T @ mask
+                moments[4] += mask[:, :width].T @ squares
+        n_passes += 1
+
+        if n_rows < 2:
+            break
+        if moments is not None:
+            corr = _finalize_pairwise_strip(cross, moments)
+            del moments
+        else:
+            mean = col_sum / n_rows
+            corr = _finalize_strip(cross, mean, col_sumsq / n_rows - mean * mean, n_rows, start, stop)
+
+        # Keep only the strict upper triangle of this strip
+        strong = np.abs(corr) >= threshold
+        strong &= np.arange(start, n_features)[None, :] > np.arange(start, stop)[:, None]
+        rows, cols = np.nonzero(strong)
+        best_r = np.concatenate([best_r, np.clip(corr[rows, cols], -1.0, 1.0)])
+        best_i = np.concatenate([best_i, rows + start])
+        best_j = np.concatenate([best_j, cols + start])
+        if best_r.size > top_k:
+            keep = np.argpartition(-np.abs(best_r), top_k)[:top_k]
+            best_r, best_i, best_j = best_r[keep], best_i[keep], best_j[keep]
+        start = stop
+
+    order = np.argsort(-np.abs(best_r), kind="stable")
+    pairs = [
+        {"feature_a": columns[best_i[k]], "feature_b": columns[best_j[k]], "r": float(best_r[k])}
+        for k in order
+    ]
+    return {
+        "columns": columns,
+        "n_rows": int(n_rows),
+        "n_passes": n_passes,
+        "threshold": threshold,
+        "pairs": pairs,
+    }
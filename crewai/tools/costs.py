@@ -0,0 +1,92 @@
+"""
+Serving-cost measurement for CrewAI ML tools.
+Model size, node count and predict latency of fitted forests, hard cost constraints and Pareto fronts.
+"""
+
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+
+def latency_keys(batch_sizes: Sequence[int]) -> List[str]:
+    """Cost names reported by model_costs() for the given batch sizes."""
+    return [f"latency_{q}_ms_batch{b}" for b in batch_sizes for q in ("p50", "p99")]
+
+
+def cost_keys(batch_sizes: Sequence[int]) -> List[str]:
+    """Every cost name reported by model_costs() for the given batch sizes."""
+    return ["model_bytes", "n_nodes"] + latency_keys(batch_sizes)
+
+
+def model_costs(
+    model: Any, X: np.ndarray, batch_sizes: Sequence[int] = (1,), n_repeats: int = 100
+) -> Dict[str, float]:
+    """Serving costs of a fitted forest.
+
+    Latency is timed with the model's own ``predict`` on the first rows of
+    ``X`` (tiled when ``X`` is shorter than a batch), after one warm-up call,
+    so it includes sklearn's input validation exactly as a server would pay it.
+
+    Args:
+        model: Fitted sklearn forest
+        X: Rows to predict
+        batch_sizes: Batch sizes to time
+        n_repeats: Timed calls per batch size
+
+    Returns:
+        Dict with ``model_bytes`` (pickled size), ``n_nodes`` and
+        ``latency_{p50,p99}_ms_batch{b}`` for every batch size
+    """
+    costs = {
+        "model_bytes": float(len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))),
+        "n_nodes": float(sum(tree.tree_.node_count for tree in model.estimators_)),
+    }
+    X = np.asarray(X)
+    for batch in batch_sizes:
+        rows = X[np.arange(batch) % X.shape[0]]
+        model.predict(rows)
+        timings = np.empty(n_repeats)
+        for i in range(n_repeats):
+            start = time.perf_counter()
+            model.predict(rows)
+            timings[i] = time.perf_counter() - start
+        p50, p99 = np.percentile(timings * 1000.0, [50, 99])
+        costs[f"latency_p50_ms_batch{batch}"] = float(p50)
+        costs[f"latency_p99_ms_batch{batch}"] = float(p99)
+    return costs
+
+
+def constraint_violation(costs: Dict[str, float], constraints: Optional[Dict[str, float]]) -> float:
+    """Summed relative excess over each upper bound; 0.0 when every constraint holds."""
+    if not constraints:
+        return 0.0
+    return float(sum(max(costs[name] / bound - 1.0, 0.0) for name, bound in constraints.items()))
+
+
+def check_constraints(constraints: Optional[Dict[str, float]], batch_sizes: Sequence[int]) -> None:
+    """Reject constraints on costs that model_costs() will not measure."""
+    known = cost_keys(batch_sizes)
+    for name, bound in (constraints or {}).items():
+        if name not in known:
+            raise ValueError(f"Unknown cost constraint '{name}', expected one of {known}")
+        if bound <= 0:
+            raise ValueError(f"Constraint '{name}' needs a positive upper bound, got {bound}")
+
+
+def pareto_front(
+    entries: List[Dict[str, Any]], minimize: Sequence[str], score_key: str = "score"
+) -> List[Dict[str, Any]]:
+    """Entries not dominated on (higher ``score_key``, lower ``entries[i]["costs"][m]`` for m in ``minimize``).
+
+    Returns the front sorted by score, best first.
+    """
+    if not entries:
+        return []
+    # Every objective as a cost to minimise
+    points = np.array([[-e[score_key]] + [e["costs"][m] for m in minimize] for e in entries])
+    no_worse = (points[:, None, :] <= points[None, :, :]).all(axis=2)
+    better = (points[:, None, :] < points[None, :, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    front = [entries[i] for i in np.flatnonzero(~dominated)]
+    return sorted(front, key=lambda e: e[score_key], reverse=True)
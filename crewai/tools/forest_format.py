@@ -0,0 +1,144 @@
+"""
+Compact binary forest format for CrewAI ML tools.
+A versioned single-file layout of CompiledForest node arrays that loads with one read-only
+memory map, so every process on a host shares the same page-cached copy without unpickling.
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Union
+import numpy as np
+
+from .compiled import CompiledForest, compile_forest, round_down
+
+MAGIC = b"RFCF"
+FORMAT_VERSION = 1
+
+# Every array starts on a cache-line boundary
+_ALIGNMENT = 64
+# Magic, format version and header length
+_PREAMBLE = struct.Struct("<4sIQ")
+
+LEAF_DTYPES = ("float64", "float32", "float16")
+THRESHOLD_DTYPES = ("float32", "float16")
+
+PathLike = Union[str, Path]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def save_forest(
+    forest: Any,
+    path: PathLike,
+    leaf_dtype: str = "float32",
+    threshold_dtype: str = "float32",
+) -> Path:
+    """Write a fitted sklearn forest or CompiledForest in the binary forest format.
+
+    The file is a fixed preamble, a JSON header describing every array
+    (dtype, shape, byte offset) and the arrays themselves, each 64-byte
+    aligned. float32 thresholds are exact; float16 thresholds and leaves
+    trade accuracy for size and are rounded down / to nearest respectively.
+
+    Args:
+        forest: Fitted RandomForestClassifier/Regressor or CompiledForest
+        path: Destination file
+        leaf_dtype: One of LEAF_DTYPES
+        threshold_dtype: One of THRESHOLD_DTYPES
+
+    Returns:
+        The written path
+    """
+    if leaf_dtype not in LEAF_DTYPES:
+        raise ValueError(f"Unsupported leaf dtype '{leaf_dtype}', expected one of {LEAF_DTYPES}")
+    if threshold_dtype not in THRESHOLD_DTYPES:
+        raise ValueError(f"Unsupported threshold dtype '{threshold_dtype}', expected one of {THRESHOLD_DTYPES}")
+    compiled = forest if isinstance(forest, CompiledForest) else compile_forest(forest)
+
+    arrays = compiled.arrays()
+    arrays["is_leaf"] = compiled.is_leaf
+    arrays["value"] = arrays["value"].astype(leaf_dtype)
+    if threshold_dtype != "float32":
+        threshold = np.where(compiled.is_leaf, 0.0, arrays["threshold"].astype(np.float64))
+        # sklearn marks splits that separate only the missing values with an inf threshold
+        finite = threshold[np.isfinite(threshold)]
+        if np.abs(finite).max(initial=0.0) > np.finfo(threshold_dtype).max:
+            raise ValueError(f"Thresholds exceed the {threshold_dtype} range; save with threshold_dtype='float32'")
+        arrays["threshold"] = round_down(threshold, threshold_dtype)
+
+    specs: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header = {
+        "version": FORMAT_VERSION,
+        "n_features": int(compiled.n_features_in_),
+        "max_depth": int(compiled.max_depth),
+        "classes": compiled.classes_.tolist() if compiled.is_classifier else None,
+        "arrays": specs,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        handle.write(header_bytes)
+        for name, array in arrays.items():
+            handle.seek(data_start + specs[name]["offset"])
+            handle.write(np.ascontiguousarray(array).tobytes())
+    # Readers never see a partially written file
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_header(path: PathLike) -> Dict[str, Any]:
+    """The JSON header of a forest file, with ``data_start`` added."""
+    with open(path, "rb") as handle:
+        magic, version, header_length = _PREAMBLE.unpack(handle.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a forest file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format version: {version}")
+        header = json.loads(handle.read(header_length).decode("utf-8"))
+    header["data_start"] = _aligned(_PREAMBLE.size + header_length)
+    return header
+
+
+def load_forest(path: PathLike) -> CompiledForest:
+    """Open a forest file as a CompiledForest backed by one read-only memory map.
+
+    No array is copied or deserialized: every node array is a view into the
+    mapping, so loading costs one header read and the pages are shared with
+    every other process that maps the same file.
+    """
+    header = read_header(path)
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {
+        name: np.ndarray(
+            tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=raw,
+            offset=header["data_start"] + spec["offset"],
+        )
+        for name, spec in header["arrays"].items()
+    }
+    classes = header["classes"]
+    return CompiledForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        children=arrays["children"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        classes=np.asarray(classes) if classes is not None else None,
+        n_features=header["n_features"],
+        max_depth=header["max_depth"],
+        is_leaf=arrays["is_leaf"],
+        # Files written before NaN routing was stored send NaN right
+        missing_left=arrays.get("missing_left"),
+    )
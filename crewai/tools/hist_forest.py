@@ -0,0 +1,609 @@
+"""
+Histogram-binned Random Forest training for CrewAI ML tools.
+Features are quantile-binned once into a uint8 matrix; trees are grown level by level from
+per-node class (or target) histograms and returned as a CompiledForest.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+
+from .compiled import CompiledForest, pack_trees
+
+DEFAULT_MAX_BINS = 255
+# Rows of float input converted to bins at a time
+_BIN_BLOCK_ROWS = 65536
+# Most (row, candidate feature) histogram keys built at once during a split search
+_BLOCK_KEYS = 1 << 20
+# Bytes of one level's histograms kept for sibling subtraction on the next level
+_SUBTRACT_BYTES = 64 * 1024 * 1024
+
+
+def resolve_max_features(value: Any, n_features: int) -> int:
+    """Features drawn per split for a ``max_features`` setting, resolved as sklearn does."""
+    if value is None:
+        return n_features
+    if value == "sqrt":
+        return max(1, int(np.sqrt(n_features)))
+    if value == "log2":
+        return max(1, int(np.log2(n_features)))
+    if isinstance(value, float):
+        return max(1, int(value * n_features))
+    return int(value)
+
+
+class FeatureBinner:
+    """Per-feature bin edges mapping float features to at most ``max_bins`` uint8 codes.
+
+    A feature with at most ``max_bins`` distinct values gets the midpoints
+    between them as edges, so its binning is lossless; wider features get
+    quantile edges. Code ``b`` holds ``edges[b-1] < x <= edges[b]``, so a
+    split "code <= b" is the float split "x <= edges[b]". Missing values get
+    their own code, ``missing_code`` (one past the last value code), so they
+    never share a bin with real values and each split can learn which side
+    they go to.
+
+    Args:
+        max_bins: Value codes per feature (at most 255, so the missing code fits in uint8)
+        subsample: Rows used to place the edges
+        random_state: Seed for the row subsample
+    """
+
+    def __init__(self, max_bins: int = DEFAULT_MAX_BINS, subsample: int = 200_000,
+                 random_state: Optional[int] = None):
+        if not 2 <= max_bins <= 255:
+            raise ValueError(f"max_bins must be between 2 and 255, got {max_bins}")
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    @property
+    def missing_code(self) -> int:
+        """Code of missing (NaN) values."""
+        return self.max_bins
+
+    def fit(self, X: Any) -> "FeatureBinner":
+        """Place the edges from (a row sample of) ``X``; ``X`` may be a memory map."""
+        n_rows = X.shape[0]
+        rows = None
+        if n_rows > self.subsample:
+            rng = np.random.default_rng(self.random_state)
+            rows = np.sort(rng.choice(n_rows, size=self.subsample, replace=False))
+        return self.fit_blocks([np.asarray(X[rows] if rows is not None else X, dtype=np.float32)])
+
+    def fit_blocks(self, blocks: Iterable[np.ndarray]) -> "FeatureBinner":
+        """Place the edges from consecutive feature blocks of one row sample.
+
+        Each block holds the sampled rows of the next features in order, so
+        only one block has to be in memory; the edges equal those placed on
+        the whole sample at once.
+        """
+        self.edges_: List[np.ndarray] = [
+            self._column_edges(block[:, j]) for block in blocks for j in range(block.shape[1])
+        ]
+        # Padded table for vectorized threshold lookup; unused slots are never selected
+        self.edge_table_ = np.full((len(self.edges_), self.max_bins), np.inf)
+        for j, edges in enumerate(self.edges_):
+            self.edge_table_[j, :edges.size] = edges
+        self.n_bins_ = np.array([edges.size + 1 for edges in self.edges_])
+        return self
+
+    def _column_edges(self, column: np.ndarray) -> np.ndarray:
+        column = column[~np.isnan(column)]
+        distinct = np.unique(column)
+        if distinct.size <= self.max_bins:
+            return (distinct[:-1].astype(np.float64) + distinct[1:]) / 2.0
+        quantiles = np.linspace(0.0, 1.0, self.max_bins + 1)[1:-1]
+        return np.unique(np.quantile(column, quantiles).astype(np.float64))
+
+    def transform(self, X: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """uint8 codes of ``X``, converted in row blocks so float copies stay small.
+
+        ``out`` is an optional uint8 array of ``X``'s shape to write into (e.g. shared memory).
+        """
+        out = np.empty(X.shape, dtype=np.uint8) if out is None else out
+        for start in range(0, X.shape[0], _BIN_BLOCK_ROWS):
+            block = np.asarray(X[start:start + _BIN_BLOCK_ROWS], dtype=np.float32)
+            for j, edges in enumerate(self.edges_):
+                column = block[:, j]
+                out[start:start + block.shape[0], j] = np.where(
+                    np.isnan(column), self.missing_code, np.searchsorted(edges, column, side="left")
+                )
+        return out
+
+    def fit_transform(self, X: Any) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+
+def _impurity_score(stats: np.ndarray, is_classifier: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Weight and ``sum(stat^2) / weight`` of histogram columns.
+
+    ``stats`` is stat-major, one row per stat: per-class weights for
+    classification, ``(weight, weighted sum of y)`` for regression.
+    Maximising the children's summed score is minimising weighted Gini
+    impurity or squared error respectively.
+    """
+    if is_classifier:
+        weight = stats.sum(axis=0)
+        squares = np.einsum("ij,ij->j", stats, stats)
+    else:
+        weight = stats[0]
+        squares = stats[1] ** 2
+    return weight, np.divide(squares, weight, out=np.zeros_like(squares), where=weight > 0)
+
+
+def _block_splits(
+    slots: np.ndarray,
+    hist: np.ndarray,
+    totals: np.ndarray,
+    parent_score: np.ndarray,
+    n_slots: int,
+    n_bins: int,
+    min_samples_leaf: int,
+    is_classifier: bool,
+) -> Tuple[np.ndarray, ...]:
+    """Best split per node from the occupied histogram bins of one block of candidate features.
+
+    ``slots`` are sorted keys ``(node, feature slot, code)`` and ``hist``
+    their summed stats (one row per stat). A running sum within each (node,
+    feature) segment is the left child of the split after that code. The
+    missing-value code sorts last, so its bin never enters the running sum
+    of a value code; every split is scored with that bin on either side,
+    and when a node has no missing values they follow the heavier child.
+
+    Returns:
+        Nodes with a candidate split and their gain, feature slot, code and missing-goes-left flag
+    """
+    segment, code = np.divmod(slots, n_bins)
+    starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+    lengths = np.diff(np.r_[starts, segment.size])
+    running = np.cumsum(hist, axis=1)
+    before = np.hstack([np.zeros((hist.shape[0], 1)), running[:, starts[1:] - 1]])
+    left = running - np.repeat(before, lengths, axis=1)
+    segment_owner = segment[starts] // n_slots
+    owner = np.repeat(segment_owner, lengths)
+    node_totals = np.repeat(totals[:, segment_owner], lengths, axis=1)
+    node_score = np.repeat(parent_score[segment_owner], lengths)
+
+    def score(side: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        left_weight, left_score = _impurity_score(side, is_classifier)
+        right_weight, right_score = _impurity_score(node_totals - side, is_classifier)
+        gain = left_score + right_score - node_score
+        gain[(left_weight < min_samples_leaf) | (right_weight < min_samples_leaf)] = -np.inf
+        return gain, left_weight >= right_weight
+
+    gain, missing_left = score(left)
+    is_missing = code == n_bins - 1
+    if is_missing.any():
+        # A segment's missing bin is its last entry
+        ends = starts + lengths - 1
+        ends_missing = is_missing[ends]
+        missing = np.zeros((hist.shape[0], starts.size))
+        missing[:, ends_missing] = hist[:, ends[ends_missing]]
+        has_missing = np.repeat(ends_missing, lengths)
+        gain_missing_left, _ = score(left + np.repeat(missing, lengths, axis=1))
+        missing_left = np.where(has_missing, gain_missing_left > gain, missing_left)
+        gain = np.where(has_missing, np.maximum(gain, gain_missing_left), gain)
+        gain[is_missing] = -np.inf
+
+    # Slots are ordered by node, so each node's candidates are one contiguous run
+    node_starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    node_best = np.maximum.reduceat(gain, node_starts)
+    at_best = np.flatnonzero(gain == np.repeat(node_best, np.diff(np.r_[node_starts, gain.size])))
+    first = at_best[np.r_[True, owner[at_best][1:] != owner[at_best][:-1]]]
+    return owner[first], gain[first], segment[first] % n_slots, code[first], missing_left[first]
+
+
+def _best_splits(
+    codes: np.ndarray,
+    rows: np.ndarray,
+    node: np.ndarray,
+    stats: np.ndarray,
+    features: np.ndarray,
+    totals: np.ndarray,
+    n_bins: int,
+    min_samples_leaf: int,
+    is_classifier: bool,
+    subtract: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    keep_histograms: bool = False,
+) -> Tuple[np.ndarray, ...]:
+    """Best (gain, feature, code, missing-goes-left) per node from histograms of all nodes of one level.
+
+    Candidate features are taken a block of slots at a time, sized so at
+    most ``_BLOCK_KEYS`` (row, feature) keys exist at once. Within a block
+    the key ``(node, feature slot, code)`` of every row is counted with one
+    np.bincount() per stat, which yields every node's histograms together;
+    on deep levels, where most of those bins would be empty, the keys are
+    sorted and only occupied bins are summed instead.
+
+    When every node searches all features, ``subtract`` gives for each node
+    the row of the parent histograms (``keep_histograms`` of the previous
+    level) and the node's sibling, or -1 for nodes whose histograms are
+    counted; the rest are the parent's histograms minus the sibling's, so
+    rows of the larger child of each pair are never touched.
+
+    Args:
+        codes: ``(n_rows, n_features)`` C-ordered uint8 bin codes
+        rows: Rows of the searched nodes
+        node: Node (index into ``features``) of each row
+        stats: ``(n_stats, rows.size)`` weighted stats of ``rows``
+        features: ``(n_nodes, n_candidates)`` candidate features per node
+        totals: ``(n_stats, n_nodes)`` summed stats per node
+        n_bins: Codes per feature, including the missing-value code
+        min_samples_leaf: Smallest weighted child allowed
+        is_classifier: Whether ``stats`` are class weights
+        subtract: ``(parent histograms, parent row per node, sibling per node)``
+        keep_histograms: Also return this level's histograms for the next level's subtraction
+
+    Returns:
+        Best gain (-inf without a valid split), feature, code and missing-goes-left flag per
+        node, plus the ``(n_stats, n_nodes, n_features, n_bins)`` histograms or None
+    """
+    n_nodes, n_candidates = features.shape
+    n_stats, n_features = stats.shape[0], codes.shape[1]
+    flat_codes = codes.reshape(-1)
+    # A broadcast feature matrix means every node searches the same features
+    same_features = features.strides[0] == 0
+    dense = n_nodes * n_bins <= 4 * rows.size
+    kept = None
+    if keep_histograms and dense and same_features:
+        if n_stats * n_nodes * n_candidates * n_bins * 8 <= _SUBTRACT_BYTES:
+            kept = np.empty((n_stats, n_nodes, n_candidates, n_bins))
+    derived = None
+    if subtract is not None and dense and same_features:
+        parent_hist, parent_row, sibling = subtract
+        derived = np.flatnonzero(parent_row >= 0)
+        counted = np.flatnonzero(parent_row[node] < 0)
+        rows, node, stats = rows[counted], node[counted], stats[:, counted]
+
+    _, parent_score = _impurity_score(totals, is_classifier)
+    best_gain = np.full(n_nodes, -np.inf)
+    best_feature = np.zeros(n_nodes, dtype=np.intp)
+    best_code = np.zeros(n_nodes, dtype=np.intp)
+    best_missing_left = np.zeros(n_nodes, dtype=bool)
+    # Keys (and, when dense, histogram bins) per candidate slot
+    slot_size = max(rows.size, n_nodes * n_bins if dense else 0, 1)
+    step = max(1, min(n_candidates, _BLOCK_KEYS // slot_size))
+    row_bits = int(rows.size).bit_length()
+    for first in range(0, n_candidates, step):
+        block = slice(first, min(first + step, n_candidates))
+        n_slots = block.stop - block.start
+        if same_features:
+            block_codes = codes[rows][:, features[0, block]]
+        else:
+            block_codes = flat_codes[rows[:, None] * n_features + features[node, block]]
+        keys = block_codes + np.arange(n_slots) * n_bins
+        keys += (node * (n_slots * n_bins))[:, None]
+        keys = keys.ravel()
+        n_keys = n_nodes * n_slots * n_bins
+        if dense:
+            hist = np.vstack([
+                np.bincount(keys, weights=np.repeat(stats[s], n_slots), minlength=n_keys) for s in range(n_stats)
+            ])
+            if derived is not None:
+                hist = hist.reshape(n_stats, n_nodes, n_slots, n_bins)
+                hist[:, derived] = parent_hist[:, parent_row[derived], block] - hist[:, sibling[derived]]
+                hist = hist.reshape(n_stats, n_keys)
+            if kept is not None:
+                kept[:, :, block] = hist.reshape(n_stats, n_nodes, n_slots, n_bins)
+            # Weights are bootstrap counts, so subtraction leaves empty bins at (about) zero
+            weight = hist.sum(axis=0) if is_classifier else hist[0]
+            slots = np.flatnonzero(weight > 0.5)
+            hist = hist[:, slots]
+        else:
+            # Sorting keys with the row packed into the low bits is cheaper than an argsort
+            if n_keys.bit_length() + row_bits < 63:
+                packed = np.sort((keys << row_bits) | np.repeat(np.arange(rows.size), n_slots))
+                keys, key_rows = packed >> row_bits, packed & ((1 << row_bits) - 1)
+            else:
+                order = np.argsort(keys)
+                keys, key_rows = keys[order], order // n_slots
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            slots = keys[starts]
+            hist = np.vstack([np.add.reduceat(np.take(stats[s], key_rows), starts) for s in range(n_stats)])
+
+        owner, gain, slot, code, missing_left = _block_splits(
+            slots, hist, totals, parent_score, n_slots, n_bins, min_samples_leaf, is_classifier
+        )
+        better = gain > best_gain[owner]
+        owner = owner[better]
+        best_gain[owner] = gain[better]
+        best_feature[owner] = features[owner, block.start + slot[better]]
+        best_code[owner] = code[better]
+        best_missing_left[owner] = missing_left[better]
+    return best_gain, best_feature, best_code, best_missing_left, kept
+
+
+def grow_tree(
+    codes: np.ndarray,
+    stats: np.ndarray,
+    sample_counts: np.ndarray,
+    edge_table: np.ndarray,
+    is_classifier: bool,
+    max_features: int,
+    max_depth: Optional[int] = None,
+    min_samples_split: int = 2,
+    min_samples_leaf: int = 1,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, np.ndarray]:
+    """Grow one tree breadth-first on binned features.
+
+    All nodes of a level are split together: candidate features are drawn
+    per node, _best_splits() scores them from the level's histograms, and
+    the rows of split nodes are routed to the next level. Each split also
+    learns where missing values go (the FeatureBinner's missing code is its
+    own bin). Bootstrap multiplicities are row weights, so duplicated rows
+    are never materialised, and ``min_samples_*`` count weighted rows.
+
+    Args:
+        codes: ``(n_rows, n_features)`` uint8 bin codes
+        stats: Per-row histogram stats (one-hot classes, or ``(1, y, y^2)`` for regression)
+        sample_counts: Bootstrap multiplicity of every row (0 = not drawn)
+        edge_table: FeatureBinner.edge_table_, giving the float threshold of each code
+        is_classifier: Whether ``stats`` are class indicators
+        max_features: Candidate features per node
+        max_depth: Depth limit (None for unlimited)
+        min_samples_split: Smallest weighted node that is split
+        min_samples_leaf: Smallest weighted child allowed
+        rng: Random generator for feature draws
+
+    Returns:
+        Node arrays in the layout of tree_arrays() plus ``missing_left`` and ``max_depth``
+    """
+    rng = rng or np.random.default_rng()
+    n_features = codes.shape[1]
+    missing_code = edge_table.shape[1]
+    n_bins = missing_code + 1
+    # Row-major codes are gathered through a flat view
+    codes = np.ascontiguousarray(codes)
+    rows = np.flatnonzero(sample_counts)
+    # Stat-major: gathering a few long rows is much cheaper than gathering many short ones
+    weighted = np.ascontiguousarray((stats[rows] * sample_counts[rows, None]).T)
+    # Split scores only need (weight, sum of y) of regression stats
+    n_hist_stats = weighted.shape[0] if is_classifier else 2
+    node = np.zeros(rows.size, dtype=np.intp)
+    n_level, first_id, depth = 1, 0, 0
+    parent_hist: Optional[np.ndarray] = None
+    levels: List[Dict[str, np.ndarray]] = []
+
+    while n_level:
+        totals = np.column_stack([
+            np.bincount(node, weights=weighted[s], minlength=n_level) for s in range(weighted.shape[0])
+        ])
+        weight = totals.sum(axis=1) if is_classifier else totals[:, 0]
+        value = totals / weight[:, None] if is_classifier else (totals[:, 1] / weight)[:, None]
+        level = {
+            "left": np.full(n_level, -1, dtype=np.intp),
+            "right": np.full(n_level, -1, dtype=np.intp),
+            "feature": np.full(n_level, -2, dtype=np.intp),
+            "threshold": np.full(n_level, -2.0),
+            "value": value,
+            "missing_left": np.zeros(n_level, dtype=bool),
+        }
+        levels.append(level)
+
+        splittable = weight >= max(min_samples_split, 2 * min_samples_leaf)
+        if is_classifier:
+            splittable &= totals.max(axis=1) < weight
+        else:
+            variance = totals[:, 2] / weight - (totals[:, 1] / weight) ** 2
+            splittable &= variance > 1e-7 * np.maximum((totals[:, 1] / weight) ** 2, 1.0)
+        if max_depth is not None and depth >= max_depth:
+            splittable[:] = False
+        candidates = np.flatnonzero(splittable)
+        split = np.zeros(n_level, dtype=bool)
+        split_code = np.zeros(n_level, dtype=np.intp)
+        histograms = None
+        if candidates.size:
+            def search(nodes: np.ndarray, features: np.ndarray, **kwargs: Any) -> Tuple[Any, ...]:
+                position = np.full(n_level, -1, dtype=np.intp)
+                position[nodes] = np.arange(nodes.size)
+                active = np.flatnonzero(position[node] >= 0)
+                return _best_splits(
+                    codes, rows[active], position[node[active]], weighted[:n_hist_stats, active], features,
+                    totals[nodes, :n_hist_stats].T, n_bins, min_samples_leaf, is_classifier, **kwargs,
+                )
+
+            all_features = np.arange(n_features)
+            subtract = None
+            if max_features >= n_features:
+                features = np.broadcast_to(all_features, (candidates.size, n_features))
+                if parent_hist is not None:
+                    # Count the smaller child of each pair whose nodes are both searched; derive the other
+                    local = np.full(n_level, -1, dtype=np.intp)
+                    local[candidates] = np.arange(candidates.size)
+                    sibling = local[candidates ^ 1]
+                    n_rows_node = np.bincount(node, minlength=n_level)
+                    larger = n_rows_node[candidates] > n_rows_node[candidates ^ 1]
+                    larger |= (n_rows_node[candidates] == n_rows_node[candidates ^ 1]) & (candidates % 2 == 1)
+                    parent_row = np.where((sibling >= 0) & larger, candidates // 2, -1)
+                    subtract = (parent_hist, parent_row, sibling)
+            else:
+                draws = rng.random((candidates.size, n_features), dtype=np.float32)
+                features = np.argpartition(draws, max_features - 1, axis=1)[:, :max_features]
+            gain, feature, code, missing_left, histograms = search(
+                candidates, features, subtract=subtract, keep_histograms=max_features >= n_features
+            )
+            # Like sklearn, keep looking beyond max_features when every drawn feature is constant
+            retry = ~np.isfinite(gain)
+            if retry.any() and max_features < n_features:
+                retried = search(candidates[retry], np.broadcast_to(all_features, (int(retry.sum()), n_features)))
+                gain[retry], feature[retry], code[retry], missing_left[retry] = retried[:4]
+            # As in sklearn, impure nodes split even without impurity decrease (e.g. XOR patterns)
+            chosen = np.isfinite(gain)
+            split[candidates[chosen]] = True
+            level["feature"][candidates[chosen]] = feature[chosen]
+            level["threshold"][candidates[chosen]] = edge_table[feature[chosen], code[chosen]]
+            level["missing_left"][candidates[chosen]] = missing_left[chosen]
+            split_code[candidates[chosen]] = code[chosen]
+            if histograms is not None:
+                histograms = histograms[:, chosen]
+        parent_hist = histograms
+
+        n_split = int(split.sum())
+        rank = np.cumsum(split) - 1
+        next_first = first_id + n_level
+        level["left"][split] = next_first + 2 * rank[split]
+        level["right"][split] = next_first + 2 * rank[split] + 1
+
+        keep = split[node]
+        rows, weighted, node = rows[keep], weighted[:, keep], node[keep]
+        if n_split:
+            row_codes = codes[rows, level["feature"][node]]
+            go_right = row_codes > split_code[node]
+            missing = row_codes == missing_code
+            go_right[missing] = ~level["missing_left"][node[missing]]
+            node = 2 * rank[node] + go_right
+        first_id, n_level = next_first, 2 * n_split
+        depth += 1
+
+    tree = {name: np.concatenate([level[name] for level in levels]) for name in levels[0]}
+    tree["max_depth"] = len(levels) - 1
+    return tree
+
+
+class _HistForest:
+    """Random Forest trained on uint8 histogram bins, predicting through a CompiledForest.
+
+    ``fit`` bins the features once with a FeatureBinner (8x smaller than
+    float64, 4x smaller than sklearn's float32 copy) and grows every tree
+    with grow_tree(), so no node ever sorts its rows. Thresholds map back
+    to float edges, so the fitted forest predicts on raw features and can
+    be written with save_forest().
+
+    Args:
+        n_estimators: Number of trees
+        max_depth: Depth limit (None for unlimited)
+        min_samples_split: Smallest weighted node that is split (a float is a fraction of the rows)
+        min_samples_leaf: Smallest weighted child allowed (a float is a fraction of the rows)
+        max_features: Candidate features per node ("sqrt", "log2", int, float, None for
+            all, or "auto" for "sqrt" in classification and all features in regression)
+        max_bins: Value bins per feature (at most 255; missing values get a bin of their own)
+        bootstrap: Draw a bootstrap sample per tree
+        max_samples: Bootstrap size as a fraction (float) or count (int) of rows
+        random_state: Seed for binning, bootstraps and feature draws
+    """
+
+    _is_classifier = True
+    _default_max_features: Any = "sqrt"
+
+    def __init__(
+        self,
+        n_estimators: int = 100,
+        max_depth: Optional[int] = None,
+        min_samples_split: Union[int, float] = 2,
+        min_samples_leaf: Union[int, float] = 1,
+        max_features: Any = "auto",
+        max_bins: int = DEFAULT_MAX_BINS,
+        bootstrap: bool = True,
+        max_samples: Any = None,
+        random_state: Optional[int] = None,
+    ):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.max_features = self._default_max_features if max_features == "auto" else max_features
+        self.max_bins = max_bins
+        self.bootstrap = bootstrap
+        self.max_samples = max_samples
+        self.random_state = random_state
+
+    def _encode_targets(self, y: np.ndarray) -> np.ndarray:
+        """Class indices (setting ``classes_``) or float64 targets."""
+        if self._is_classifier:
+            self.classes_, encoded = np.unique(y, return_inverse=True)
+            return encoded
+        return y.astype(np.float64)
+
+    def _row_stats(self, targets: np.ndarray) -> np.ndarray:
+        """Per-row histogram stats of encoded targets, as grow_tree() expects them."""
+        if self._is_classifier:
+            stats = np.zeros((targets.size, self.classes_.size))
+            stats[np.arange(targets.size), targets] = 1.0
+            return stats
+        return np.column_stack([np.ones(targets.size), targets, targets ** 2])
+
+    def _n_draws(self, n_rows: int) -> int:
+        """Bootstrap sample size for ``n_rows`` training rows."""
+        if self.max_samples is None:
+            return n_rows
+        if isinstance(self.max_samples, float):
+            return max(1, int(round(self.max_samples * n_rows)))
+        return int(self.max_samples)
+
+    def _sample_counts(self, n_rows: int, rng: np.random.Generator) -> np.ndarray:
+        if not self.bootstrap:
+            return np.ones(n_rows, dtype=np.float64)
+        draws = rng.integers(0, n_rows, size=self._n_draws(n_rows))
+        return np.bincount(draws, minlength=n_rows).astype(np.float64)
+
+    def fit(self, X: Any, y: Any) -> "_HistForest":
+        """Bin ``X`` (array or memory map) and grow ``n_estimators`` trees."""
+        y = np.asarray(y).ravel()
+        self.binner_ = FeatureBinner(self.max_bins, random_state=self.random_state).fit(X)
+        codes = self.binner_.transform(X)
+        return self.fit_binned(codes, y)
+
+    def fit_binned(self, codes: np.ndarray, y: Any) -> "_HistForest":
+        """Grow the trees on codes from this forest's already fitted ``binner_``."""
+        y = np.asarray(y).ravel()
+        stats = self._row_stats(self._encode_targets(y))
+        n_features = codes.shape[1]
+        rng = np.random.default_rng(self.random_state)
+        trees = [
+            self._grow_tree(codes, stats, self._sample_counts(codes.shape[0], rng), rng)
+            for _ in range(self.n_estimators)
+        ]
+        return self._set_trees(trees, n_features)
+
+    def _min_samples(self, n_rows: int) -> Tuple[int, int]:
+        """``min_samples_split`` and ``min_samples_leaf`` as counts; floats are fractions of ``n_rows`` as in sklearn."""
+        split, leaf = self.min_samples_split, self.min_samples_leaf
+        if isinstance(split, float):
+            split = max(2, int(np.ceil(split * n_rows)))
+        if isinstance(leaf, float):
+            leaf = int(np.ceil(leaf * n_rows))
+        return int(split), int(leaf)
+
+    def _grow_tree(
+        self, codes: np.ndarray, stats: np.ndarray, sample_counts: np.ndarray, rng: np.random.Generator,
+        n_rows: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Grow one tree; ``n_rows`` is the training set size when ``codes`` hold only a tree's sample."""
+        n_features = codes.shape[1]
+        max_features = min(resolve_max_features(self.max_features, n_features), n_features)
+        min_samples_split, min_samples_leaf = self._min_samples(codes.shape[0] if n_rows is None else n_rows)
+        return grow_tree(
+            codes, stats, sample_counts, self.binner_.edge_table_, self._is_classifier, max_features,
+            self.max_depth, min_samples_split, min_samples_leaf, rng,
+        )
+
+    def _set_trees(self, trees: List[Dict[str, np.ndarray]], n_features: int) -> "_HistForest":
+        self.n_features_in_ = n_features
+        self.forest_ = pack_trees(trees, self.classes_ if self._is_classifier else None, n_features)
+        return self
+
+    @property
+    def compiled(self) -> CompiledForest:
+        """The fitted trees as a CompiledForest (for save_forest() or early-exit voting)."""
+        return self.forest_
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.forest_.predict(X)
+
+
+class HistRandomForestClassifier(_HistForest):
+    """Histogram-binned Random Forest classifier (Gini splits); see _HistForest."""
+
+    _is_classifier = True
+    _default_max_features = "sqrt"
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self.forest_.predict_proba(X)
+
+
+class HistRandomForestRegressor(_HistForest):
+    """Histogram-binned Random Forest regressor (squared-error splits); see _HistForest."""
+
+    _is_classifier = False
+    _default_max_features = 1.0
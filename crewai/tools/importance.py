@@ -0,0 +1,283 @@
+"""
+Feature importance engines for CrewAI ML tools.
+Parallel permutation importance over a shared-memory evaluation matrix, per feature or per correlated group.
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+from .correlation import correlation_pairs
+from .metrics import classification_metrics, regression_metrics
+from .shared_arrays import SharedArray
+
+try:
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+except ImportError:
+    # scipy not installed, fall back to connected components
+    linkage = None
+
+SCORINGS = ("accuracy", "balanced_accuracy", "r2", "neg_mean_squared_error")
+
+# Forests whose output is the plain mean of their trees' outputs on all features,
+# so one tree's contribution can be swapped out (unlike boosting or feature-subsampled bagging)
+_AVERAGED_FORESTS = (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+
+
+def score_predictions(
+    y_true: np.ndarray, output: np.ndarray, scoring: str, classes: Optional[np.ndarray]
+) -> float:
+    """Score class probabilities (classifiers) or predictions (regressors)."""
+    if classes is not None:
+        y_pred = classes[np.asarray(output).argmax(axis=1)]
+        metrics = classification_metrics(y_true, y_pred)
+        return metrics[scoring]
+    metrics = regression_metrics(y_true, np.asarray(output).ravel())
+    if scoring == "neg_mean_squared_error":
+        return -metrics["mse"]
+    return metrics[scoring]
+
+
+def encode_classes(y: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """Indices of ``y`` in the sorted ``classes`` (-1 for labels the model never saw)."""
+    codes = np.minimum(np.searchsorted(classes, y), len(classes) - 1)
+    return np.where(classes[codes] == y, codes, -1)
+
+
+def _model_output(model: Any, X: np.ndarray) -> np.ndarray:
+    return model.predict_proba(X) if hasattr(model, "classes_") else model.predict(X)
+
+
+def _tree_output(tree: Any, X: np.ndarray, is_classifier: bool) -> np.ndarray:
+    if is_classifier:
+        return tree.predict_proba(X, check_input=False)
+    return tree.predict(X, check_input=False)
+
+
+# Per-worker state, set once by _init_worker
+_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(x_spec, y_spec, base_spec, model_bytes, scoring, batch_rows) -> None:
+    model = pickle.loads(model_bytes)
+    x_shm, X = SharedArray.attach(x_spec)
+    y_shm, y = SharedArray.attach(y_spec)
+    base_shm, base = SharedArray.attach(base_spec)
+    is_classifier = hasattr(model, "classes_")
+
+    tree_features = None
+    if isinstance(model, _AVERAGED_FORESTS):
+        tree_features = [set(t.tree_.feature[t.tree_.feature >= 0].tolist()) for t in model.estimators_]
+
+    _STATE.update(
+        model=model, X=X, y=y, base=base, shms=(x_shm, y_shm, base_shm),
+        classes=np.arange(len(model.classes_)) if is_classifier else None, is_classifier=is_classifier,
+        scoring=scoring, tree_features=tree_features,
+        buffer=np.empty((min(batch_rows, X.shape[0]), X.shape[1]), dtype=X.dtype),
+    )
+
+
+def _permuted_score(columns: Sequence[int], seed: int) -> Tuple[float, int]:
+    """Score the model with ``columns`` permuted together; returns (score, trees evaluated)."""
+    state = _STATE
+    X, base, model, buffer = state["X"], state["base"], state["model"], state["buffer"]
+    n = X.shape[0]
+    permutation = np.random.default_rng(seed).permutation(n)
+    columns = np.asarray(columns, dtype=np.intp)
+
+    # Trees that never split on the permuted columns keep their baseline output
+    affected = None
+    n_trees = len(model.estimators_) if state["tree_features"] is not None else 0
+    if state["tree_features"] is not None:
+        wanted = set(columns.tolist())
+        affected = [t for t, used in enumerate(state["tree_features"]) if used & wanted]
+        if 2 * len(affected) >= n_trees:
+            affected = None
+
+    if affected is not None and not affected:
+        return score_predictions(state["y"], base, state["scoring"], state["classes"]), 0
+
+    output = np.empty_like(base)
+    for start in range(0, n, buffer.shape[0]):
+        stop = min(start + buffer.shape[0], n)
+        batch = buffer[:stop - start]
+        batch[...] = X[start:stop]
+        batch[:, columns] = X[permutation[start:stop][:, None], columns]
+        if affected is None:
+            output[start:stop] = _model_output(model, batch).reshape(stop - start, -1)
+            continue
+        delta = np.zeros((stop - start, base.shape[1]))
+        original = X[start:stop]
+        for t in affected:
+            tree = model.estimators_[t]
+            delta += _tree_output(tree, batch, state["is_classifier"]).reshape(stop - start, -1)
+            delta -= _tree_output(tree, original, state["is_classifier"]).reshape(stop - start, -1)
+        output[start:stop] = base[start:stop] + delta / n_trees
+
+    evaluated = n_trees if affected is None else 2 * len(affected)
+    return score_predictions(state["y"], output, state["scoring"], state["classes"]), evaluated
+
+
+def permutation_importance(
+    model: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    n_repeats: int = 5,
+    scoring: Optional[str] = None,
+    n_jobs: int = -1,
+    random_state: Optional[int] = None,
+    batch_rows: int = 8192,
+    groups: Optional[List[List[int]]] = None,
+) -> Dict[str, Any]:
+    """Permutation importance fanned out over a process pool.
+
+    ``X``, ``y`` and the baseline model output are copied once into shared
+    memory. Each ``(group, repeat)`` work item permutes its columns inside a
+    private ``batch_rows x n_features`` buffer, so no worker ever copies the
+    whole matrix. For random forests and extra trees only the trees that
+    split on the permuted columns are re-evaluated; the rest reuse the
+    baseline output.
+
+    Args:
+        model: Fitted estimator (random forests and extra trees get the tree-reuse shortcut)
+        X: Evaluation features
+        y: Evaluation targets
+        n_repeats: Permutations per feature (or group)
+        scoring: One of SCORINGS (accuracy for classifiers, r2 for regressors by default)
+        n_jobs: Number of worker processes (-1 for all cores)
+        random_state: Seed for the permutations
+        batch_rows: Rows per private working buffer
+        groups: Column index groups permuted together (one group per feature by default)
+
+    Returns:
+        Dict with baseline score, per-group mean/std importances and raw scores
+    """
+    is_classifier = hasattr(model, "classes_")
+    scoring = scoring or ("accuracy" if is_classifier else "r2")
+    if scoring not in SCORINGS:
+        raise ValueError(f"Unsupported scoring '{scoring}', expected one of {SCORINGS}")
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y).ravel()
+    if is_classifier:
+        # Workers get class indices: labels may be strings/objects, which cannot live in shared memory
+        y, classes = encode_classes(y, model.classes_), np.arange(len(model.classes_))
+    else:
+        y, classes = y.astype(np.float64), None
+    groups = groups if groups is not None else [[j] for j in range(X.shape[1])]
+    base = np.asarray(_model_output(model, X), dtype=np.float64).reshape(X.shape[0], -1)
+    baseline = score_predictions(y, base, scoring, classes)
+
+    seeds = np.random.default_rng(random_state).integers(0, 2**31 - 1, size=(len(groups), n_repeats))
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(n_jobs, 1)
+
+    shared = [SharedArray.copy_of(X), SharedArray.copy_of(y), SharedArray.copy_of(base)]
+    try:
+        initargs = (
+            shared[0].spec, shared[1].spec, shared[2].spec,
+            pickle.dumps(model), scoring, batch_rows,
+        )
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=initargs) as pool:
+            futures = {
+                (g, r): pool.submit(_permuted_score, groups[g], int(seeds[g, r]))
+                for g in range(len(groups)) for r in range(n_repeats)
+            }
+            results = {key: future.result() for key, future in futures.items()}
+    finally:
+        for array in shared:
+            array.close()
+
+    scores = np.array([[results[g, r][0] for r in range(n_repeats)] for g in range(len(groups))])
+    drops = baseline - scores
+    return {
+        "scoring": scoring,
+        "baseline_score": float(baseline),
+        "importances_mean": drops.mean(axis=1),
+        "importances_std": drops.std(axis=1),
+        "scores": scores,
+        "groups": groups,
+        "trees_evaluated": int(sum(result[1] for result in results.values())),
+    }
+
+
+def pairs_to_matrix(pairs: List[Dict[str, Any]], columns: List[str]) -> np.ndarray:
+    """Dense |r| matrix from the sparse output of correlation_pairs(); absent pairs are 0."""
+    index = {name: i for i, name in enumerate(columns)}
+    abs_corr = np.eye(len(columns))
+    for pair in pairs:
+        i, j = index[pair["feature_a"]], index[pair["feature_b"]]
+        abs_corr[i, j] = abs_corr[j, i] = abs(pair["r"])
+    return abs_corr
+
+
+def correlation_clusters(abs_corr: np.ndarray, threshold: float = 0.7) -> List[List[int]]:
+    """Group features whose absolute correlation links them above ``threshold``.
+
+    Uses single-linkage hierarchical clustering on ``1 - |r|`` cut at
+    ``1 - threshold``, i.e. the connected components of the ``|r| >=
+    threshold`` graph (computed directly without scipy). Only pairs at or
+    above ``threshold`` affect the clusters, so the thresholded matrix of
+    pairs_to_matrix() gives the same clusters as the full one.
+    """
+    n = abs_corr.shape[0]
+    if n < 2:
+        return [[j] for j in range(n)]
+    if linkage is not None:
+        distance = np.clip(1.0 - abs_corr, 0.0, 1.0)
+        np.fill_diagonal(distance, 0.0)
+        tree = linkage(squareform(distance, checks=False), method="single")
+        labels = fcluster(tree, t=1.0 - threshold, criterion="distance")
+    else:
+        labels = np.arange(n)
+        for i, j in zip(*np.nonzero(np.triu(abs_corr >= threshold, k=1))):
+            old, new = labels[j], labels[i]
+            if old != new:
+                labels[labels == old] = new
+    clusters: Dict[int, List[int]] = {}
+    for j, label in enumerate(labels):
+        clusters.setdefault(int(label), []).append(j)
+    return sorted(clusters.values())
+
+
+def grouped_permutation_importance(
+    model: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    threshold: float = 0.7,
+    abs_corr: Optional[np.ndarray] = None,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Permutation importance of correlated feature clusters.
+
+    Features are clustered from ``abs_corr`` (computed with the blocked
+    correlation engine when not supplied, e.g. from a cache) and each
+    cluster is permuted as a whole with one shared row permutation. This
+    keeps correlated features from masking each other and needs only
+    ``n_clusters`` re-scorings per repeat instead of ``n_features``.
+
+    Args:
+        model: Fitted estimator
+        X: Evaluation features
+        y: Evaluation targets
+        threshold: Minimum |r| linking two features into one cluster
+        abs_corr: Optional precomputed ``(n_features, n_features)`` |r| matrix
+        **kwargs: Passed on to permutation_importance()
+
+    Returns:
+        permutation_importance() result with one entry per cluster
+    """
+    if abs_corr is None:
+        columns = [f"feature_{i}" for i in range(X.shape[1])]
+        found = correlation_pairs(np.asarray(X), threshold=threshold, top_k=X.shape[1] ** 2)
+        abs_corr = pairs_to_matrix(found["pairs"], columns)
+    clusters = correlation_clusters(abs_corr, threshold)
+    return permutation_importance(model, X, y, groups=clusters, **kwargs)
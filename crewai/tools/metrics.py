@@ -0,0 +1,458 @@
+"""
+Vectorized evaluation metrics for CrewAI ML tools.
+Derives every classification metric from one bincount confusion matrix and all regression errors from one residual sweep.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+def encode_labels(y_true: np.ndarray, y_pred: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Map true and predicted labels onto shared integer codes ``0..k-1``."""
+    y_true, y_pred = np.asarray(y_true).ravel(), np.asarray(y_pred).ravel()
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"y_true and y_pred lengths differ: {y_true.size} vs {y_pred.size}")
+    labels = np.union1d(np.unique(y_true), np.unique(y_pred))
+    return labels, np.searchsorted(labels, y_true), np.searchsorted(labels, y_pred)
+
+
+def confusion_matrix(true_codes: np.ndarray, pred_codes: np.ndarray, n_classes: int) -> np.ndarray:
+    """Confusion matrix (rows = true, columns = predicted) from a single bincount."""
+    flat = true_codes.astype(np.int64) * n_classes + pred_codes
+    return np.bincount(flat, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def metrics_from_confusion(cm: np.ndarray) -> Dict[str, Any]:
+    """Accuracy and per-class/averaged precision, recall and F1 from a confusion matrix.
+
+    Works on a single ``(k, k)`` matrix or a stack of shape ``(..., k, k)``,
+    which is how the bootstrap reuses it.
+    """
+    cm = np.asarray(cm, dtype=np.float64)
+    tp = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+    total = support.sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        weights = support / total[..., None]
+        present = support > 0
+        balanced = (recall * present).sum(axis=-1) / present.sum(axis=-1)
+
+    return {
+        "accuracy": tp.sum(axis=-1) / total,
+        "balanced_accuracy": balanced,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "support": support,
+        "macro_precision": precision.mean(axis=-1),
+        "macro_recall": recall.mean(axis=-1),
+        "macro_f1": f1.mean(axis=-1),
+        "weighted_precision": (precision * weights).sum(axis=-1),
+        "weighted_recall": (recall * weights).sum(axis=-1),
+        "weighted_f1": (f1 * weights).sum(axis=-1),
+    }
+
+
+def roc_curve(y_binary: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Exact ROC curve (fpr, tpr, thresholds) from one descending sort of the scores."""
+    y_binary = np.asarray(y_binary).ravel().astype(bool)
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    order = np.argsort(-scores, kind="mergesort")
+    scores, y_binary = scores[order], y_binary[order]
+    last_of_run = np.r_[np.nonzero(np.diff(scores))[0], scores.size - 1]
+    tps = np.cumsum(y_binary)[last_of_run]
+    fps = last_of_run + 1 - tps
+    tpr = np.r_[0.0, tps / max(tps[-1], 1)]
+    fpr = np.r_[0.0, fps / max(fps[-1], 1)]
+    return fpr, tpr, np.r_[np.inf, scores[last_of_run]]
+
+
+def auc(x: np.ndarray, y: np.ndarray) -> float:
+    """Area under a curve by the trapezoidal rule."""
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+
+def roc_auc(true_codes: np.ndarray, scores: np.ndarray, n_classes: int) -> Optional[float]:
+    """Binary ROC AUC, or the macro one-vs-rest AUC for multiclass score matrices."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if n_classes < 2:
+        return None
+    if n_classes == 2:
+        positive = scores[:, 1] if scores.ndim == 2 else scores
+        fpr, tpr, _ = roc_curve(true_codes == 1, positive)
+        return auc(fpr, tpr)
+    if scores.ndim != 2 or scores.shape[1] != n_classes:
+        return None
+    per_class = []
+    for k in range(n_classes):
+        positives = true_codes == k
+        if positives.any() and not positives.all():
+            fpr, tpr, _ = roc_curve(positives, scores[:, k])
+            per_class.append(auc(fpr, tpr))
+    return float(np.mean(per_class)) if per_class else None
+
+
+def _jsonable(summary: Dict[str, Any], labels: np.ndarray) -> Dict[str, Any]:
+    per_class = {
+        str(label): {
+            "precision": float(summary["precision"][i]),
+            "recall": float(summary["recall"][i]),
+            "f1": float(summary["f1"][i]),
+            "support": int(summary["support"][i]),
+        }
+        for i, label in enumerate(labels)
+    }
+    scalars = {key: float(value) for key, value in summary.items() if np.ndim(value) == 0}
+    return {**scalars, "per_class": per_class}
+
+
+def classification_metrics(
+    y_true: np.ndarray, y_pred: np.ndarray, y_score: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """All classification metrics from one pass over the predictions.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        y_score: Optional positive-class scores (binary) or ``(n, k)`` class probabilities
+
+    Returns:
+        Dict with scalar metrics, per-class metrics, confusion matrix and ROC AUC
+    """
+    labels, true_codes, pred_codes = encode_labels(y_true, y_pred)
+    cm = confusion_matrix(true_codes, pred_codes, labels.size)
+    result = _jsonable(metrics_from_confusion(cm), labels)
+    result["labels"] = [str(label) for label in labels]
+    result["confusion_matrix"] = cm.tolist()
+    if y_score is not None:
+        result["roc_auc"] = roc_auc(true_codes, y_score, labels.size)
+    return result
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Any]:
+    """MSE, RMSE, MAE, R², explained variance, max error and MAPE from one residual sweep."""
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"y_true and y_pred lengths differ: {y_true.size} vs {y_pred.size}")
+
+    n = y_true.size
+    residual = y_pred - y_true
+    abs_residual = np.abs(residual)
+    sse = float(residual @ residual)
+    sst = float(np.square(y_true - y_true.mean()).sum())
+    residual_var = float(np.square(residual - residual.mean()).sum())
+    nonzero = y_true != 0
+
+    return {
+        "mse": sse / n,
+        "rmse": float(np.sqrt(sse / n)),
+        "mae": float(abs_residual.mean()),
+        "median_absolute_error": float(np.median(abs_residual)),
+        "max_error": float(abs_residual.max()),
+        "r2": 1 - sse / sst if sst > 0 else None,
+        "explained_variance": 1 - residual_var / sst if sst > 0 else None,
+        "mape": float((abs_residual[nonzero] / np.abs(y_true[nonzero])).mean()) if nonzero.any() else None,
+        "mean_residual": float(residual.mean()),
+        "n_samples": int(n),
+    }
+
+
+def train_test_gap(train: Dict[str, Any], test: Dict[str, Any]) -> Dict[str, float]:
+    """Difference (train - test) for every scalar metric present in both results."""
+    return {
+        key: train[key] - test[key]
+        for key, value in test.items()
+        if isinstance(value, float) and isinstance(train.get(key), float)
+    }
+
+
+class ScoreHistogram:
+    """Per-class score histograms for streaming ROC/PR curves of a binary model.
+
+    Scores are counted into fixed bins chunk by chunk, so memory is constant
+    in the number of rows and histograms from several workers can be merged.
+    All scores inside a bin are treated as tied, which bounds the AUC error
+    by half the fraction of positive/negative pairs that share a bin. NaN
+    scores are not binned; they are counted in ``n_missing`` and left out
+    of the curves.
+
+    Args:
+        n_bins: Number of equal-width bins over ``score_range``
+        score_range: Score interval covered by the bins (values outside are clipped)
+        edges: Explicit increasing bin edges, overriding ``n_bins``/``score_range``
+    """
+
+    def __init__(
+        self,
+        n_bins: int = 4096,
+        score_range: Tuple[float, float] = (0.0, 1.0),
+        edges: Optional[np.ndarray] = None,
+    ):
+        if edges is not None:
+            self.edges = np.asarray(edges, dtype=np.float64)
+        else:
+            self.edges = np.linspace(score_range[0], score_range[1], n_bins + 1)
+        self._uniform = edges is None
+        n = self.edges.size - 1
+        self.positives = np.zeros(n, dtype=np.int64)
+        self.negatives = np.zeros(n, dtype=np.int64)
+        self.n_missing = 0
+
+    @classmethod
+    def adaptive(cls, sample_scores: np.ndarray, n_bins: int = 4096) -> "ScoreHistogram":
+        """Histogram whose bin edges are quantiles of a score sample (e.g. the first chunk)."""
+        sample = np.asarray(sample_scores, dtype=np.float64).ravel()
+        sample = sample[~np.isnan(sample)]
+        if sample.size == 0:
+            return cls(n_bins)
+        edges = np.unique(np.quantile(sample, np.linspace(0.0, 1.0, n_bins + 1)))
+        if edges.size < 2:
+            edges = np.array([edges[0] - 0.5, edges[0] + 0.5])
+        # Open the outer bins so later chunks outside the sample range are kept
+        edges[0], edges[-1] = -np.inf, np.inf
+        return cls(edges=edges)
+
+    def _bin(self, scores: np.ndarray) -> np.ndarray:
+        n = self.positives.size
+        if self._uniform:
+            lo, hi = self.edges[0], self.edges[-1]
+            idx = np.floor((scores - lo) * (n / (hi - lo)))
+            return np.clip(idx, 0, n - 1).astype(np.intp)
+        return np.clip(np.searchsorted(self.edges, scores, side="right") - 1, 0, n - 1)
+
+    def update(self, y_binary: np.ndarray, scores: np.ndarray) -> "ScoreHistogram":
+        """Add a chunk of binary labels and positive-class scores."""
+        y_binary = np.asarray(y_binary).ravel().astype(bool)
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        present = ~np.isnan(scores)
+        if not present.all():
+            self.n_missing += int(present.size - present.sum())
+            y_binary, scores = y_binary[present], scores[present]
+        idx = self._bin(scores)
+        n = self.positives.size
+        self.positives += np.bincount(idx[y_binary], minlength=n)
+        self.negatives += np.bincount(idx[~y_binary], minlength=n)
+        return self
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Add the counts of a histogram with identical bin edges."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge score histograms with different bin edges")
+        self.positives += other.positives
+        self.negatives += other.negatives
+        self.n_missing += other.n_missing
+        return self
+
+    def _cumulative(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Walk thresholds from the highest bin down, as in an exact ROC sweep
+        tps = np.r_[0, np.cumsum(self.positives[::-1])]
+        fps = np.r_[0, np.cumsum(self.negatives[::-1])]
+        return tps, fps
+
+    def roc_curve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ROC points (fpr, tpr) at every bin's lower edge, plus those thresholds."""
+        tps, fps = self._cumulative()
+        tpr = tps / max(tps[-1], 1)
+        fpr = fps / max(fps[-1], 1)
+        return fpr, tpr, np.r_[np.inf, self.edges[-2::-1]]
+
+    def pr_curve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Precision-recall points (recall, precision) at every bin's lower edge."""
+        tps, fps = self._cumulative()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(tps + fps > 0, tps / (tps + fps), 1.0)
+        recall = tps / max(tps[-1], 1)
+        return recall, precision
+
+    def roc_auc(self) -> float:
+        """AUC with within-bin pairs counted as ties."""
+        fpr, tpr, _ = self.roc_curve()
+        return auc(fpr, tpr)
+
+    def auc_error_bound(self) -> float:
+        """Maximum deviation of roc_auc() from the exact AUC of the raw scores."""
+        pairs = float(self.positives.sum()) * float(self.negatives.sum())
+        if pairs == 0:
+            return 0.0
+        return 0.5 * float(self.positives.astype(np.float64) @ self.negatives) / pairs
+
+    def average_precision(self) -> float:
+        """Step-wise average precision over the binned PR curve."""
+        recall, precision = self.pr_curve()
+        return float(np.sum(np.diff(recall) * precision[1:]))
+
+    def summary(self, n_points: int = 51) -> Dict[str, Any]:
+        """AUC, its error bound, average precision and down-sampled curves."""
+        fpr, tpr, thresholds = self.roc_curve()
+        recall, precision = self.pr_curve()
+        keep = np.unique(np.linspace(0, fpr.size - 1, n_points).astype(np.intp))
+        return {
+            "roc_auc": self.roc_auc(),
+            "roc_auc_error_bound": self.auc_error_bound(),
+            "average_precision": self.average_precision(),
+            "n_positive": int(self.positives.sum()),
+            "n_negative": int(self.negatives.sum()),
+            "n_missing": self.n_missing,
+            "roc_curve": {
+                "fpr": fpr[keep].tolist(),
+                "tpr": tpr[keep].tolist(),
+                "thresholds": [float(t) for t in thresholds[keep]],
+            },
+            "pr_curve": {"recall": recall[keep].tolist(), "precision": precision[keep].tolist()},
+        }
+
+
+def streaming_score_histogram(
+    y_true: np.ndarray,
+    y_score: np.ndarray,
+    positive_label: Any = 1,
+    chunksize: int = 1_000_000,
+    n_bins: int = 4096,
+    adaptive: bool = False,
+) -> ScoreHistogram:
+    """Accumulate a ScoreHistogram over (possibly memory-mapped) arrays chunk by chunk.
+
+    With ``adaptive=True`` the bin edges are quantiles of the first chunk's
+    (non-NaN) scores, which suits unbounded scores such as decision functions.
+    """
+    histogram = None
+    for start in range(0, len(y_true), chunksize):
+        labels = np.asarray(y_true[start:start + chunksize]) == positive_label
+        scores = np.asarray(y_score[start:start + chunksize], dtype=np.float64)
+        if scores.ndim == 2:
+            scores = scores[:, -1]
+        if histogram is None:
+            histogram = ScoreHistogram.adaptive(scores, n_bins) if adaptive else ScoreHistogram(n_bins)
+        histogram.update(labels, scores)
+    return histogram if histogram is not None else ScoreHistogram(n_bins)
+
+
+def _bootstrap_weights(
+    rng: np.random.Generator, n: int, n_boot: int, batch_rows: int
+) -> Iterator[np.ndarray]:
+    """Yield multinomial resampling weights, ``batch_rows`` replicates at a time.
+
+    Counting ``n`` uniform draws per replicate with one flat bincount gives
+    the same distribution as ``rng.multinomial`` at a fraction of the cost.
+    """
+    for start in range(0, n_boot, batch_rows):
+        rows = min(batch_rows, n_boot - start)
+        draws = rng.integers(0, n, size=(rows, n))
+        draws += np.arange(rows)[:, None] * n
+        yield np.bincount(draws.ravel(), minlength=rows * n).reshape(rows, n)
+
+
+def bootstrap_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    evaluation_type: str = "classification",
+    n_boot: int = 1000,
+    confidence: float = 0.95,
+    random_state: Optional[int] = None,
+    memory_budget_mb: float = 256.0,
+) -> Dict[str, Dict[str, float]]:
+    """Percentile bootstrap confidence intervals for every scalar metric.
+
+    All resamples are drawn as one multinomial weight matrix ``W`` of shape
+    ``(n_boot, n)``. For classification the rows are ordered by confusion
+    cell, so ``W`` times the cell indicator matrix reduces to one
+    ``np.add.reduceat`` and yields every replicate's confusion matrix at once.
+    For regression the weighted sums come from a single ``W @ stats`` product;
+    with the rows sorted by absolute error, the median and max absolute
+    error of a replicate are read off its cumulative weights. Every scalar
+    metric except ``n_samples`` gets an interval. ``W`` is generated in
+    batches that fit ``memory_budget_mb``.
+
+    Args:
+        y_true: True labels or targets
+        y_pred: Predicted labels or values
+        evaluation_type: "classification" or "regression"
+        n_boot: Number of bootstrap replicates
+        confidence: Two-sided coverage of the intervals
+        random_state: Seed for the resampling weights
+        memory_budget_mb: Budget for one batch of weights
+
+    Returns:
+        Dict mapping metric name to estimate, lower, upper and std
+    """
+    rng = np.random.default_rng(random_state)
+    n = len(y_true)
+    # Draws, counts and one reduction temporary are alive per batch
+    batch_rows = int(max(1, min(n_boot, memory_budget_mb * 1024 * 1024 // (24 * n))))
+    replicates: Dict[str, List[np.ndarray]] = {}
+
+    if evaluation_type == "regression":
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+        point = regression_metrics(y_true, y_pred)
+        # Resampling does not depend on row order; sorting by |error| makes order statistics cheap
+        order = np.argsort(np.abs(y_pred - y_true), kind="stable")
+        y_true = y_true[order]
+        residual = y_pred[order] - y_true
+        abs_residual = np.abs(residual)
+        nonzero = y_true != 0
+        ape = np.divide(abs_residual, np.abs(y_true), out=np.zeros(n), where=nonzero)
+        stats = np.column_stack([
+            residual * residual, abs_residual, y_true, y_true * y_true, residual, ape, nonzero,
+        ])
+        lower_mid, upper_mid = (n - 1) // 2, n // 2
+        for weights in _bootstrap_weights(rng, n, n_boot, batch_rows):
+            sums = weights @ stats / n
+            sst = sums[:, 3] - sums[:, 2] ** 2
+            residual_var = sums[:, 0] - sums[:, 4] ** 2
+            max_error = abs_residual[n - 1 - np.argmax(weights[:, ::-1] > 0, axis=1)]
+            # Position p of a sorted replicate is the row whose cumulative weight first exceeds p
+            positions = np.cumsum(weights, axis=1, out=weights)
+            median = 0.5 * (
+                abs_residual[(positions <= lower_mid).sum(axis=1)]
+                + abs_residual[(positions <= upper_mid).sum(axis=1)]
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                batch = {
+                    "mse": sums[:, 0],
+                    "rmse": np.sqrt(sums[:, 0]),
+                    "mae": sums[:, 1],
+                    "median_absolute_error": median,
+                    "max_error": max_error,
+                    "r2": np.where(sst > 0, 1 - sums[:, 0] / sst, np.nan),
+                    "explained_variance": np.where(sst > 0, 1 - residual_var / sst, np.nan),
+                    "mape": np.where(sums[:, 6] > 0, sums[:, 5] / sums[:, 6], np.nan),
+                    "mean_residual": sums[:, 4],
+                }
+            for key, values in batch.items():
+                replicates.setdefault(key, []).append(values)
+    else:
+        labels, true_codes, pred_codes = encode_labels(y_true, y_pred)
+        k = labels.size
+        point = classification_metrics(y_true, y_pred)
+        cells = np.sort(true_codes.astype(np.int64) * k + pred_codes)
+        occupied, starts = np.unique(cells, return_index=True)
+        for weights in _bootstrap_weights(rng, n, n_boot, batch_rows):
+            counts = np.zeros((weights.shape[0], k * k))
+            counts[:, occupied] = np.add.reduceat(weights, starts, axis=1)
+            summary = metrics_from_confusion(counts.reshape(-1, k, k))
+            for key, values in summary.items():
+                if np.ndim(values) == 1:
+                    replicates.setdefault(key, []).append(values)
+
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for key, chunks in replicates.items():
+        values = np.concatenate(chunks)
+        values = values[~np.isnan(values)]
+        if values.size == 0 or point.get(key) is None:
+            continue
+        lower, upper = np.quantile(values, [alpha, 1 - alpha])
+        intervals[key] = {
+            "estimate": float(point[key]),
+            "lower": float(lower),
+            "upper": float(upper),
+            "std": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        }
+    return intervals
@@ -4,7 +4,7 @@ Provides specialized tools for machine learning operations.
 """
 
 from crewai_tools import BaseTool
-from typing import Any, Type
+from typing import Any, Dict, List, Type
 from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
@@ -12,6 +12,25 @@ from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.model_selection import cross_val_score
 from sklearn.metrics import classification_report, mean_squared_error, r2_score
 import json
+import os
+import joblib
+
+from .cache import ProfileCache
+from .columnar import load_array
+from .correlation import correlation_pairs
+from .importance import grouped_permutation_importance, pairs_to_matrix, permutation_importance
+from .metrics import (
+    bootstrap_metrics,
+    classification_metrics,
+    regression_metrics,
+    streaming_score_histogram,
+    train_test_gap,
+)
+from .oob import oob_evaluation
+from .profiling import DEFAULT_CHUNKSIZE, profile_dataset, profile_dataset_parallel
+from .treeshap import shap_importance, tree_shap
+from .trials import TrialStore
+from .tuning import bayesian_search, hyperband, nested_grid_search, successive_halving
 
 
 class DatasetAnalyzerTool(BaseTool):
@@ -20,11 +39,64 @@ class DatasetAnalyzerTool(BaseTool):
     name: str = "Dataset Analyzer"
     description: str = "Analyzes datasets to provide statistical summaries, missing value reports, and data quality insights."
 
-    def _run(self, dataset_path: str = None, dataset_summary: str = None) -> str:
-        """Analyze a dataset and return comprehensive statistics."""
+    def _run(
+        self,
+        dataset_path: str = None,
+        dataset_summary: str = None,
+        target_column: str = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        n_jobs: int = 1,
+        correlation_threshold: float = 0.8,
+        memory_budget_mb: float = 512.0,
+        use_cache: bool = True,
+    ) -> str:
+        """Analyze a dataset and return comprehensive statistics.
+
+        ``dataset_path`` may be a CSV/Parquet file or a directory written by
+        ingest_dataset(). The file is streamed in chunks of ``chunksize`` rows, so datasets larger
+        than memory can be profiled. With ``n_jobs != 1`` the file is split
+        across a process pool and the partial profiles are merged. Feature
+        pairs with |r| >= ``correlation_threshold`` are found in a second,
+        memory-bounded pass. Results are cached by file fingerprint, so
+        repeat runs on an unchanged file return immediately.
+        """
         try:
-            # This would typically load and analyze actual data
-            # For now, return a template analysis structure
+            if dataset_path:
+                cache = ProfileCache() if use_cache else None
+                if cache is not None:
+                    cache_key = cache.key(
+                        dataset_path,
+                        target_column=target_column,
+                        correlation_threshold=correlation_threshold,
+                    )
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        return json.dumps(cached, indent=2)
+
+                if n_jobs == 1:
+                    profile = profile_dataset(
+                        dataset_path, target_column=target_column, chunksize=chunksize
+                    )
+                else:
+                    profile = profile_dataset_parallel(
+                        dataset_path, target_column=target_column, n_jobs=n_jobs,
+                        chunksize=chunksize,
+                    )
+                analysis = profile.to_dict()
+                numeric = [name for name, column in profile.columns.items() if column.is_numeric]
+                analysis["correlations"] = correlation_pairs(
+                    dataset_path,
+                    threshold=correlation_threshold,
+                    memory_budget_mb=memory_budget_mb,
+                    chunksize=chunksize,
+                    columns=numeric,
+                )
+                analysis["correlations"].pop("columns")
+                if cache is not None:
+                    cache.put(cache_key, analysis)
+                return json.dumps(analysis, indent=2)
+
+            # No dataset supplied, return a template analysis structure
             analysis = {
                 "dataset_shape": "Unknown (provide actual dataset)",
                 "missing_values": "Analysis requires actual dataset",
@@ -51,9 +123,76 @@ class ModelEvaluatorTool(BaseTool):
     name: str = "Model Evaluator"
     description: str = "Evaluates Random Forest model performance with comprehensive metrics and analysis."
 
-    def _run(self, model_metrics: str = None, evaluation_type: str = "classification") -> str:
-        """Evaluate model performance based on provided metrics."""
+    def _run(
+        self,
+        model_metrics: str = None,
+        evaluation_type: str = "classification",
+        y_true: Any = None,
+        y_pred: Any = None,
+        y_score: Any = None,
+        y_train_true: Any = None,
+        y_train_pred: Any = None,
+        streaming: bool = False,
+        positive_label: Any = 1,
+        n_bins: int = 4096,
+        adaptive: bool = False,
+        n_bootstrap: int = 0,
+        model_path: str = None,
+        X_train: Any = None,
+        y_train: Any = None,
+    ) -> str:
+        """Evaluate model performance based on provided predictions.
+
+        Label/prediction arrays may be given directly, as JSON lists or as
+        paths understood by load_array(). Without them a template is returned.
+        With ``streaming=True`` binary ROC/PR curves come from mergeable
+        score histograms built chunk by chunk instead of a full sort;
+        ``adaptive=True`` places their bins at quantiles of the first chunk,
+        for unbounded scores such as decision functions.
+        ``n_bootstrap > 0`` adds bootstrap confidence intervals for every metric.
+        ``evaluation_type="oob"`` evaluates the pickled forest at ``model_path``
+        on its out-of-bag rows, so bagged models need no refitting for CV.
+        """
         try:
+            if evaluation_type == "oob":
+                forest = joblib.load(model_path)
+                X = _load_values(X_train) if X_train is not None else None
+                evaluation = {
+                    "evaluation_type": evaluation_type,
+                    "oob": oob_evaluation(forest, X, _load_values(y_train)),
+                }
+                evaluation["test_metrics"] = evaluation["oob"]["metrics"]
+                evaluation["recommendations"] = _evaluation_recommendations(evaluation)
+                return json.dumps(evaluation, indent=2)
+
+            if streaming and y_true is not None and y_score is not None:
+                histogram = streaming_score_histogram(
+                    _load_values(y_true), _load_values(y_score),
+                    positive_label=positive_label, n_bins=n_bins, adaptive=adaptive,
+                )
+                evaluation = {"evaluation_type": evaluation_type, "streaming_roc": histogram.summary()}
+                if y_pred is not None:
+                    evaluation["test_metrics"] = _evaluate_split(evaluation_type, y_true, y_pred)
+                evaluation["recommendations"] = (
+                    _evaluation_recommendations(evaluation) if y_pred is not None else []
+                )
+                return json.dumps(evaluation, indent=2)
+
+            if y_true is not None and y_pred is not None:
+                evaluation = _evaluate_split(evaluation_type, y_true, y_pred, y_score)
+                evaluation = {"evaluation_type": evaluation_type, "test_metrics": evaluation}
+                if n_bootstrap > 0:
+                    evaluation["confidence_intervals"] = bootstrap_metrics(
+                        _load_values(y_true), _load_values(y_pred),
+                        evaluation_type=evaluation_type, n_boot=n_bootstrap,
+                    )
+                if y_train_true is not None and y_train_pred is not None:
+                    train = _evaluate_split(evaluation_type, y_train_true, y_train_pred)
+                    evaluation["train_metrics"] = train
+                    evaluation["train_test_gap"] = train_test_gap(train, evaluation["test_metrics"])
+                evaluation["recommendations"] = _evaluation_recommendations(evaluation)
+                return json.dumps(evaluation, indent=2)
+
             # Template evaluation response
             evaluation = {
                 "evaluation_type": evaluation_type,
@@ -73,15 +212,104 @@ class ModelEvaluatorTool(BaseTool):
             return f"Error evaluating model: {str(e)}"
 
 
+def _load_values(values: Any) -> np.ndarray:
+    """Accept an array, a JSON list string or a path readable by load_array()."""
+    if isinstance(values, str):
+        stripped = values.strip()
+        if stripped.startswith("["):
+            return np.asarray(json.loads(stripped))
+        return np.asarray(load_array(stripped))
+    return np.asarray(values)
+
+
+def _evaluate_split(
+    evaluation_type: str, y_true: Any, y_pred: Any, y_score: Any = None
+) -> Dict[str, Any]:
+    y_true, y_pred = _load_values(y_true), _load_values(y_pred)
+    if evaluation_type == "regression":
+        return regression_metrics(y_true, y_pred)
+    scores = _load_values(y_score) if y_score is not None else None
+    return classification_metrics(y_true, y_pred, scores)
+
+
+def _evaluation_recommendations(evaluation: Dict[str, Any]) -> List[str]:
+    test = evaluation["test_metrics"]
+    tips = []
+    gap = evaluation.get("train_test_gap", {})
+    for key in ("accuracy", "r2"):
+        if gap.get(key, 0.0) > 0.05:
+            tips.append(
+                f"Train {key} exceeds test by {gap[key]:.3f}: limit max_depth or raise min_samples_leaf"
+            )
+    for label, stats in test.get("per_class", {}).items():
+        if stats["support"] and stats["recall"] < 0.5:
+            tips.append(f"Class '{label}' has low recall ({stats['recall']:.2f}); consider class_weight='balanced'")
+    if "balanced_accuracy" in test and test["accuracy"] - test["balanced_accuracy"] > 0.05:
+        tips.append("Accuracy is inflated by class imbalance; report balanced accuracy and per-class F1")
+    for key, interval in evaluation.get("confidence_intervals", {}).items():
+        if key in ("accuracy", "r2") and interval["upper"] - interval["lower"] > 0.05:
+            tips.append(
+                f"The {key} confidence interval is wide ({interval['lower']:.3f}-{interval['upper']:.3f}); "
+                "evaluate on more data before comparing models"
+            )
+    calibration = evaluation.get("oob", {}).get("calibration")
+    if calibration and calibration["expected_calibration_error"] > 0.05:
+        tips.append(
+            f"OOB probabilities are miscalibrated (ECE {calibration['expected_calibration_error']:.3f}); "
+            "consider CalibratedClassifierCV"
+        )
+    if not tips:
+        tips.append("No overfitting or per-class weaknesses detected; compare with baseline models")
+    return tips
+
+
 class FeatureImportanceTool(BaseTool):
     """Tool for analyzing feature importance in Random Forest models."""
 
     name: str = "Feature Importance Analyzer"
     description: str = "Analyzes feature importance rankings and provides engineering recommendations."
 
-    def _run(self, feature_importance_data: str = None) -> str:
-        """Analyze feature importance and provide recommendations."""
+    def _run(
+        self,
+        feature_importance_data: str = None,
+        model_path: str = None,
+        X: Any = None,
+        y: Any = None,
+        feature_names: List[str] = None,
+        n_repeats: int = 5,
+        n_jobs: int = -1,
+        shap_rows: int = 0,
+        group_threshold: float = 0.0,
+    ) -> str:
+        """Analyze feature importance and provide recommendations.
+
+        With a pickled model at ``model_path`` and evaluation data ``X``/``y``
+        (arrays, JSON lists or paths understood by load_array()), Gini
+        importances are reported next to parallel permutation importances.
+        ``shap_rows > 0`` adds mean |SHAP| over the first ``shap_rows`` rows.
+        ``group_threshold > 0`` permutes clusters of features correlated above
+        that |r| together; the correlation pairs are cached when ``X`` is a path.
+        """
         try:
+            if model_path and X is not None and y is not None:
+                model = joblib.load(model_path)
+                X_eval, y_eval = _load_values(X), _load_values(y)
+                names = feature_names or [f"feature_{i}" for i in range(X_eval.shape[1])]
+                if group_threshold > 0:
+                    abs_corr = _cached_abs_corr(X, X_eval, names, group_threshold)
+                    result = grouped_permutation_importance(
+                        model, X_eval, y_eval, threshold=group_threshold, abs_corr=abs_corr,
+                        n_repeats=n_repeats, n_jobs=n_jobs,
+                    )
+                else:
+                    result = permutation_importance(
+                        model, X_eval, y_eval, n_repeats=n_repeats, n_jobs=n_jobs,
+                    )
+                if shap_rows > 0:
+                    phi, _ = tree_shap(model, X_eval[:shap_rows], n_jobs=n_jobs)
+                    result["shap_importance"] = shap_importance(phi)
+                return json.dumps(_importance_report(model, names, result), indent=2)
+
             # Template feature importance analysis
             analysis = {
                 "top_features": "Analysis requires actual feature importance data",
@@ -105,15 +333,142 @@ class FeatureImportanceTool(BaseTool):
             return f"Error analyzing feature importance: {str(e)}"
 
 
+def _cached_abs_corr(source: Any, X: np.ndarray, names: List[str], threshold: float) -> np.ndarray:
+    """|r| matrix of ``X``, reusing the profile cache when the data came from a file."""
+    cache = ProfileCache() if isinstance(source, str) and os.path.exists(source) else None
+    if cache is not None:
+        # Pairs are stored by column name, so the names are part of the key
+        key = cache.key(source, kind="correlation_pairs", threshold=threshold, columns=names)
+        cached = cache.get(key)
+        if cached is not None:
+            return pairs_to_matrix(cached["pairs"], names)
+    X = np.asarray(X)
+    found = correlation_pairs(X, threshold=threshold, top_k=X.shape[1] ** 2, columns=names)
+    if cache is not None:
+        cache.put(key, found)
+    return pairs_to_matrix(found["pairs"], names)
+
+
+def _importance_report(model: Any, names: List[str], result: Dict[str, Any]) -> Dict[str, Any]:
+    gini = getattr(model, "feature_importances_", None)
+    rows = []
+    for g, columns in enumerate(result["groups"]):
+        row = {
+            "features": [names[j] for j in columns],
+            "permutation_importance": float(result["importances_mean"][g]),
+            "permutation_std": float(result["importances_std"][g]),
+        }
+        if gini is not None:
+            row["gini_importance"] = float(sum(gini[j] for j in columns))
+        if "shap_importance" in result:
+            row["shap_importance"] = float(sum(result["shap_importance"][j] for j in columns))
+        rows.append(row)
+    rows.sort(key=lambda row: -row["permutation_importance"])
+    for row in rows:
+        if len(row["features"]) == 1:
+            row["feature"] = row.pop("features")[0]
+
+    correlated_groups = [row["features"] for row in rows if "features" in row]
+    irrelevant = [
+        row.get("feature", row.get("features")) for row in rows
+        if row["permutation_importance"] <= row["permutation_std"]
+    ]
+    return {
+        "scoring": result["scoring"],
+        "baseline_score": result["baseline_score"],
+        "top_features": rows[:20],
+        "redundant_features": irrelevant,
+        "correlated_groups": correlated_groups,
+        "engineering_opportunities": [
+            "Consider interactions between the top-ranked features",
+            "Compare Gini and permutation rankings: high Gini with low permutation importance "
+            "points to high-cardinality or correlated features",
+        ],
+        "selection_recommendations": [
+            f"Drop or merge the {len(irrelevant)} features whose permutation importance "
+            "is within one standard deviation of zero",
+            "Re-check the ranking on a held-out set after removing features",
+        ],
+    }
+
+
 class HyperparameterOptimizerTool(BaseTool):
     """Tool for hyperparameter optimization recommendations."""
 
     name: str = "Hyperparameter Optimizer"
     description: str = "Provides hyperparameter optimization strategies and recommendations for Random Forest models."
 
-    def _run(self, current_params: str = None, performance_metrics: str = None) -> str:
-        """Provide hyperparameter optimization recommendations."""
+    def _run(
+        self,
+        current_params: str = None,
+        performance_metrics: str = None,
+        X: Any = None,
+        y: Any = None,
+        param_space: Any = None,
+        task: str = "classification",
+        strategy: str = "hyperband",
+        n_candidates: int = 27,
+        n_iter: int = 30,
+        max_estimators: int = None,
+        eta: int = 3,
+        cv: int = 3,
+        n_jobs: int = -1,
+        use_trial_store: bool = True,
+        search_id: str = None,
+        measure_costs: bool = False,
+        constraints: Any = None,
+        latency_batch_sizes: List[int] = None,
+    ) -> str:
+        """Tune a Random Forest or provide hyperparameter optimization recommendations.
+
+        When ``X`` and ``y`` are given (arrays, JSON lists or paths understood
+        by load_array()), runs ``strategy`` ("hyperband", "successive_halving",
+        "bayesian" or "grid") over ``param_space``: a dict or JSON object whose
+        lists are choices and whose ``{"low": .., "high": ..}`` entries are
+        ranges. Hyperband and successive halving grow forests rung by rung with
+        ``warm_start``; "bayesian" evaluates ``n_iter`` configurations proposed
+        in parallel batches by a TPE surrogate; "grid" fits the largest
+        n_estimators/max_depth once and scores the nested variants from it.
+        With "bayesian", ``measure_costs`` adds model bytes, node count and
+        predict latency per configuration and a Pareto front, and
+        ``constraints`` (dict or JSON object, e.g.
+        ``{"latency_p99_ms_batch1": 2.0}``) sets hard upper bounds on them. Every trial is recorded in the
+        SQLite trial store under ``config.OUTPUTS_DIR``: rerunning a search
+        skips its completed trials, and trials shared with earlier searches on
+        the same data are reused.
+        """
         try:
+            if X is not None and y is not None:
+                X_train, y_train = _load_values(X), _load_values(y)
+                space = _parse_space(param_space)
+                store = TrialStore() if use_trial_store else None
+                tracking = dict(trial_store=store, search_id=search_id)
+                options = dict(task=task, max_estimators=max_estimators, eta=eta, cv=cv, n_jobs=n_jobs, **tracking)
+                if (measure_costs or constraints) and strategy != "bayesian":
+                    raise ValueError("Cost measurement and constraints require strategy='bayesian'")
+                try:
+                    if strategy == "hyperband":
+                        result = hyperband(X_train, y_train, space, **options)
+                    elif strategy == "successive_halving":
+                        result = successive_halving(X_train, y_train, space, n_candidates=n_candidates, **options)
+                    elif strategy == "bayesian":
+                        if isinstance(constraints, str):
+                            constraints = json.loads(constraints)
+                        result = bayesian_search(
+                            X_train, y_train, space, task=task, n_iter=n_iter, max_estimators=max_estimators,
+                            cv=cv, n_jobs=n_jobs, measure_costs=measure_costs, constraints=constraints,
+                            latency_batch_sizes=latency_batch_sizes or (1,), **tracking,
+                        )
+                    elif strategy == "grid":
+                        result = nested_grid_search(X_train, y_train, space, task=task, cv=cv, n_jobs=n_jobs,
+                                                    **tracking)
+                    else:
+                        raise ValueError(f"Unknown strategy '{strategy}'")
+                finally:
+                    if store is not None:
+                        store.close()
+                return json.dumps(result, indent=2, default=str)
+
             # Template hyperparameter recommendations
             recommendations = {
                 "parameter_ranges": {
@@ -124,9 +479,9 @@ class HyperparameterOptimizerTool(BaseTool):
                     "max_features": "'sqrt' for classification, '1/3' for regression"
                 },
                 "optimization_strategy": [
-                    "Use RandomizedSearchCV for initial exploration",
-                    "Follow with GridSearchCV on promising regions",
-                    "Consider Bayesian optimization for efficiency",
+                    "Pass X and y to run Hyperband over warm-started forests",
+                    "Follow with a narrower search around the best configuration",
+                    "Use strategy='bayesian' to reach grid-search quality in far fewer fits",
                     "Always use cross-validation (5-fold minimum)"
                 ],
                 "performance_targets": {
@@ -140,3 +495,15 @@ class HyperparameterOptimizerTool(BaseTool):
 
         except Exception as e:
             return f"Error providing hyperparameter recommendations: {str(e)}"
+
+
+def _parse_space(param_space: Any) -> Any:
+    """Search space from a dict or JSON object; ``{"low", "high"}`` objects become range tuples."""
+    if param_space is None:
+        return None
+    if isinstance(param_space, str):
+        param_space = json.loads(param_space)
+    return {
+        name: (domain["low"], domain["high"]) if isinstance(domain, dict) else domain
+        for name, domain in param_space.items()
+    }
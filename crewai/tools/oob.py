@@ -0,0 +1,262 @@
+"""
+Out-of-bag evaluation for fitted bagged forests.
+Reuses each tree's unused bootstrap rows to get CV-quality estimates without refitting,
+and to pick the number of trees from where the OOB error curve levels off.
+"""
+
+import copy
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from .metrics import classification_metrics, regression_metrics
+
+
+class OOBAccumulator:
+    """Running sums of per-tree out-of-bag predictions.
+
+    Args:
+        n_samples: Number of training rows
+        n_outputs: Number of classes (classification) or 1 (regression)
+    """
+
+    def __init__(self, n_samples: int, n_outputs: int):
+        self.sums = np.zeros((n_samples, n_outputs))
+        self.counts = np.zeros(n_samples, dtype=np.int64)
+        self.n_trees = 0
+
+    def add(self, rows: np.ndarray, predictions: np.ndarray) -> None:
+        """Add one tree's predictions for its out-of-bag ``rows``."""
+        self.sums[rows] += predictions.reshape(rows.size, -1)
+        self.counts[rows] += 1
+        self.n_trees += 1
+
+    @property
+    def covered(self) -> np.ndarray:
+        """Mask of rows that were out of bag for at least one tree."""
+        return self.counts > 0
+
+    def predictions(self) -> np.ndarray:
+        """Averaged OOB predictions of the covered rows."""
+        covered = self.covered
+        return self.sums[covered] / self.counts[covered, None]
+
+
+def oob_rows(sampled: np.ndarray, n_samples: int) -> np.ndarray:
+    """Indices of the rows not drawn into a tree's bootstrap sample."""
+    mask = np.ones(n_samples, dtype=bool)
+    mask[sampled] = False
+    return np.flatnonzero(mask)
+
+
+def accumulate_oob(
+    forest: Any, X: np.ndarray, start: int = 0, accumulator: Optional[OOBAccumulator] = None
+) -> OOBAccumulator:
+    """Add the OOB predictions of ``forest.estimators_[start:]`` to an accumulator.
+
+    Uses the public ``estimators_samples_`` of scikit-learn forests, so it
+    works whether or not the forest was fitted with ``oob_score=True``.
+    Only the bootstrap samples of the new trees are regenerated, so adding
+    trees in increments costs time in proportion to the increment.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n_samples = X.shape[0]
+    is_classifier = hasattr(forest, "classes_")
+    if accumulator is None:
+        accumulator = OOBAccumulator(n_samples, len(forest.classes_) if is_classifier else 1)
+
+    # estimators_samples_ regenerates a sample for every tree in estimators_
+    new_trees = copy.copy(forest)
+    new_trees.estimators_ = forest.estimators_[start:]
+    for tree, sampled in zip(new_trees.estimators_, new_trees.estimators_samples_):
+        rows = oob_rows(sampled, n_samples)
+        if rows.size == 0:
+            continue
+        X_oob = np.ascontiguousarray(X[rows])
+        if is_classifier:
+            predictions = tree.predict_proba(X_oob, check_input=False)
+        else:
+            predictions = tree.predict(X_oob, check_input=False)
+        accumulator.add(rows, predictions)
+    return accumulator
+
+
+def calibration_curve(
+    y_binary: np.ndarray, confidence: np.ndarray, n_bins: int = 10
+) -> Dict[str, Any]:
+    """Reliability curve over equal-width confidence bins plus expected calibration error."""
+    y_binary = np.asarray(y_binary, dtype=np.float64)
+    bins = np.clip((np.asarray(confidence) * n_bins).astype(np.intp), 0, n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    sum_conf = np.bincount(bins, weights=confidence, minlength=n_bins)
+    sum_hits = np.bincount(bins, weights=y_binary, minlength=n_bins)
+    filled = counts > 0
+    mean_conf = sum_conf[filled] / counts[filled]
+    frac_hits = sum_hits[filled] / counts[filled]
+    return {
+        "mean_predicted": mean_conf.tolist(),
+        "fraction_positive": frac_hits.tolist(),
+        "count": counts[filled].tolist(),
+        "expected_calibration_error": float(
+            np.sum(counts[filled] * np.abs(mean_conf - frac_hits)) / max(counts.sum(), 1)
+        ),
+    }
+
+
+def oob_evaluation(
+    forest: Any, X: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None, n_bins: int = 10
+) -> Dict[str, Any]:
+    """Full OOB evaluation of a fitted RandomForestClassifier/Regressor.
+
+    When the forest was fitted with ``oob_score=True`` and ``X`` is omitted,
+    its stored OOB decision function is reused at no cost. Otherwise the OOB
+    predictions are rebuilt from the trees and their bootstrap samples, which
+    needs the training ``X`` and ``y``.
+
+    Args:
+        forest: Fitted bagged scikit-learn forest
+        X: Training features (needed unless stored OOB predictions are reused)
+        y: Training targets
+        n_bins: Number of bins of the calibration curves
+
+    Returns:
+        Dict with OOB metrics, confusion matrix and calibration curves
+    """
+    if not getattr(forest, "bootstrap", False):
+        raise ValueError("OOB evaluation requires a forest fitted with bootstrap=True")
+    if y is None:
+        raise ValueError("OOB evaluation requires the training targets y")
+    y = np.asarray(y).ravel()
+    is_classifier = hasattr(forest, "classes_")
+
+    stored = getattr(forest, "oob_decision_function_" if is_classifier else "oob_prediction_", None)
+    if X is None and stored is not None:
+        predictions = np.asarray(stored).reshape(y.size, -1)
+        covered = ~np.isnan(predictions).any(axis=1)
+        if is_classifier:
+            # Older scikit-learn stores all-zero rows for samples no tree left out
+            covered &= predictions.sum(axis=1) > 0
+        predictions = predictions[covered]
+        source = "stored"
+    elif X is not None:
+        accumulator = accumulate_oob(forest, X)
+        covered = accumulator.covered
+        predictions = accumulator.predictions()
+        source = "recomputed"
+    else:
+        raise ValueError("Forest has no stored OOB predictions; pass the training X")
+
+    result: Dict[str, Any] = {
+        "source": source,
+        "n_trees": len(forest.estimators_),
+        "coverage": float(covered.mean()),
+    }
+    y_oob = y[covered]
+    if not is_classifier:
+        result["metrics"] = regression_metrics(y_oob, predictions[:, 0])
+        return result
+
+    classes = forest.classes_
+    y_pred = classes[predictions.argmax(axis=1)]
+    # classification_metrics() codes only the labels present here, which may be fewer than classes_
+    labels = np.union1d(y_oob, y_pred)
+    scores = predictions[:, np.searchsorted(classes, labels)]
+    result["metrics"] = classification_metrics(y_oob, y_pred, scores[:, 1] if labels.size == 2 else scores)
+    if classes.size == 2:
+        positive = classes[1]
+        result["calibration"] = calibration_curve(
+            y_oob == positive, predictions[:, np.searchsorted(classes, positive)], n_bins
+        )
+    else:
+        result["calibration"] = calibration_curve(y_oob == y_pred, predictions.max(axis=1), n_bins)
+        result["calibration"]["kind"] = "top_label"
+    return result
+
+
+def oob_error(accumulator: OOBAccumulator, y: np.ndarray, classes: Optional[np.ndarray] = None) -> float:
+    """OOB error of the covered rows: misclassification rate with ``classes``, else 1 - R^2."""
+    covered = accumulator.covered
+    predictions = accumulator.predictions()
+    y_oob = y[covered]
+    if classes is not None:
+        return float(np.mean(classes[predictions.argmax(axis=1)] != y_oob))
+    total = float(np.sum((y_oob - y_oob.mean()) ** 2))
+    residual = float(np.sum((y_oob - predictions[:, 0]) ** 2))
+    return residual / total if total > 0 else 0.0
+
+
+def fit_until_converged(
+    forest: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    increment: int = 25,
+    max_estimators: int = 1000,
+    tol: float = 0.002,
+    patience: int = 3,
+    trim: bool = True,
+) -> Dict[str, Any]:
+    """Grow a bagged forest in increments until its OOB error curve levels off.
+
+    Trees are added with ``warm_start``, and only the new trees' OOB
+    predictions are added to the running vote sums, so tracking the curve
+    costs one OOB pass over each tree. Growth stops once the last
+    ``patience`` increments all left the error within ``tol`` of each
+    other. With ``trim`` the trees added during that flat stretch are
+    dropped again: they did not move the error, and every tree kept is
+    paid for at prediction time. An OOB error averages only about a third
+    of the trees per row, so it levels off later than the full forest's
+    error and the chosen size errs on the large side.
+
+    Args:
+        forest: Unfitted RandomForestClassifier/Regressor with ``bootstrap=True``
+        X: Training features
+        y: Training targets
+        increment: Trees added per step
+        max_estimators: Upper bound on the number of trees
+        tol: Plateau tolerance on the OOB error (error rate, or 1 - R^2 for regression)
+        patience: Consecutive flat increments required to stop
+        trim: Drop the trees of the flat stretch
+
+    Returns:
+        Dict with the fitted ``forest``, the chosen ``n_estimators``, whether the
+        curve ``converged`` before ``max_estimators``, the ``trees_fitted`` and the
+        OOB ``curve`` (one point per increment)
+    """
+    if not getattr(forest, "bootstrap", False):
+        raise ValueError("OOB convergence requires a forest with bootstrap=True")
+    if increment < 1 or patience < 1:
+        raise ValueError("increment and patience must be at least 1")
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y).ravel()
+    warm_start = forest.warm_start
+    forest.set_params(warm_start=True)
+
+    accumulator: Optional[OOBAccumulator] = None
+    curve: List[Dict[str, float]] = []
+    n_trees = 0
+    converged = False
+    while n_trees < max_estimators:
+        start, n_trees = n_trees, min(n_trees + increment, max_estimators)
+        forest.set_params(n_estimators=n_trees).fit(X, y)
+        accumulator = accumulate_oob(forest, X, start, accumulator)
+        curve.append({
+            "n_trees": n_trees,
+            "oob_error": oob_error(accumulator, y, getattr(forest, "classes_", None)),
+            "coverage": float(accumulator.covered.mean()),
+        })
+        window = [point["oob_error"] for point in curve[-(patience + 1):]]
+        if len(window) > patience and max(window) - min(window) <= tol:
+            converged = True
+            break
+
+    trees_fitted = n_trees
+    if converged and trim:
+        n_trees = curve[-(patience + 1)]["n_trees"]
+        forest.estimators_ = forest.estimators_[:n_trees]
+    forest.set_params(n_estimators=n_trees, warm_start=warm_start)
+    return {
+        "forest": forest,
+        "n_estimators": n_trees,
+        "converged": converged,
+        "trees_fitted": trees_fitted,
+        "curve": curve,
+    }
@@ -0,0 +1,192 @@
+"""
+Out-of-core forest training for CrewAI ML tools.
+Every tree gathers its bootstrap rows straight from an on-disk matrix, so the full dataset is never resident.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from joblib import Parallel, delayed
+
+from .columnar import ColumnarDataset, is_columnar
+from .hist_forest import FeatureBinner, _HistForest
+
+# Rows gathered (as float32) and binned at a time while building a tree's sample
+DEFAULT_GATHER_ROWS = 65536
+# Bytes of the on-disk matrix mapped at once during a gather
+DEFAULT_WINDOW_BYTES = 32 * 1024 * 1024
+# Rows used to place the bin edges
+DEFAULT_BINNER_ROWS = 200_000
+
+PathLike = Union[str, Path]
+
+
+class _MappedFile:
+    """Location of one row-major ``.npy`` array; maps row windows on demand."""
+
+    def __init__(self, path: Path):
+        array = np.load(path, mmap_mode="r")
+        if not array.flags.c_contiguous:
+            raise ValueError(f"{path} must be stored in C order for row gathers")
+        self.path = path
+        self.dtype = array.dtype
+        self.offset = array.offset
+        self.shape = array.shape
+        self.row_bytes = array.dtype.itemsize * int(np.prod(array.shape[1:], dtype=np.int64))
+
+    def window(self, start: int, stop: int) -> np.memmap:
+        return np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.offset + start * self.row_bytes,
+                         shape=(stop - start,) + self.shape[1:])
+
+
+class RowSource:
+    """Sorted row gathers from a 2D ``.npy`` file, a columnar dataset or an in-memory array.
+
+    On-disk sources are read through short-lived maps of one row window at
+    a time: a tree's sample is spread over the whole file, and one mapping
+    of the file would leave every page a gather touched resident (and
+    counted against this process) until it was unmapped. Windows bound the
+    mapped pages to ``window_bytes``; what the gather read stays only in
+    the reclaimable page cache. Arrays, including caller-owned memory maps,
+    are indexed as they are.
+
+    Args:
+        source: ``.npy`` path, columnar directory, ColumnarDataset or 2D array
+        columns: Feature columns of a columnar source (all columns by default)
+        window_bytes: Bytes of the file mapped at once
+    """
+
+    def __init__(self, source: Any, columns: Optional[List[str]] = None,
+                 window_bytes: int = DEFAULT_WINDOW_BYTES):
+        self._array: Optional[np.ndarray] = None
+        self._dataset: Optional[ColumnarDataset] = None
+        if isinstance(source, ColumnarDataset) or (isinstance(source, (str, Path)) and is_columnar(source)):
+            self._dataset = source if isinstance(source, ColumnarDataset) else ColumnarDataset(source)
+            self.columns: Optional[List[str]] = self._dataset.columns if columns is None else list(columns)
+            self._files = [_MappedFile(self._dataset.root / self._dataset.spec(name)["file"]) for name in self.columns]
+            self.n_rows, self.n_features = self._dataset.n_rows, len(self.columns)
+        else:
+            self.columns = None
+            if isinstance(source, (str, Path)):
+                self._files = [_MappedFile(Path(source))]
+                shape = self._files[0].shape
+            else:
+                self._array = source
+                shape = source.shape
+            if len(shape) != 2:
+                raise ValueError(f"Expected a 2D feature matrix, got shape {shape}")
+            self.n_rows, self.n_features = shape
+        if self._array is None:
+            row_bytes = max(sum(f.row_bytes for f in self._files), 1)
+            self.window_rows = max(1, window_bytes // row_bytes)
+
+    def take(self, rows: np.ndarray, features: Optional[np.ndarray] = None) -> np.ndarray:
+        """float32 copy of the sorted ``rows``, of the ``features`` columns only when given."""
+        if self._array is not None:
+            if features is None:
+                return np.asarray(self._array[rows], dtype=np.float32)
+            out = np.empty((rows.size, len(features)), dtype=np.float32)
+            for k, j in enumerate(features):
+                out[:, k] = self._array[rows, j]
+            return out
+        n_features = self.n_features if features is None else len(features)
+        out = np.empty((rows.size, n_features), dtype=np.float32)
+        window = rows // self.window_rows
+        cuts = np.flatnonzero(np.diff(window)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, rows.size]):
+            start = int(window[lo]) * self.window_rows
+            stop = min(start + self.window_rows, self.n_rows)
+            local = rows[lo:hi] - start
+            if self._dataset is None:
+                block = self._files[0].window(start, stop)
+                out[lo:hi] = block[local] if features is None else block[local[:, None], features]
+            else:
+                files = self._files if features is None else [self._files[j] for j in features]
+                for k, mapped in enumerate(files):
+                    out[lo:hi, k] = mapped.window(start, stop)[local]
+        return out
+
+    def column(self, name: str) -> np.ndarray:
+        """A full decoded column of a columnar source, e.g. the target."""
+        if self._dataset is None:
+            raise ValueError("Only columnar sources have named columns")
+        return self._dataset.series(name).to_numpy()
+
+
+def _gather_codes(source: RowSource, rows: np.ndarray, binner: FeatureBinner, gather_rows: int) -> np.ndarray:
+    """uint8 codes of the sorted ``rows``, gathered and binned ``gather_rows`` at a time."""
+    codes = np.empty((rows.size, source.n_features), dtype=np.uint8)
+    for start in range(0, rows.size, gather_rows):
+        block = rows[start:start + gather_rows]
+        codes[start:start + block.size] = binner.transform(source.take(block))
+    return codes
+
+
+def fit_out_of_core(
+    forest: _HistForest,
+    X: Any,
+    y: Any,
+    columns: Optional[List[str]] = None,
+    n_jobs: int = 1,
+    gather_rows: int = DEFAULT_GATHER_ROWS,
+    binner_rows: int = DEFAULT_BINNER_ROWS,
+) -> _HistForest:
+    """Fit a HistRandomForestClassifier/Regressor without loading ``X`` into memory.
+
+    The bin edges are placed from a sorted random subset of ``binner_rows``
+    rows, read a block of features at a time so that, like a tree's gather,
+    it never holds more than ``gather_rows * n_features`` floats. Each tree
+    then draws its bootstrap indices, reduces them to sorted unique rows plus
+    multiplicities (so reads move forward through the file and duplicates are
+    row weights, not copies), gathers those rows block by block and keeps
+    them only as uint8 codes while it grows. Peak memory is therefore about
+    ``n_jobs`` times one tree's sample - at most ``forest.max_samples`` rows
+    of ``n_features`` bytes plus the tree's working arrays - on top of the
+    targets. Set ``max_samples`` to bound it; without bootstrap every tree
+    samples all rows.
+
+    Args:
+        forest: Unfitted HistRandomForestClassifier or HistRandomForestRegressor
+        X: ``.npy`` path, columnar directory, ColumnarDataset or (memory-mapped) array
+        y: Targets, or the name of the target column of a columnar ``X``
+        columns: Feature columns of a columnar ``X`` (all but a named target by default)
+        n_jobs: Trees grown concurrently on worker threads (-1 for all cores)
+        gather_rows: Rows read and binned at a time
+        binner_rows: Rows used to place the bin edges
+
+    Returns:
+        The fitted ``forest``
+    """
+    if isinstance(y, str) and columns is None:
+        columns = [name for name in RowSource(X).columns or [] if name != y]
+    source = RowSource(X, columns)
+    y = source.column(y) if isinstance(y, str) else np.asarray(y).ravel()
+    if y.size != source.n_rows:
+        raise ValueError(f"X has {source.n_rows} rows but y has {y.size}")
+    targets = forest._encode_targets(y)
+
+    seeds = np.random.SeedSequence(forest.random_state)
+    binner_seed, *tree_seeds = seeds.spawn(forest.n_estimators + 1)
+    binner_rng = np.random.default_rng(binner_seed)
+    edge_rows = np.sort(binner_rng.choice(source.n_rows, size=min(binner_rows, source.n_rows), replace=False))
+    block_features = max(1, gather_rows * source.n_features // max(edge_rows.size, 1))
+    forest.binner_ = FeatureBinner(forest.max_bins).fit_blocks(
+        source.take(edge_rows, features)
+        for features in np.array_split(np.arange(source.n_features), max(1, -(-source.n_features // block_features)))
+    )
+
+    def grow(seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+        rng = np.random.default_rng(seed)
+        if forest.bootstrap:
+            draws = rng.integers(0, source.n_rows, size=forest._n_draws(source.n_rows))
+            rows, counts = np.unique(draws, return_counts=True)
+        else:
+            rows = np.arange(source.n_rows)
+            counts = np.ones(source.n_rows, dtype=np.int64)
+        codes = _gather_codes(source, rows, forest.binner_, gather_rows)
+        return forest._grow_tree(
+            codes, forest._row_stats(targets[rows]), counts.astype(np.float64), rng, n_rows=source.n_rows
+        )
+
+    trees = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(grow)(seed) for seed in tree_seeds)
+    return forest._set_trees(trees, source.n_features)
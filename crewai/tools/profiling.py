@@ -0,0 +1,407 @@
+"""
+Streaming dataset profiler for CrewAI ML tools.
+Profiles CSV/Parquet files in a single chunked pass without loading them into memory.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+from .sketches import HyperLogLog, MomentSketch, QuantileSketch, TopKSketch
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow not installed, Parquet input is unavailable
+    pq = None
+
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+MAX_TRACKED_CLASSES = 1_000
+
+PathLike = Union[str, Path]
+
+
+def is_parquet(path: PathLike) -> bool:
+    """Return True when the path looks like a Parquet file."""
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+def iter_chunks(
+    path: PathLike,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield a CSV/TSV/Parquet file or columnar directory as DataFrames of at most ``chunksize`` rows."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset not found: {path}")
+
+    if path.is_dir():
+        # Imported here because the columnar module itself reads through iter_chunks()
+        from .columnar import ColumnarDataset
+        yield from ColumnarDataset(path).iter_chunks(chunksize=chunksize, columns=columns)
+        return
+
+    if is_parquet(path):
+        if pq is None:
+            raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    suffixes = [s.lower() for s in path.suffixes]
+    sep = "\t" if ".tsv" in suffixes else ","
+    yield from pd.read_csv(path, sep=sep, chunksize=chunksize, usecols=columns)
+
+
+class ColumnProfile:
+    """Running statistics for a single column."""
+
+    def __init__(self, name: str, quantile_k: int = 256):
+        self.name = name
+        self.dtypes: List[str] = []
+        self.missing = 0
+        self.non_numeric = False
+        self.moments = MomentSketch()
+        self.quantiles = QuantileSketch(k=quantile_k)
+        self.distinct = HyperLogLog()
+        self.top_values = TopKSketch()
+
+    def update(self, series: pd.Series) -> None:
+        """Fold one chunk of the column into the profile."""
+        dtype = str(series.dtype)
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+        self.missing += int(series.isna().sum())
+        self.distinct.update(series)
+        self.top_values.update(series)
+
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments.update(values)
+            self.quantiles.update(values)
+        else:
+            self.non_numeric = True
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        """Combine the profile of another part of the same column."""
+        for dtype in other.dtypes:
+            if dtype not in self.dtypes:
+                self.dtypes.append(dtype)
+        self.missing += other.missing
+        self.non_numeric = self.non_numeric or other.non_numeric
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        return self
+
+    @property
+    def dtype(self) -> str:
+        """Resolved dtype across all chunks seen so far."""
+        if len(self.dtypes) == 1:
+            return self.dtypes[0]
+        return "object" if self.non_numeric else "float64"
+
+    @property
+    def is_numeric(self) -> bool:
+        """True when every non-empty chunk of the column was numeric."""
+        return self.moments.count > 0 and not self.non_numeric
+
+    def to_dict(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """Return the column statistics as JSON-serialisable values."""
+        summary: Dict[str, Any] = {
+            "dtype": self.dtype,
+            "missing": self.missing,
+            "distinct_estimate": self.distinct.count(),
+            "top_values": [[str(value), count] for value, count in self.top_values.top(5)],
+        }
+        if self.is_numeric:
+            summary.update(self.moments.to_dict())
+            summary["quantiles"] = dict(zip(
+                [f"p{int(round(q * 100))}" for q in quantiles],
+                self.quantiles.quantiles(quantiles),
+            ))
+        return summary
+
+
+class DatasetProfile:
+    """Running profile of a whole table, built from successive chunks.
+
+    Args:
+        target_column: Optional target whose class distribution is tracked
+        quantile_k: Compactor size of the per-column quantile sketches
+    """
+
+    def __init__(self, target_column: Optional[str] = None, quantile_k: int = 256):
+        self.target_column = target_column
+        self.quantile_k = quantile_k
+        self.n_rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.class_counts: Dict[str, int] = {}
+        self.class_overflow = False
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into the profile."""
+        self.n_rows += len(chunk)
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, quantile_k=self.quantile_k)
+            self.columns[name].update(chunk[name])
+
+        if self.target_column is not None and self.target_column in chunk.columns:
+            self._update_classes(chunk[self.target_column])
+
+    def merge(self, other: "DatasetProfile") -> "DatasetProfile":
+        """Combine the profile of another part of the same table."""
+        self.n_rows += other.n_rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        if other.class_overflow:
+            self.class_counts, self.class_overflow = {}, True
+        elif not self.class_overflow:
+            for label, count in other.class_counts.items():
+                self.class_counts[label] = self.class_counts.get(label, 0) + count
+            if len(self.class_counts) > MAX_TRACKED_CLASSES:
+                self.class_counts, self.class_overflow = {}, True
+        return self
+
+    def _update_classes(self, target: pd.Series) -> None:
+        if self.class_overflow:
+            return
+        for label, count in target.value_counts(dropna=False).items():
+            key = str(label)
+            self.class_counts[key] = self.class_counts.get(key, 0) + int(count)
+        if len(self.class_counts) > MAX_TRACKED_CLASSES:
+            # Looks like a continuous target; stop counting distinct values
+            self.class_counts = {}
+            self.class_overflow = True
+
+    def class_distribution(self) -> Optional[Dict[str, Any]]:
+        """Class counts and proportions of the target column, if tracked."""
+        if self.target_column is None or self.class_overflow or not self.class_counts:
+            return None
+        total = sum(self.class_counts.values())
+        counts = dict(sorted(self.class_counts.items(), key=lambda item: -item[1]))
+        return {
+            "counts": counts,
+            "proportions": {label: count / total for label, count in counts.items()},
+            "imbalance_ratio": max(counts.values()) / min(counts.values()),
+        }
+
+    def recommendations(self) -> List[str]:
+        """Preprocessing suggestions derived from the collected statistics."""
+        tips = []
+        for name, column in self.columns.items():
+            missing_rate = column.missing / self.n_rows if self.n_rows else 0.0
+            if missing_rate > 0.5:
+                tips.append(f"Consider dropping '{name}': {missing_rate:.0%} missing")
+            elif missing_rate > 0.05:
+                tips.append(f"Impute '{name}': {missing_rate:.0%} missing")
+            if column.is_numeric and column.moments.min == column.moments.max:
+                tips.append(f"'{name}' is constant and carries no information")
+            if len(column.dtypes) > 1 and column.dtype == "object":
+                tips.append(f"'{name}' has mixed types across the file: {column.dtypes}")
+
+        distribution = self.class_distribution()
+        if distribution and distribution["imbalance_ratio"] > 3:
+            tips.append(
+                "Target classes are imbalanced "
+                f"(ratio {distribution['imbalance_ratio']:.1f}); "
+                "consider class_weight='balanced' or stratified sampling"
+            )
+        if not tips:
+            tips.append("No data quality issues detected in the streaming profile")
+        return tips
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile in the layout used by DatasetAnalyzerTool."""
+        columns = {name: column.to_dict() for name, column in self.columns.items()}
+        return {
+            "dataset_shape": [self.n_rows, len(self.columns)],
+            "missing_values": {
+                name: column.missing for name, column in self.columns.items() if column.missing
+            },
+            "feature_types": {name: column.dtype for name, column in self.columns.items()},
+            "numeric_summary": {
+                name: summary for name, summary in columns.items() if "mean" in summary
+            },
+            "class_distribution": self.class_distribution(),
+            "recommendations": self.recommendations(),
+        }
+
+
+def profile_dataset(
+    path: PathLike,
+    target_column: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    quantile_k: int = 256,
+) -> DatasetProfile:
+    """Profile a dataset file in one streaming pass.
+
+    Memory use is bounded by one chunk plus the per-column sketches, so files
+    far larger than RAM can be profiled.
+
+    Args:
+        path: CSV/TSV (optionally compressed) or Parquet file, or a columnar directory
+        target_column: Optional target whose class distribution is reported
+        chunksize: Number of rows read per chunk
+        quantile_k: Compactor size of the quantile sketches
+
+    Returns:
+        The populated DatasetProfile
+    """
+    profile = DatasetProfile(target_column=target_column, quantile_k=quantile_k)
+    for chunk in iter_chunks(path, chunksize=chunksize):
+        profile.update(chunk)
+    return profile
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of the byte range ``[start, end)`` of a file."""
+
+    def __init__(self, path: PathLike, start: int, end: int):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        read = self._file.readinto(view)
+        self._remaining -= read
+        return read
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def split_dataset(path: PathLike, n_parts: int) -> List[Dict[str, Any]]:
+    """Split a dataset file into independent work units.
+
+    Columnar directories are split into equal row ranges and Parquet files
+    by row group. Uncompressed CSV/TSV files are split into byte ranges
+    aligned to line starts; quoted fields containing newlines are not
+    supported by this split, and compressed files are kept whole.
+    """
+    path = Path(path)
+    if path.is_dir():
+        from .columnar import ColumnarDataset
+        bounds = np.linspace(0, ColumnarDataset(path).n_rows, n_parts + 1).astype(np.int64)
+        return [
+            {"kind": "columnar", "path": str(path), "start": int(start), "stop": int(stop)}
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+        ]
+
+    if is_parquet(path):
+        if pq is None:
+            raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+        n_groups = pq.ParquetFile(path).num_row_groups
+        groups = np.array_split(np.arange(n_groups), min(n_parts, max(n_groups, 1)))
+        return [{"kind": "parquet", "path": str(path), "row_groups": g.tolist()} for g in groups if g.size]
+
+    suffixes = [s.lower() for s in path.suffixes]
+    sep = "\t" if ".tsv" in suffixes else ","
+    if suffixes and suffixes[-1] not in (".csv", ".tsv", ".txt"):
+        return [{"kind": "csv", "path": str(path), "sep": sep}]
+
+    size = path.stat().st_size
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        data_start = handle.tell()
+        bounds = [data_start]
+        for i in range(1, n_parts):
+            handle.seek(max(data_start + (size - data_start) * i // n_parts - 1, bounds[-1]))
+            handle.readline()
+            bounds.append(min(handle.tell(), size))
+        bounds.append(size)
+
+    names = list(pd.read_csv(io.BytesIO(header), sep=sep, nrows=0).columns)
+    return [
+        {"kind": "csv_range", "path": str(path), "sep": sep, "names": names,
+         "start": start, "end": end}
+        for start, end in zip(bounds[:-1], bounds[1:]) if end > start
+    ]
+
+
+def _iter_unit(unit: Dict[str, Any], chunksize: int) -> Iterator[pd.DataFrame]:
+    if unit["kind"] == "columnar":
+        from .columnar import ColumnarDataset
+        yield from ColumnarDataset(unit["path"]).iter_chunks(
+            chunksize=chunksize, start=unit["start"], stop=unit["stop"]
+        )
+    elif unit["kind"] == "parquet":
+        parquet_file = pq.ParquetFile(unit["path"])
+        yield from (
+            batch.to_pandas()
+            for batch in parquet_file.iter_batches(batch_size=chunksize, row_groups=unit["row_groups"])
+        )
+    elif unit["kind"] == "csv_range":
+        with io.BufferedReader(_RangeReader(unit["path"], unit["start"], unit["end"])) as handle:
+            yield from pd.read_csv(
+                handle, sep=unit["sep"], header=None, names=unit["names"], chunksize=chunksize
+            )
+    else:
+        yield from pd.read_csv(unit["path"], sep=unit["sep"], chunksize=chunksize)
+
+
+def _profile_unit(
+    unit: Dict[str, Any], target_column: Optional[str], chunksize: int, quantile_k: int
+) -> DatasetProfile:
+    profile = DatasetProfile(target_column=target_column, quantile_k=quantile_k)
+    for chunk in _iter_unit(unit, chunksize):
+        profile.update(chunk)
+    return profile
+
+
+def profile_dataset_parallel(
+    path: PathLike,
+    target_column: Optional[str] = None,
+    n_jobs: int = -1,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    quantile_k: int = 256,
+) -> DatasetProfile:
+    """Profile a dataset across a process pool and merge the partial sketches.
+
+    Each worker streams one byte range (CSV) or set of row groups (Parquet)
+    and returns a DatasetProfile whose sketches are merged in file order.
+
+    Args:
+        path: CSV/TSV or Parquet file, or a columnar directory
+        target_column: Optional target whose class distribution is reported
+        n_jobs: Number of worker processes (-1 for all cores)
+        chunksize: Number of rows read per chunk inside each worker
+        quantile_k: Compactor size of the quantile sketches
+
+    Returns:
+        The merged DatasetProfile
+    """
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(n_jobs, 1)
+    units = split_dataset(path, n_jobs)
+    if n_jobs == 1 or len(units) <= 1:
+        return profile_dataset(path, target_column, chunksize, quantile_k)
+
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(units))) as executor:
+        futures = [
+            executor.submit(_profile_unit, unit, target_column, chunksize, quantile_k)
+            for unit in units
+        ]
+        profile = futures[0].result()
+        for future in futures[1:]:
+            profile.merge(future.result())
+    return profile
@@ -0,0 +1,75 @@
+"""
+Shared-memory NumPy arrays for the worker pools of CrewAI ML tools.
+The creating process owns and unlinks each block; workers attach to it by name without taking ownership.
+"""
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+# (shared memory name, shape, dtype) of an array in shared memory
+BlockSpec = Tuple[str, Tuple[int, ...], str]
+
+
+def attach_shared(name: str) -> SharedMemory:
+    """Attach to an existing shared memory block without taking ownership of it."""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return SharedMemory(name=name)
+
+
+class SharedArray:
+    """An array in a new shared memory block, owned (and unlinked) by the creating process.
+
+    Workers rebuild a zero-copy view from ``spec`` with ``SharedArray.attach``.
+
+    Args:
+        shape: Array shape
+        dtype: Array dtype
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any):
+        dtype = np.dtype(dtype)
+        if dtype.hasobject:
+            raise ValueError("Object arrays hold process-local pointers and cannot be shared")
+        self._shm = SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        self.spec: BlockSpec = (self._shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def copy_of(cls, array: np.ndarray) -> "SharedArray":
+        """A shared block holding a copy of ``array``."""
+        array = np.asarray(array)
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @staticmethod
+    def attach(spec: BlockSpec) -> Tuple[SharedMemory, np.ndarray]:
+        """Open a view of a block created by another process."""
+        name, shape, dtype = spec
+        shm = attach_shared(name)
+        return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+    def close(self) -> None:
+        """Release and unlink the block."""
+        del self.array
+        self._shm.close()
+        self._shm.unlink()
+
+
+# Blocks this worker process has mapped, by name
+_ATTACHED: Dict[str, Tuple[SharedMemory, np.ndarray]] = {}
+
+
+def attach_cached(specs: Sequence[BlockSpec]) -> List[np.ndarray]:
+    """Arrays of the given blocks, mapped once per worker; blocks not in ``specs`` are unmapped."""
+    names = {spec[0] for spec in specs}
+    for name in [name for name in _ATTACHED if name not in names]:
+        _ATTACHED.pop(name)[0].close()
+    for spec in specs:
+        if spec[0] not in _ATTACHED:
+            _ATTACHED[spec[0]] = SharedArray.attach(spec)
+    return [_ATTACHED[spec[0]][1] for spec in specs]
@@ -0,0 +1,187 @@
+"""
+Multi-process forest training over shared memory for CrewAI ML tools.
+The binned training set is placed once in shared memory and trees are grown by persistent worker processes.
+"""
+
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from .compiled import round_down
+from .hist_forest import FeatureBinner, HistRandomForestClassifier, HistRandomForestRegressor, _HistForest
+from .shared_arrays import BlockSpec, SharedArray, attach_cached
+
+# Tasks queued per worker; more tasks even out trees of different sizes
+DEFAULT_TASKS_PER_WORKER = 4
+
+
+def _compact(tree: Dict[str, Any]) -> Dict[str, Any]:
+    """A grown tree with int32 indices and float32 thresholds (as pack_trees() stores them)."""
+    return {
+        "left": tree["left"].astype(np.int32),
+        "right": tree["right"].astype(np.int32),
+        "feature": tree["feature"].astype(np.int32),
+        "threshold": round_down(tree["threshold"]),
+        "value": tree["value"],
+        "missing_left": tree["missing_left"],
+        "max_depth": tree["max_depth"],
+    }
+
+
+def _grow_trees(
+    template: _HistForest, codes_spec: BlockSpec, stats_spec: BlockSpec, seeds: List[np.random.SeedSequence]
+) -> List[Dict[str, Any]]:
+    """Worker task: grow one tree per seed on the shared codes and row stats."""
+    codes, stats = attach_cached([codes_spec, stats_spec])
+    trees = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        tree = template._grow_tree(codes, stats, template._sample_counts(codes.shape[0], rng), rng)
+        trees.append(_compact(tree))
+    return trees
+
+
+class SharedForestTrainer:
+    """Grows HistRandomForest trees in a pool of persistent worker processes.
+
+    ``fit`` bins ``X`` straight into one shared memory block and writes the
+    per-row target stats into another; workers map both by name instead of
+    receiving pickled or memory-mapped copies, so the data is in memory once
+    however many workers there are. Each task is a range of tree indices
+    with one seed per tree, so the fitted forest does not depend on the
+    number of workers, and returns its trees as compact node arrays that are
+    packed into the CompiledForest as tasks complete.
+
+    The pool survives between fits (use the trainer as a context manager or
+    call close()). Workers keep the blocks of their last fit mapped until
+    their next task or until the pool is closed.
+
+    Args:
+        n_workers: Number of worker processes (-1 for all cores)
+        tasks_per_worker: Tree ranges queued per worker
+    """
+
+    def __init__(self, n_workers: int = -1, tasks_per_worker: int = DEFAULT_TASKS_PER_WORKER):
+        self.n_workers = (os.cpu_count() or 1) if n_workers in (None, -1) else max(n_workers, 1)
+        self.tasks_per_worker = max(tasks_per_worker, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "SharedForestTrainer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        return self._executor
+
+    def fit(self, forest: _HistForest, X: Any, y: Any) -> _HistForest:
+        """Fit an unfitted HistRandomForestClassifier/Regressor with the worker pool.
+
+        Args:
+            forest: Forest whose parameters are used and whose fitted attributes are set
+            X: Feature matrix (array or memory map)
+            y: Targets
+
+        Returns:
+            The fitted ``forest``
+        """
+        y = np.asarray(y).ravel()
+        if y.size != X.shape[0]:
+            raise ValueError(f"X has {X.shape[0]} rows but y has {y.size}")
+        targets = forest._encode_targets(y)
+        forest.binner_ = FeatureBinner(forest.max_bins, random_state=forest.random_state).fit(X)
+
+        template = copy.copy(forest)
+        vars(template).pop("forest_", None)
+        seeds = np.random.SeedSequence(forest.random_state).spawn(forest.n_estimators)
+        n_tasks = min(forest.n_estimators, self.n_workers * self.tasks_per_worker)
+
+        blocks: List[SharedArray] = []
+        try:
+            codes = SharedArray(X.shape, np.uint8)
+            blocks.append(codes)
+            forest.binner_.transform(X, out=codes.array)
+            row_stats = forest._row_stats(targets)
+            stats = SharedArray(row_stats.shape, row_stats.dtype)
+            blocks.append(stats)
+            stats.array[:] = row_stats
+            del row_stats
+
+            futures = {
+                self._pool().submit(_grow_trees, template, codes.spec, stats.spec, [seeds[i] for i in indices]): indices
+                for indices in np.array_split(np.arange(forest.n_estimators), n_tasks)
+            }
+            trees: List[Optional[Dict[str, Any]]] = [None] * forest.n_estimators
+            for future in as_completed(futures):
+                for index, tree in zip(futures[future], future.result()):
+                    trees[index] = tree
+        finally:
+            for block in blocks:
+                block.close()
+        return forest._set_trees(trees, X.shape[1])
+
+
+def benchmark_parallel(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_estimators: int = 100,
+    n_workers: int = -1,
+    task: str = "classification",
+    random_state: Optional[int] = 42,
+) -> Dict[str, float]:
+    """Sequential vs parallel fit times of sklearn's forest and SharedForestTrainer.
+
+    Reproduces the notebook's parallel-processing comparison (``n_jobs=1``
+    against ``n_jobs=-1``) and runs the same comparison for the shared
+    memory trainer. Every configuration is warmed up on a few trees first,
+    so persistent worker pools are timed once started, as they run in a
+    long-lived service.
+
+    Args:
+        X: Feature matrix
+        y: Targets
+        n_estimators: Trees per fit
+        n_workers: Parallel workers (-1 for all cores)
+        task: "classification" or "regression"
+        random_state: Seed for every forest
+
+    Returns:
+        Dict of ``*_seconds`` fit times and the ``sklearn_speedup`` / ``shared_speedup`` ratios
+    """
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    is_classifier = task == "classification"
+    sklearn_cls = RandomForestClassifier if is_classifier else RandomForestRegressor
+    hist_cls = HistRandomForestClassifier if is_classifier else HistRandomForestRegressor
+    n_workers = (os.cpu_count() or 1) if n_workers in (None, -1) else max(n_workers, 1)
+
+    def timed(fit, n_trees: int) -> float:
+        fit(2)
+        start = time.perf_counter()
+        fit(n_trees)
+        return time.perf_counter() - start
+
+    results: Dict[str, float] = {"n_workers": float(n_workers)}
+    for label, jobs in (("seq", 1), ("par", n_workers)):
+        results[f"sklearn_{label}_seconds"] = timed(
+            lambda n: sklearn_cls(n_estimators=n, n_jobs=jobs, random_state=random_state).fit(X, y), n_estimators
+        )
+        with SharedForestTrainer(jobs) as trainer:
+            results[f"shared_{label}_seconds"] = timed(
+                lambda n: trainer.fit(hist_cls(n_estimators=n, random_state=random_state), X, y), n_estimators
+            )
+    results["sklearn_speedup"] = results["sklearn_seq_seconds"] / results["sklearn_par_seconds"]
+    results["shared_speedup"] = results["shared_seq_seconds"] / results["shared_par_seconds"]
+    return results
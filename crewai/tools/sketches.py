@@ -0,0 +1,242 @@
+"""
+Mergeable streaming sketches for dataset profiling.
+Each sketch is updated chunk by chunk and can be combined with another sketch of the same kind.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+class MomentSketch:
+    """Running count, mean, variance, min and max (Welford/Chan update)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> "MomentSketch":
+        """Fold a chunk of values into the running moments, ignoring NaNs."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        chunk = MomentSketch()
+        chunk.count = values.size
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other: "MomentSketch") -> "MomentSketch":
+        """Combine another sketch into this one in place."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1), NaN when fewer than two values were seen."""
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the moments as JSON-serialisable values."""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": int(self.count),
+            "mean": self.mean,
+            "std": float(np.sqrt(self.variance)) if self.count > 1 else None,
+            "variance": self.variance if self.count > 1 else None,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch with bounded memory.
+
+    Values are kept in levels of compactors; level ``h`` holds items that each
+    stand for ``2**h`` original values. Memory is ``O(k * log(n / k))`` and the
+    rank error is roughly ``1 / k``.
+
+    Args:
+        k: Capacity of each compactor level (higher is more accurate)
+        seed: Seed for the random compaction offsets
+    """
+
+    def __init__(self, k: int = 256, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        """Add a chunk of values, ignoring NaNs."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Combine another sketch into this one in place."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self.k:
+                items = np.sort(items)
+                keep = items.size % 2
+                offset = int(self._rng.integers(2))
+                paired = items[keep:]
+                promoted = paired[offset::2]
+                self.levels[h] = items[:keep]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Return approximate values at the requested quantiles."""
+        if self.n == 0:
+            return [None for _ in qs]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind="mergesort")
+        values, cum = values[order], np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cum[-1]
+        idx = np.minimum(np.searchsorted(cum, targets, side="left"), values.size - 1)
+        return [float(v) for v in values[idx]]
+
+    @property
+    def size(self) -> int:
+        """Number of retained items."""
+        return int(sum(items.size for items in self.levels))
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit hashes.
+
+    Args:
+        precision: Number of index bits; ``2**precision`` one-byte registers are kept
+            and the relative error is about ``1.04 / sqrt(2**precision)``
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add a chunk of uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return self
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # frexp gives w = m * 2**e with m in [0.5, 1), so floor(log2(w)) = e - 1
+        _, exponent = np.frexp(tail.astype(np.float64))
+        rank = np.where(tail == 0, tail_bits + 1, tail_bits - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def update(self, series: pd.Series) -> "HyperLogLog":
+        """Add the non-null values of a pandas Series."""
+        series = series.dropna()
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            # Hash 1 and 1.0 identically whatever dtype the chunk was parsed as
+            series = series.astype(np.float64)
+        return self.update_hashes(pd.util.hash_pandas_object(series, index=False).to_numpy())
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Combine another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class TopKSketch:
+    """Misra-Gries heavy-hitter summary of the most frequent values.
+
+    Counts are underestimated by at most ``n / (capacity + 1)`` and two
+    summaries can be merged without losing that guarantee.
+
+    Args:
+        capacity: Number of counters kept
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counters: Dict[Any, int] = {}
+        self.n = 0
+
+    def update(self, series: pd.Series) -> "TopKSketch":
+        """Add the non-null values of a pandas Series."""
+        counts = series.value_counts(dropna=True)
+        self.n += int(counts.sum())
+        if len(counts) > self.capacity:
+            # Reduce the chunk to a summary of its own before the Python-level merge
+            cut = int(counts.iloc[self.capacity])
+            counts = counts[counts > cut] - cut
+        return self._absorb(counts.items())
+
+    def merge(self, other: "TopKSketch") -> "TopKSketch":
+        """Combine another summary into this one in place."""
+        self.n += other.n
+        return self._absorb(other.counters.items())
+
+    def _absorb(self, items) -> "TopKSketch":
+        counters = self.counters
+        for value, count in items:
+            key = value.item() if isinstance(value, np.generic) else value
+            counters[key] = counters.get(key, 0) + int(count)
+        if len(counters) > self.capacity:
+            cut = sorted(counters.values(), reverse=True)[self.capacity]
+            self.counters = {key: count - cut for key, count in counters.items() if count > cut}
+        return self
+
+    def top(self, k: int = 10) -> List[Tuple[Any, int]]:
+        """The ``k`` most frequent values with their (lower-bound) counts."""
+        return sorted(self.counters.items(), key=lambda item: -item[1])[:k]
@@ -0,0 +1,176 @@
+"""
+Exact path-dependent TreeSHAP for scikit-learn Random Forests.
+Walks every tree once per batch of rows, keeping the SHAP path state as row vectors.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from joblib import Parallel, delayed
+
+
+def tree_arrays(tree: Any, is_classifier: bool) -> Dict[str, np.ndarray]:
+    """Extract the node arrays TreeSHAP needs from a fitted sklearn tree."""
+    t = tree.tree_
+    values = t.value[:, 0, :] if is_classifier else t.value[:, :, 0]
+    if is_classifier:
+        values = values / values.sum(axis=1, keepdims=True)
+    return {
+        "left": t.children_left,
+        "right": t.children_right,
+        "feature": t.feature,
+        "threshold": t.threshold,
+        "weight": t.weighted_n_node_samples,
+        "value": np.asarray(values, dtype=np.float64),
+    }
+
+
+class _PathExplainer:
+    """Algorithm 2 of Lundberg et al. (2020) with per-row path fractions.
+
+    In the row-at-a-time algorithm the "hot" child gets one_fraction = 1 and
+    the "cold" child 0. Here both children are visited once for the whole
+    batch and one_fraction becomes a 0/1 vector telling, per row, whether
+    the row follows the branch; every path weight is a row vector too.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], X: np.ndarray, phi: np.ndarray):
+        self.a = arrays
+        self.X = X
+        self.phi = phi
+        self.n = X.shape[0]
+
+    @staticmethod
+    def _extend(feat, zero, one, pw, depth, zero_fraction, one_fraction, feature):
+        feat[depth] = feature
+        zero[depth] = zero_fraction
+        one[depth] = one_fraction
+        if depth == 0:
+            pw[0] = 1.0
+            return
+        # The sequential update of the reference algorithm, as one (depth + 1, n) expression:
+        # new[k] = zero * old[k] * (depth - k) / (depth + 1) + one * old[k - 1] * k / (depth + 1)
+        k = np.arange(depth + 1)[:, None]
+        old = pw[:depth].copy()
+        pw[depth] = 0.0
+        pw[:depth] = zero_fraction * old * ((depth - k[:depth]) / (depth + 1))
+        pw[1:] += one_fraction * old * (k[1:] / (depth + 1))
+
+    @staticmethod
+    def _unwind(feat, zero, one, pw, depth, index):
+        one_fraction, zero_fraction = one[index], zero[index]
+        hot = one_fraction != 0
+        next_one = pw[depth].copy()
+        for i in range(depth - 1, -1, -1):
+            from_one = next_one * ((depth + 1) / (i + 1))
+            from_zero = pw[i] * ((depth + 1) / (zero_fraction * (depth - i)))
+            next_one = np.where(hot, pw[i] - from_one * zero_fraction * ((depth - i) / (depth + 1)), next_one)
+            pw[i] = np.where(hot, from_one, from_zero)
+        for i in range(index, depth):
+            feat[i], zero[i], one[i] = feat[i + 1], zero[i + 1], one[i + 1]
+
+    @staticmethod
+    def _unwound_sums(zero, one, pw, depth):
+        """Unwound path sums for every path element ``1..depth`` at once, shape ``(depth, n)``."""
+        one_fraction = np.stack([np.broadcast_to(one[i], pw.shape[1:]) for i in range(1, depth + 1)])
+        zero_fraction = np.array(zero[1:depth + 1])[:, None]
+        next_one = np.repeat(pw[depth][None, :], depth, axis=0)
+        total_hot = np.zeros_like(next_one)
+        total_cold = np.zeros_like(next_one)
+        for i in range(depth - 1, -1, -1):
+            tmp = next_one * ((depth + 1) / (i + 1))
+            total_hot += tmp
+            next_one = pw[i] - tmp * zero_fraction * ((depth - i) / (depth + 1))
+            total_cold += pw[i] / (zero_fraction * ((depth - i) / (depth + 1)))
+        return np.where(one_fraction != 0, total_hot, total_cold), one_fraction, zero_fraction
+
+    def recurse(self, node, depth, p_feat, p_zero, p_one, p_pw, zero_fraction, one_fraction, feature):
+        feat, zero, one = p_feat[:depth] + [None], p_zero[:depth] + [None], p_one[:depth] + [None]
+        pw = np.empty((depth + 1, self.n))
+        pw[:depth] = p_pw[:depth]
+        self._extend(feat, zero, one, pw, depth, zero_fraction, one_fraction, feature)
+
+        a = self.a
+        left = a["left"][node]
+        if left < 0:
+            if depth == 0:
+                return
+            # Path features are unique after unwinding, so the fancy-index add has no collisions
+            w, one_fraction, zero_fraction = self._unwound_sums(zero, one, pw, depth)
+            contribution = ((one_fraction - zero_fraction) * w).T
+            self.phi[:, feat[1:depth + 1], :] += contribution[:, :, None] * a["value"][node][None, None, :]
+            return
+
+        split = a["feature"][node]
+        goes_left = self.X[:, split] <= a["threshold"][node]
+        right = a["right"][node]
+        weight = a["weight"][node]
+
+        incoming_zero, incoming_one = 1.0, np.ones(self.n)
+        if split in feat[:depth + 1]:
+            index = feat.index(split, 0, depth + 1)
+            incoming_zero, incoming_one = zero[index], one[index]
+            self._unwind(feat, zero, one, pw, depth, index)
+            depth -= 1
+
+        self.recurse(left, depth + 1, feat, zero, one, pw,
+                     a["weight"][left] / weight * incoming_zero, incoming_one * goes_left, split)
+        self.recurse(right, depth + 1, feat, zero, one, pw,
+                     a["weight"][right] / weight * incoming_zero, incoming_one * ~goes_left, split)
+
+
+def _explain_trees(trees: List[Dict[str, np.ndarray]], X: np.ndarray, n_outputs: int) -> np.ndarray:
+    phi = np.zeros((X.shape[0], X.shape[1], n_outputs))
+    for arrays in trees:
+        explainer = _PathExplainer(arrays, X, phi)
+        explainer.recurse(0, 0, [], [], [], np.empty((0, X.shape[0])), 1.0, np.ones(X.shape[0]), -1)
+    return phi
+
+
+def tree_shap(
+    forest: Any,
+    X: np.ndarray,
+    batch_rows: int = 4096,
+    n_jobs: int = -1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact path-dependent SHAP values of a fitted sklearn Random Forest.
+
+    Rows are processed in batches; within a batch each tree is walked once
+    with all path weights held as row vectors, and trees are split across
+    ``n_jobs`` workers whose contributions are summed.
+
+    Args:
+        forest: Fitted RandomForestClassifier/RandomForestRegressor
+        X: Rows to explain
+        batch_rows: Rows explained per tree walk (bounds memory)
+        n_jobs: Number of parallel workers (-1 for all cores)
+
+    Returns:
+        ``(phi, expected_value)`` where ``phi`` has shape ``(n, n_features, n_outputs)``
+        (one output per class for classifiers) and ``phi.sum(1) + expected_value``
+        equals ``predict_proba``/``predict``
+    """
+    is_classifier = hasattr(forest, "classes_")
+    trees = [tree_arrays(tree, is_classifier) for tree in forest.estimators_]
+    n_outputs = trees[0]["value"].shape[1]
+    expected_value = np.mean([t["value"][0] for t in trees], axis=0)
+
+    X = np.asarray(X, dtype=np.float32)
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(n_jobs, 1)
+    tree_groups = [group for group in np.array_split(np.arange(len(trees)), n_jobs) if group.size]
+
+    phi = np.zeros((X.shape[0], X.shape[1], n_outputs))
+    with Parallel(n_jobs=len(tree_groups)) as parallel:
+        for start in range(0, X.shape[0], batch_rows):
+            batch = X[start:start + batch_rows]
+            parts = parallel(
+                delayed(_explain_trees)([trees[t] for t in group], batch, n_outputs)
+                for group in tree_groups
+            )
+            phi[start:start + batch.shape[0]] = sum(parts) / len(trees)
+    return phi, expected_value
+
+
+def shap_importance(phi: np.ndarray) -> np.ndarray:
+    """Global importance per feature: mean |SHAP| summed over outputs."""
+    return np.abs(phi).mean(axis=0).sum(axis=-1)
@@ -0,0 +1,243 @@
+"""
+Persistent trial store for hyperparameter searches.
+Every (dataset, parameters, fold) result is written to SQLite as soon as it is scored,
+so an interrupted search resumes where it stopped and other searches reuse its trials.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from ..config import config
+
+_PAGE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+PathLike = Union[str, Path]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    dataset TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    fit_seconds REAL NOT NULL,
+    peak_memory_mb REAL,
+    search_id TEXT,
+    created REAL NOT NULL,
+    PRIMARY KEY (dataset, params_hash, fold)
+);
+CREATE TABLE IF NOT EXISTS searches (
+    search_id TEXT PRIMARY KEY,
+    strategy TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    options TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS search_trials (
+    search_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    PRIMARY KEY (search_id, dataset, params_hash, fold)
+);
+"""
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    """Stable hash of a parameter dict, independent of key order."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def dataset_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash of an in-memory training set (shapes, dtypes and bytes of ``X`` and ``y``)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        array = np.asarray(array)
+        if array.dtype.kind == "O":
+            array = array.astype(str)
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.shape}:{array.dtype.str}".encode())
+        digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
+
+
+def _resident_bytes() -> Optional[int]:
+    """Current resident memory of this process, or None without ``/proc``."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_BYTES
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakMemory:
+    """Resident memory a block of code adds at its peak, sampled from a background thread.
+
+    ``mb`` is the largest resident size seen while the block ran minus the
+    size on entry, so memory the process already held (data, earlier
+    trials) does not count. Resident size belongs to the whole process:
+    work running on other threads at the same time is included, so measure
+    one fit at a time. ``mb`` stays None where resident memory cannot be
+    read.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _resident_bytes() or 0)
+
+    def __enter__(self) -> "PeakMemory":
+        self._start = _resident_bytes()
+        if self._start is not None:
+            self._peak = self._start
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, _resident_bytes() or 0)
+        self.mb = (self._peak - self._start) / (1024 * 1024)
+
+
+class TrialStore:
+    """SQLite table of scored trials keyed by (dataset fingerprint, params hash, fold).
+
+    Each trial is committed as soon as it is recorded, so a crash loses at
+    most the trial in flight. Searches are registered by id: rerunning a
+    search with the same id resumes it, and any search on the same data
+    reuses trials whose parameters (including the resources that shaped
+    the fit) hash identically.
+
+    Args:
+        path: Database file (defaults to ``config.OUTPUTS_DIR / "trials.sqlite"``)
+    """
+
+    def __init__(self, path: Optional[PathLike] = None):
+        self.path = Path(path) if path else config.OUTPUTS_DIR / "trials.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), timeout=30.0)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "TrialStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def get(self, dataset: str, params: Dict[str, Any], fold: int) -> Optional[Dict[str, Any]]:
+        """Return the recorded trial, or None if it has not been run on this dataset."""
+        row = self._connection.execute(
+            "SELECT metrics, fit_seconds, peak_memory_mb, search_id FROM trials "
+            "WHERE dataset = ? AND params_hash = ? AND fold = ?",
+            (dataset, params_hash(params), fold),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "metrics": json.loads(row[0]),
+            "fit_seconds": row[1],
+            "peak_memory_mb": row[2],
+            "search_id": row[3],
+        }
+
+    def put(
+        self,
+        dataset: str,
+        params: Dict[str, Any],
+        fold: int,
+        metrics: Dict[str, float],
+        fit_seconds: float,
+        peak_memory: Optional[float] = None,
+        search_id: Optional[str] = None,
+    ) -> None:
+        """Record a scored trial and commit it; ``peak_memory`` is the MB its fit added (see PeakMemory)."""
+        key = params_hash(params)
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (dataset, key, fold, json.dumps(params, sort_keys=True, default=str),
+                 json.dumps(metrics), fit_seconds, peak_memory, search_id, time.time()),
+            )
+            if search_id is not None:
+                self._link(search_id, dataset, key, fold)
+
+    def link(self, search_id: str, dataset: str, params: Dict[str, Any], fold: int) -> None:
+        """Attach an existing trial to ``search_id`` without rerunning it."""
+        with self._connection:
+            self._link(search_id, dataset, params_hash(params), fold)
+
+    def _link(self, search_id: str, dataset: str, key: str, fold: int) -> None:
+        self._connection.execute(
+            "INSERT OR IGNORE INTO search_trials VALUES (?, ?, ?, ?)",
+            (search_id, dataset, key, fold),
+        )
+
+    def start_search(self, search_id: str, strategy: str, dataset: str, options: Dict[str, Any]) -> bool:
+        """Register a search; returns True when ``search_id`` already existed (a resume)."""
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO searches (search_id, strategy, dataset, options, started) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (search_id, strategy, dataset, json.dumps(options, sort_keys=True, default=str), time.time()),
+            )
+        return cursor.rowcount == 0
+
+    def finish_search(self, search_id: str, result: Dict[str, Any]) -> None:
+        """Mark a search complete and keep its summary."""
+        with self._connection:
+            self._connection.execute(
+                "UPDATE searches SET finished = ?, result = ? WHERE search_id = ?",
+                (time.time(), json.dumps(result, default=str), search_id),
+            )
+
+    def trials(self, search_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recorded trials, optionally only those used by ``search_id``."""
+        query = "SELECT t.dataset, t.params, t.fold, t.metrics, t.fit_seconds, t.peak_memory_mb, t.search_id FROM trials t"
+        args: tuple = ()
+        if search_id is not None:
+            query += (
+                " JOIN search_trials s ON s.dataset = t.dataset AND s.params_hash = t.params_hash"
+                " AND s.fold = t.fold WHERE s.search_id = ?"
+            )
+            args = (search_id,)
+        return [
+            {
+                "dataset": dataset,
+                "params": json.loads(params),
+                "fold": fold,
+                "metrics": json.loads(metrics),
+                "fit_seconds": fit_seconds,
+                "peak_memory_mb": peak,
+                "search_id": owner,
+            }
+            for dataset, params, fold, metrics, fit_seconds, peak, owner
+            in self._connection.execute(query + " ORDER BY t.created", args)
+        ]
@@ -0,0 +1,768 @@
+"""
+Hyperparameter tuning engines for CrewAI ML tools.
+Successive halving and Hyperband with tree count and sample size as the fidelity, a grid
+search that scores nested n_estimators/max_depth variants from one fit, and batched Bayesian
+optimization with a TPE surrogate that can trade accuracy against serving costs. Trials can
+be recorded in a TrialStore so interrupted searches resume and repeated trials are reused.
+"""
+
+import itertools
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.model_selection import KFold, StratifiedKFold
+from joblib import Parallel, delayed
+
+from ..config import config
+from .bayesian import TPESampler
+from .compiled import goes_right
+from .costs import (
+    check_constraints, constraint_violation, cost_keys, latency_keys, model_costs, pareto_front,
+)
+from .hist_forest import resolve_max_features
+from .importance import SCORINGS, score_predictions
+from .treeshap import tree_arrays
+from .trials import PeakMemory, TrialStore, dataset_fingerprint, params_hash
+
+# The notebook's GridSearchCV grid; n_estimators is the fidelity rather than a searched dimension
+DEFAULT_SPACE: Dict[str, Any] = {
+    "max_depth": [10, 20, None],
+    "min_samples_split": [2, 5, 10],
+    "max_features": ["sqrt", "log2"],
+}
+
+Fold = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Canonical JSON form of a parameter dict, usable as a dict key or hash input."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def sample_params(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """Draw one configuration from ``space``.
+
+    Lists are categorical choices; ``(low, high)`` tuples are integer ranges
+    when both ends are ints and uniform float ranges otherwise.
+    """
+    params = {}
+    for name, domain in space.items():
+        if isinstance(domain, tuple):
+            low, high = domain
+            if isinstance(low, int) and isinstance(high, int):
+                params[name] = int(rng.integers(low, high + 1))
+            else:
+                params[name] = float(rng.uniform(low, high))
+        else:
+            params[name] = domain[int(rng.integers(len(domain)))]
+    return params
+
+
+def sample_configurations(
+    space: Dict[str, Any], n: int, rng: np.random.Generator
+) -> List[Dict[str, Any]]:
+    """``n`` distinct configurations; the whole grid when it has at most ``n`` points."""
+    if all(isinstance(domain, list) for domain in space.values()):
+        names = list(space)
+        grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+        if len(grid) <= n:
+            return grid
+        return [grid[i] for i in rng.choice(len(grid), size=n, replace=False)]
+
+    seen: Dict[str, Dict[str, Any]] = {}
+    for _ in range(20 * n):
+        params = sample_params(space, rng)
+        seen.setdefault(params_key(params), params)
+        if len(seen) == n:
+            break
+    return list(seen.values())
+
+
+def make_folds(
+    X: np.ndarray, y: np.ndarray, cv: int, is_classifier: bool, random_state: Optional[int]
+) -> List[Fold]:
+    """Materialise ``(X_train, y_train, X_val, y_val)`` once per fold, shared by all candidates."""
+    splitter_cls = StratifiedKFold if is_classifier else KFold
+    splitter = splitter_cls(n_splits=cv, shuffle=True, random_state=random_state)
+    return [
+        (X[train], y[train], X[val], y[val])
+        for train, val in splitter.split(X, y)
+    ]
+
+
+class _TrialLog:
+    """One search's view of an optional TrialStore.
+
+    Trial parameters are extended with everything that fixes the folds and
+    the metric, so a stored result is only reused where it would be
+    reproduced exactly. Without a store every lookup misses.
+    """
+
+    def __init__(self, store: Optional[TrialStore], X: np.ndarray, y: np.ndarray,
+                 context: Dict[str, Any], search: Dict[str, Any], search_id: Optional[str]):
+        self.store = store
+        self.context = context
+        self.search_id = search_id
+        self.dataset = None
+        self.reused = self.run = 0
+        self.resumed = False
+        if store is not None:
+            self.dataset = dataset_fingerprint(X, y)
+            self.search_id = search_id or params_hash({**search, **context, "dataset": self.dataset})
+            self.resumed = store.start_search(self.search_id, search["strategy"], self.dataset, search)
+
+    def get(self, params: Dict[str, Any], fold: int) -> Optional[Dict[str, float]]:
+        if self.store is None:
+            return None
+        trial = {**params, **self.context}
+        record = self.store.get(self.dataset, trial, fold)
+        if record is None:
+            return None
+        self.store.link(self.search_id, self.dataset, trial, fold)
+        self.reused += 1
+        return record["metrics"]
+
+    def put(self, params: Dict[str, Any], fold: int, metrics: Dict[str, float], fit_seconds: float,
+            peak_memory: Optional[float] = None) -> None:
+        self.run += 1
+        if self.store is not None:
+            self.store.put(self.dataset, {**params, **self.context}, fold, metrics, fit_seconds,
+                           peak_memory, self.search_id)
+
+    def finish(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        result["trials_run"] = self.run
+        result["trials_reused"] = self.reused
+        if self.store is not None:
+            result["search_id"] = self.search_id
+            result["resumed"] = self.resumed
+            self.store.finish_search(self.search_id, result)
+        return result
+
+
+class _Candidate:
+    """One configuration with a warm-started forest per fold.
+
+    The per-fold sums of validation outputs let each rung score only the
+    trees added since the previous rung. A rung whose score was restored
+    from the trial log leaves that fold's forest behind; it is caught up by
+    replaying the skipped rungs the first time a later rung has to be fitted.
+    """
+
+    def __init__(self, params: Dict[str, Any], estimator: Any, n_folds: int, base_params: Dict[str, Any]):
+        self.params = params
+        self.forests = [
+            estimator(**{**base_params, **params, "warm_start": True, "bootstrap": True})
+            for _ in range(n_folds)
+        ]
+        self.sums: List[Optional[np.ndarray]] = [None] * n_folds
+        self.schedule: List[Tuple[int, Optional[float]]] = []
+        self.stages = [0] * n_folds
+        self.n_trees = 0
+        self.score = -np.inf
+
+    def _grow_fold(self, f: int, fold: Fold, n_trees: int, max_samples: Optional[float]) -> int:
+        X_train, y_train, X_val, _ = fold
+        forest = self.forests[f]
+        start = len(getattr(forest, "estimators_", []))
+        forest.set_params(n_estimators=n_trees, max_samples=max_samples)
+        forest.fit(X_train, y_train)
+        is_classifier = hasattr(forest, "classes_")
+        for tree in forest.estimators_[start:]:
+            if is_classifier:
+                output = tree.predict_proba(X_val, check_input=False)
+            else:
+                output = tree.predict(X_val, check_input=False).reshape(-1, 1)
+            self.sums[f] = output if self.sums[f] is None else self.sums[f] + output
+        return len(forest.estimators_) - start
+
+    def grow(self, folds: List[Fold], n_trees: int, max_samples: Optional[float], scoring: str,
+             log: _TrialLog) -> int:
+        """Grow every fold's forest to ``n_trees`` and rescore; returns the trees added."""
+        self.schedule.append((n_trees, max_samples))
+        trial = {**self.params, "method": "warm_start", "schedule": list(self.schedule)}
+        added = 0
+        scores = []
+        for f, fold in enumerate(folds):
+            metrics = log.get(trial, f)
+            if metrics is None:
+                start = time.perf_counter()
+                with PeakMemory() as memory:
+                    while self.stages[f] < len(self.schedule):
+                        added += self._grow_fold(f, fold, *self.schedule[self.stages[f]])
+                        self.stages[f] += 1
+                forest = self.forests[f]
+                classes = getattr(forest, "classes_", None)
+                output = self.sums[f] / len(forest.estimators_)
+                metrics = {scoring: score_predictions(fold[3], output, scoring, classes)}
+                log.put(trial, f, metrics, time.perf_counter() - start, memory.mb)
+            scores.append(metrics[scoring])
+        self.n_trees = n_trees
+        self.score = float(np.mean(scores))
+        return added
+
+
+def _rung_resources(
+    n_rungs: int, eta: int, max_estimators: int, min_estimators: int, min_sample_fraction: float
+) -> List[Tuple[int, Optional[float]]]:
+    """``(n_estimators, max_samples)`` per rung; the last rung is the full forest on full bootstraps."""
+    resources = []
+    for rung in range(n_rungs):
+        fraction = float(eta) ** (rung - n_rungs + 1)
+        n_trees = max(min_estimators, int(math.ceil(fraction * max_estimators)))
+        max_samples = max(fraction, min_sample_fraction)
+        resources.append((min(n_trees, max_estimators), None if max_samples >= 1.0 else max_samples))
+    return resources
+
+
+def _run_bracket(
+    candidates: List[_Candidate],
+    folds: List[Fold],
+    resources: List[Tuple[int, Optional[float]]],
+    eta: int,
+    scoring: str,
+    log: _TrialLog,
+) -> Tuple[List[_Candidate], List[Dict[str, Any]], int]:
+    """Successive halving over ``resources``; returns survivors, rung history and trees fitted."""
+    history = []
+    trees_fitted = 0
+    alive = candidates
+    for rung, (n_trees, max_samples) in enumerate(resources):
+        for candidate in alive:
+            trees_fitted += candidate.grow(folds, n_trees, max_samples, scoring, log)
+        alive = sorted(alive, key=lambda c: c.score, reverse=True)
+        history.append({
+            "n_estimators": n_trees,
+            "max_samples": max_samples,
+            "n_candidates": len(alive),
+            "results": [{"params": c.params, "score": c.score} for c in alive],
+        })
+        if rung < len(resources) - 1:
+            alive = alive[:max(1, len(alive) // eta)]
+            # Forests that were eliminated are released immediately
+            for dropped in candidates:
+                if dropped not in alive:
+                    dropped.forests = []
+    return alive, history, trees_fitted
+
+
+def _setup(
+    X: Any, y: Any, task: str, scoring: Optional[str], cv: int, random_state: Optional[int],
+    trial_store: Optional[TrialStore], search: Dict[str, Any], search_id: Optional[str],
+) -> Tuple[Any, str, List[Fold], _TrialLog]:
+    if task not in ("classification", "regression"):
+        raise ValueError(f"Unknown task '{task}', expected 'classification' or 'regression'")
+    is_classifier = task == "classification"
+    scoring = scoring or ("accuracy" if is_classifier else "r2")
+    if scoring not in SCORINGS:
+        raise ValueError(f"Unsupported scoring '{scoring}', expected one of {SCORINGS}")
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y).ravel()
+    estimator = RandomForestClassifier if is_classifier else RandomForestRegressor
+    context = {"task": task, "scoring": scoring, "cv": cv, "random_state": random_state}
+    log = _TrialLog(trial_store, X, y, context, search, search_id)
+    return estimator, scoring, make_folds(X, y, cv, is_classifier, random_state), log
+
+
+def _search_space(space: Optional[Dict[str, Any]], max_estimators: Optional[int]) -> Tuple[Dict[str, Any], int]:
+    """Drop n_estimators from the space; its largest value becomes the full-fidelity forest size."""
+    space = dict(DEFAULT_SPACE if space is None else space)
+    n_estimators = space.pop("n_estimators", None)
+    if max_estimators is None:
+        if isinstance(n_estimators, tuple):
+            max_estimators = int(n_estimators[1])
+        elif n_estimators:
+            max_estimators = int(max(n_estimators))
+        else:
+            max_estimators = 300
+    return space, max_estimators
+
+
+def _summary(strategy: str, scoring: str, finalists: List[_Candidate], brackets: List[Any],
+             trees_fitted: int, n_configurations: int, max_estimators: int, cv: int,
+             log: _TrialLog) -> Dict[str, Any]:
+    best = max(finalists, key=lambda c: c.score)
+    full_budget = n_configurations * max_estimators * cv
+    return log.finish({
+        "strategy": strategy,
+        "scoring": scoring,
+        "best_params": {**best.params, "n_estimators": max_estimators},
+        "best_score": best.score,
+        "n_configurations": n_configurations,
+        "trees_fitted": trees_fitted,
+        "full_budget_trees": full_budget,
+        "budget_fraction": trees_fitted / full_budget if full_budget else 0.0,
+        "brackets": brackets,
+    })
+
+
+def successive_halving(
+    X: Any,
+    y: Any,
+    space: Optional[Dict[str, Any]] = None,
+    task: str = "classification",
+    n_candidates: int = 27,
+    max_estimators: Optional[int] = None,
+    eta: int = 3,
+    min_estimators: int = 8,
+    min_sample_fraction: float = 0.1,
+    cv: int = config.DEFAULT_CV_FOLDS,
+    scoring: Optional[str] = None,
+    n_jobs: int = -1,
+    random_state: Optional[int] = config.DEFAULT_RANDOM_STATE,
+    trial_store: Optional[TrialStore] = None,
+    search_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Successive halving where a rung's budget is both tree count and bootstrap size.
+
+    All candidates start as small forests on small bootstrap samples. After
+    each rung the best ``1/eta`` survive and are grown with ``warm_start``:
+    the existing trees are kept, new trees are added on larger samples and
+    only the new trees are scored. Poor configurations are dropped after a
+    handful of cheap trees instead of a full cross-validated fit.
+
+    Args:
+        X: Training features
+        y: Training targets
+        space: Search space (lists are choices, ``(low, high)`` tuples are ranges);
+            an ``n_estimators`` entry only sets the final forest size
+        task: "classification" or "regression"
+        n_candidates: Configurations in the first rung
+        max_estimators: Trees per forest in the last rung (default from the space, else 300)
+        eta: Halving rate; each rung keeps ``1/eta`` of the candidates
+        min_estimators: Trees per forest in the first rung at least
+        min_sample_fraction: Smallest ``max_samples`` fraction used
+        cv: Number of cross-validation folds
+        scoring: One of SCORINGS (accuracy for classification, r2 for regression by default)
+        n_jobs: Parallel jobs per forest fit
+        random_state: Seed for sampling, folds and forests
+        trial_store: Records every (configuration, rung, fold) score; stored
+            scores are reused instead of refitted
+        search_id: Name of the search in ``trial_store`` (derived from the
+            data and arguments by default, so an identical call resumes)
+
+    Returns:
+        Dict with the best parameters and score, the per-rung history and the
+        number of trees fitted compared with a full search
+    """
+    space, max_estimators = _search_space(space, max_estimators)
+    search = {"strategy": "successive_halving", "space": space, "n_candidates": n_candidates,
+              "max_estimators": max_estimators, "eta": eta, "min_estimators": min_estimators,
+              "min_sample_fraction": min_sample_fraction}
+    estimator, scoring, folds, log = _setup(X, y, task, scoring, cv, random_state, trial_store, search, search_id)
+    rng = np.random.default_rng(random_state)
+    configurations = sample_configurations(space, n_candidates, rng)
+
+    base_params = {"n_jobs": n_jobs, "random_state": random_state}
+    candidates = [_Candidate(params, estimator, cv, base_params) for params in configurations]
+    n_rungs = int(math.floor(math.log(max(len(candidates), 1), eta) + 1e-9)) + 1
+    resources = _rung_resources(n_rungs, eta, max_estimators, min_estimators, min_sample_fraction)
+    finalists, history, trees_fitted = _run_bracket(candidates, folds, resources, eta, scoring, log)
+    return _summary("successive_halving", scoring, finalists, [history], trees_fitted,
+                    len(configurations), max_estimators, cv, log)
+
+
+def hyperband(
+    X: Any,
+    y: Any,
+    space: Optional[Dict[str, Any]] = None,
+    task: str = "classification",
+    max_estimators: Optional[int] = None,
+    eta: int = 3,
+    min_estimators: int = 8,
+    min_sample_fraction: float = 0.1,
+    cv: int = config.DEFAULT_CV_FOLDS,
+    scoring: Optional[str] = None,
+    n_jobs: int = -1,
+    random_state: Optional[int] = config.DEFAULT_RANDOM_STATE,
+    trial_store: Optional[TrialStore] = None,
+    search_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Hyperband: successive-halving brackets trading candidate count for starting budget.
+
+    Bracket ``s`` starts ``ceil((s_max + 1) / (s + 1) * eta**s)`` candidates at
+    ``eta**-s`` of the full forest, so aggressive early stopping is hedged by
+    brackets that give fewer candidates more trees from the start. Every
+    bracket ends at the full forest, so the finalists are directly comparable.
+
+    Args:
+        Same as successive_halving(), without ``n_candidates`` (set per bracket)
+
+    Returns:
+        Dict with the best parameters and score over all brackets
+    """
+    space, max_estimators = _search_space(space, max_estimators)
+    search = {"strategy": "hyperband", "space": space, "max_estimators": max_estimators, "eta": eta,
+              "min_estimators": min_estimators, "min_sample_fraction": min_sample_fraction}
+    estimator, scoring, folds, log = _setup(X, y, task, scoring, cv, random_state, trial_store, search, search_id)
+    rng = np.random.default_rng(random_state)
+    base_params = {"n_jobs": n_jobs, "random_state": random_state}
+
+    s_max = int(math.floor(math.log(max(max_estimators / min_estimators, 1), eta) + 1e-9))
+    brackets, finalists = [], []
+    trees_fitted = n_configurations = 0
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        configurations = sample_configurations(space, n, rng)
+        candidates = [_Candidate(params, estimator, cv, base_params) for params in configurations]
+        resources = _rung_resources(s + 1, eta, max_estimators, min_estimators, min_sample_fraction)
+        survivors, history, fitted = _run_bracket(candidates, folds, resources, eta, scoring, log)
+        finalists.extend(survivors)
+        brackets.append(history)
+        trees_fitted += fitted
+        n_configurations += len(configurations)
+    return _summary("hyperband", scoring, finalists, brackets, trees_fitted,
+                    n_configurations, max_estimators, cv, log)
+
+
+def _fit_and_score(
+    estimator: Any, params: Dict[str, Any], fold: Fold, scoring: str, keep_model: bool = False,
+    measure_memory: bool = False,
+) -> Tuple[float, float, Optional[float], Optional[Any]]:
+    """Fit one forest on a fold.
+
+    Returns:
+        The validation score, the fit time, the MB the fit added (with
+        ``measure_memory``, else None) and the forest (with ``keep_model``)
+    """
+    X_train, y_train, X_val, y_val = fold
+    start = time.perf_counter()
+    memory = PeakMemory()
+    if measure_memory:
+        with memory:
+            forest = estimator(**params).fit(X_train, y_train)
+    else:
+        forest = estimator(**params).fit(X_train, y_train)
+    classes = getattr(forest, "classes_", None)
+    output = forest.predict_proba(X_val) if classes is not None else forest.predict(X_val)
+    score = score_predictions(y_val, output, scoring, classes)
+    return score, time.perf_counter() - start, memory.mb, forest if keep_model else None
+
+
+def _sampler_observations(entries: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+    """Scores the surrogate learns from: infeasible configurations rank below every feasible one."""
+    floor = min((e["score"] for e in entries), default=0.0)
+    return [
+        (e["params"], e["score"] if e["feasible"] else floor - 1.0 - e["violation"])
+        for e in entries
+    ]
+
+
+def bayesian_search(
+    X: Any,
+    y: Any,
+    space: Optional[Dict[str, Any]] = None,
+    task: str = "classification",
+    n_iter: int = 30,
+    n_initial: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_estimators: Optional[int] = None,
+    cv: int = config.DEFAULT_CV_FOLDS,
+    scoring: Optional[str] = None,
+    n_jobs: int = -1,
+    random_state: Optional[int] = config.DEFAULT_RANDOM_STATE,
+    trial_store: Optional[TrialStore] = None,
+    search_id: Optional[str] = None,
+    measure_costs: bool = False,
+    constraints: Optional[Dict[str, float]] = None,
+    latency_batch_sizes: Sequence[int] = (1,),
+    latency_repeats: int = 100,
+) -> Dict[str, Any]:
+    """Bayesian optimization with a TPE surrogate and batched proposals.
+
+    The first ``n_initial`` configurations are sampled at random; after that
+    TPESampler proposes ``batch_size`` configurations at a time from the
+    scores seen so far. Every (configuration, fold) fit of a batch runs as
+    one single-threaded job in a shared thread pool (tree building releases
+    the GIL), so a batch keeps ``n_jobs`` cores busy without copying folds.
+
+    With ``measure_costs`` (implied by ``constraints``) the first fold's
+    forest of every configuration is also measured with model_costs() once
+    the batch has finished, so timings never overlap with fits. Configurations
+    that break a constraint are ranked below all feasible ones for the
+    surrogate, and the result carries the Pareto front of score against
+    model size and the latency of the first batch size.
+
+    Args:
+        X: Training features
+        y: Training targets
+        space: Search space (lists are choices, ``(low, high)`` tuples are ranges);
+            an ``n_estimators`` entry only sets the forest size
+        task: "classification" or "regression"
+        n_iter: Configurations evaluated in total
+        n_initial: Random configurations before the surrogate is used
+            (default ``max(batch_size, n_iter // 4)``)
+        batch_size: Configurations per batch (default enough to fill ``n_jobs`` cores)
+        max_estimators: Trees per forest (default from the space, else 300)
+        cv: Number of cross-validation folds
+        scoring: One of SCORINGS (accuracy for classification, r2 for regression by default)
+        n_jobs: Number of worker threads (-1 for all cores)
+        random_state: Seed for sampling, folds and forests
+        trial_store: Records every (configuration, fold) score; stored scores are reused
+        search_id: Name of the search in ``trial_store`` (derived from the
+            data and arguments by default, so an identical call resumes)
+        measure_costs: Measure model bytes, node count and predict latency per configuration
+        constraints: Upper bounds on costs, e.g. ``{"latency_p99_ms_batch1": 2.0}``
+        latency_batch_sizes: Batch sizes whose predict latency is measured
+        latency_repeats: Timed predict calls per batch size
+
+    Returns:
+        Dict with the best (feasible) parameters and score, every evaluated
+        configuration in order, the number of forests fitted and, when costs
+        are measured, the Pareto front
+    """
+    space, max_estimators = _search_space(space, max_estimators)
+    measure_costs = measure_costs or bool(constraints)
+    check_constraints(constraints, latency_batch_sizes)
+    required_costs = cost_keys(latency_batch_sizes) if measure_costs else []
+    n_workers = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(n_jobs, 1)
+    batch_size = batch_size or max(1, math.ceil(n_workers / cv))
+    n_initial = n_initial or max(batch_size, n_iter // 4)
+    search = {"strategy": "bayesian", "space": space, "n_iter": n_iter, "n_initial": n_initial,
+              "batch_size": batch_size, "max_estimators": max_estimators, "constraints": constraints}
+    estimator, scoring, folds, log = _setup(X, y, task, scoring, cv, random_state, trial_store, search, search_id)
+    rng = np.random.default_rng(random_state)
+    sampler = TPESampler(space, random_state=random_state)
+    base_params = {"n_estimators": max_estimators, "n_jobs": 1, "random_state": random_state}
+
+    history: List[Dict[str, Any]] = []
+    n_fits = n_batches = 0
+    with Parallel(n_jobs=n_workers, prefer="threads") as parallel:
+        while len(history) < n_iter:
+            q = min(batch_size, n_iter - len(history))
+            if len(history) < n_initial:
+                batch = sample_configurations(space, min(q, n_initial - len(history)), rng)
+            else:
+                batch = sampler.propose(_sampler_observations(history), q)
+            trials = [{**params, "n_estimators": max_estimators, "method": "full_fit"} for params in batch]
+            scores = {(c, f): log.get(trial, f) for c, trial in enumerate(trials) for f in range(cv)}
+            # Costs live on fold 0; a stored trial without them is refitted to measure them
+            missing = [
+                (c, f) for (c, f), metrics in scores.items()
+                if metrics is None or (f == 0 and any(k not in metrics for k in required_costs))
+            ]
+            # Concurrent fits share the process's resident memory, so it is only attributed without them
+            fitted = parallel(
+                delayed(_fit_and_score)(estimator, {**base_params, **batch[c]}, folds[f], scoring,
+                                        measure_costs and f == 0, n_workers == 1)
+                for c, f in missing
+            )
+            for (c, f), (score, fit_seconds, peak_memory, forest) in zip(missing, fitted):
+                scores[c, f] = {scoring: score}
+                if forest is not None:
+                    scores[c, f].update(model_costs(forest, folds[0][2], latency_batch_sizes, latency_repeats))
+                log.put(trials[c], f, scores[c, f], fit_seconds, peak_memory)
+            n_fits += len(missing)
+            for c, params in enumerate(batch):
+                entry = {"batch": n_batches, "params": params,
+                         "score": float(np.mean([scores[c, f][scoring] for f in range(cv)]))}
+                if measure_costs:
+                    entry["costs"] = {k: scores[c, 0][k] for k in required_costs}
+                    entry["violation"] = constraint_violation(entry["costs"], constraints)
+                entry["feasible"] = entry.get("violation", 0.0) == 0.0
+                history.append(entry)
+            n_batches += 1
+
+    feasible = [e for e in history if e["feasible"]]
+    best = max(feasible or history, key=lambda e: e["score"])
+    result = {
+        "strategy": "bayesian",
+        "scoring": scoring,
+        "best_params": {**best["params"], "n_estimators": max_estimators},
+        "best_score": best["score"],
+        "constraints_met": bool(feasible),
+        "n_configurations": len(history),
+        "n_fits": n_fits,
+        "n_batches": n_batches,
+        "batch_size": batch_size,
+        "history": history,
+    }
+    if measure_costs:
+        result["best_costs"] = best["costs"]
+        objectives = ["model_bytes", latency_keys(latency_batch_sizes[:1])[1]]
+        result["pareto_objectives"] = [scoring] + objectives
+        result["pareto_front"] = pareto_front(feasible, objectives)
+    return log.finish(result)
+
+
+def truncated_outputs(
+    forest: Any, X: np.ndarray, depths: List[Optional[int]], n_estimators: List[int]
+) -> Dict[Tuple[int, Optional[int]], np.ndarray]:
+    """Outputs of every ``(tree prefix, depth limit)`` variant of a fitted forest.
+
+    Each tree is walked level-synchronously: all rows advance one level per
+    step, rows already at a leaf stay put, and the node value reached after
+    ``d`` steps is the prediction of the tree cut at depth ``d`` (internal
+    nodes carry the value of their training samples, which is exactly the
+    leaf a ``max_depth=d`` tree would have there). A forest of ``m`` trees is
+    the first ``m`` trees of a larger forest with the same random_state, so
+    prefix sums give every ``n_estimators`` variant. NaN values take each
+    node's missing-value branch, as in CompiledForest.
+
+    Args:
+        forest: Fitted sklearn forest grown to the largest depth and tree count
+        X: Rows to predict
+        depths: Depth limits to report (None for unlimited)
+        n_estimators: Tree counts to report
+
+    Returns:
+        Dict mapping ``(n_trees, depth)`` to averaged probabilities/predictions
+    """
+    is_classifier = hasattr(forest, "classes_")
+    X = np.asarray(X, dtype=np.float32)
+    rows = np.arange(X.shape[0])
+    has_missing = bool(np.isnan(X).any())
+    limited = sorted(d for d in depths if d is not None)
+    checkpoints = set(n_estimators)
+    sums: Dict[Optional[int], np.ndarray] = {}
+    outputs: Dict[Tuple[int, Optional[int]], np.ndarray] = {}
+
+    for t, tree in enumerate(forest.estimators_[:max(n_estimators)], start=1):
+        a = tree_arrays(tree, is_classifier)
+        missing_left = None
+        if has_missing:
+            missing_left = np.asarray(
+                getattr(tree.tree_, "missing_go_to_left", np.zeros(tree.tree_.node_count)), dtype=bool
+            )
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        level = 0
+        reached: Dict[Optional[int], np.ndarray] = {}
+        while True:
+            for d in limited:
+                if d == level:
+                    reached[d] = node
+            internal = a["left"][node] >= 0
+            if not internal.any():
+                break
+            go_right = goes_right(X[rows, np.maximum(a["feature"][node], 0)], node, a["threshold"], missing_left)
+            node = np.where(internal, np.where(go_right, a["right"][node], a["left"][node]), node)
+            level += 1
+        for d in limited:
+            reached.setdefault(d, node)
+        reached[None] = node
+        for d in depths:
+            value = a["value"][reached[d]]
+            sums[d] = value if d not in sums else sums[d] + value
+        if t in checkpoints:
+            for d in depths:
+                outputs[t, d] = sums[d] / t
+    return outputs
+
+
+def _truncation_note(truncated: bool, subsampled: bool) -> str:
+    if not truncated:
+        return "none"
+    if subsampled:
+        return "approximate: max_features < n_features, shallower refits may split differently"
+    return "near-exact: only tied splits can differ from a shallower refit"
+
+
+def nested_grid_search(
+    X: Any,
+    y: Any,
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    task: str = "classification",
+    cv: int = config.DEFAULT_CV_FOLDS,
+    scoring: Optional[str] = None,
+    n_jobs: int = -1,
+    random_state: Optional[int] = config.DEFAULT_RANDOM_STATE,
+    trial_store: Optional[TrialStore] = None,
+    search_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Exhaustive grid search that fits one forest per (fold, other parameters).
+
+    The ``n_estimators`` and ``max_depth`` values of the grid are nested:
+    only the largest forest (most trees, deepest limit) is fitted and every
+    smaller variant is scored from it with truncated_outputs(). Tree
+    prefixes are exact. Depth truncation is an approximation: the
+    depth-first builder draws each node's candidate features from one
+    random stream, so a tree refitted with a smaller ``max_depth`` consumes
+    that stream differently and can pick other splits. With
+    ``max_features < n_features`` this happens at most nodes; with all
+    features it only affects tied splits, which are common near the leaves.
+
+    Args:
+        X: Training features
+        y: Training targets
+        param_grid: Dict of parameter lists (the notebook's grid by default)
+        task: "classification" or "regression"
+        cv: Number of cross-validation folds
+        scoring: One of SCORINGS (accuracy for classification, r2 for regression by default)
+        n_jobs: Parallel jobs per forest fit
+        random_state: Seed for folds and forests
+        trial_store: Records every (variant, fold) score; a fit is skipped
+            when all of its variants are stored
+        search_id: Name of the search in ``trial_store`` (derived from the
+            data and arguments by default, so an identical call resumes)
+
+    Returns:
+        Dict with ranked results, the best parameters and the number of fits
+        made compared with a plain grid search
+    """
+    grid = dict(param_grid) if param_grid is not None else {"n_estimators": [100, 200, 300], **DEFAULT_SPACE}
+    tree_counts = sorted(grid.pop("n_estimators", [100]))
+    depths = list(grid.pop("max_depth", [None]))
+    deepest = None if None in depths else max(depths)
+    search = {"strategy": "nested_grid", "param_grid": {**grid, "n_estimators": tree_counts, "max_depth": depths}}
+    estimator, scoring, folds, log = _setup(X, y, task, scoring, cv, random_state, trial_store, search, search_id)
+    n_features = folds[0][0].shape[1]
+    default_max_features = estimator().max_features
+
+    names = list(grid)
+    others = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    scores: Dict[str, List[float]] = {}
+    variants: Dict[str, Dict[str, Any]] = {}
+    subsampled = False
+    n_fits = 0
+    start = time.perf_counter()
+    for params in others:
+        forest_params = {**params, "n_estimators": tree_counts[-1], "max_depth": deepest,
+                         "n_jobs": n_jobs, "random_state": random_state}
+        # Depth cuts depend on the depth the shared forest was grown to, so it is part of every trial
+        trials = {
+            (n_trees, depth): {**params, "n_estimators": n_trees, "max_depth": depth,
+                               "method": "nested_grid", "fit_depth": deepest}
+            for n_trees in tree_counts for depth in depths
+        }
+        for f, (X_train, y_train, X_val, y_val) in enumerate(folds):
+            stored = {variant: log.get(trial, f) for variant, trial in trials.items()}
+            if any(metrics is None for metrics in stored.values()):
+                fit_start = time.perf_counter()
+                with PeakMemory() as memory:
+                    forest = estimator(**forest_params).fit(X_train, y_train)
+                n_fits += 1
+                classes = getattr(forest, "classes_", None)
+                outputs = truncated_outputs(forest, X_val, depths, tree_counts)
+                fit_seconds = time.perf_counter() - fit_start
+                for variant, output in outputs.items():
+                    if stored[variant] is None:
+                        stored[variant] = {scoring: score_predictions(y_val, output, scoring, classes)}
+                        log.put(trials[variant], f, stored[variant], fit_seconds, memory.mb)
+            for (n_trees, depth), metrics in stored.items():
+                variant = {**params, "n_estimators": n_trees, "max_depth": depth}
+                key = params_key(variant)
+                variants[key] = variant
+                scores.setdefault(key, []).append(metrics[scoring])
+        subsampled |= resolve_max_features(params.get("max_features", default_max_features), n_features) < n_features
+
+    results = sorted(
+        ({"params": variants[key], "mean_score": float(np.mean(s)), "std_score": float(np.std(s))}
+         for key, s in scores.items()),
+        key=lambda r: r["mean_score"], reverse=True,
+    )
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+    return log.finish({
+        "strategy": "nested_grid",
+        "scoring": scoring,
+        "best_params": results[0]["params"],
+        "best_score": results[0]["mean_score"],
+        "n_fits": n_fits,
+        "grid_fits": len(results) * cv,
+        "fit_seconds": time.perf_counter() - start,
+        "depth_truncation": _truncation_note(len(depths) > 1, subsampled),
+        "results": results,
+    })
@@ -0,0 +1,42 @@
+"""
+Round-trip tests for the binary forest format.
+Forests trained on data with missing values carry inf thresholds that every threshold dtype must keep.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from crewai.tools.forest_format import load_forest, save_forest
+
+
+@pytest.fixture(scope="module")
+def nan_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 6))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def nan_forest(nan_data):
+    X, y = nan_data
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    thresholds = np.concatenate([tree.tree_.threshold for tree in forest.estimators_])
+    assert np.isinf(thresholds).any(), "expected sklearn to split on missingness"
+    return forest
+
+
+def test_float32_round_trip_is_exact(nan_forest, nan_data, tmp_path):
+    X, _ = nan_data
+    loaded = load_forest(save_forest(nan_forest, tmp_path / "forest.bin"))
+    np.testing.assert_allclose(loaded.predict_proba(X), nan_forest.predict_proba(X), atol=1e-6)
+
+
+def test_float16_round_trip_keeps_missing_value_splits(nan_forest, nan_data, tmp_path):
+    X, _ = nan_data
+    path = save_forest(nan_forest, tmp_path / "forest.bin", leaf_dtype="float16", threshold_dtype="float16")
+    loaded = load_forest(path)
+    assert np.isinf(np.asarray(loaded.threshold, dtype=np.float64)).any()
+    assert np.mean(loaded.predict(X) == nan_forest.predict(X)) >= 0.98